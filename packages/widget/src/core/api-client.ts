@@ -117,13 +117,16 @@ export class ApiClient {
     taskId: string,
     prediction: Prediction | null,
     proof: InferenceProof,
-    timing: TimingData
+    timing: TimingData,
+    challengeToken?: string
   ): Promise<SubmitResponse> {
     const response = await this.request<Record<string, unknown>>('/captcha/submit', {
       method: 'POST',
       body: JSON.stringify({
         session_id: sessionId,
         task_id: taskId,
+        // Signed task ticket: lets the server verify without session/task lookups
+        challenge_token: challengeToken,
         prediction: prediction
           ? {
               label: prediction.label,
@@ -136,7 +139,8 @@ export class ApiClient {
           sample_id: proof.sampleId,
           segment_start: proof.segmentStart,
           layer_count: proof.layerCount,
-          pre_activations: proof.preActivations,
+          proof_version: proof.proofVersion,
+          pre_activations_b64: proof.preActivationsB64,
           output_hashes: proof.outputHashes,
           prediction_hash: proof.predictionHash,
           proof_hash: proof.proofHash,
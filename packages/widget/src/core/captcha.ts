@@ -277,7 +277,8 @@ export class PoUWCaptcha {
       shardTask.taskId,
       shardResult.prediction ?? null,
       proof,
-      timing
+      timing,
+      this.session!.challengeToken
     );
     this.invokeProgress({
       stage: 'submitted',
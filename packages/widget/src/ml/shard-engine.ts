@@ -7,6 +7,7 @@
 
 import type {
   ModelShard,
+  NeuralLayerConfig,
   ShardTask,
   InferenceProof,
   Prediction,
@@ -14,6 +15,9 @@ import type {
 import { Config } from '../core/config';
 import { hashData } from '../utils/crypto';
 
+/** Newest commitment-hash protocol this engine implements (quantized int32) */
+const PROOF_VERSION_QUANTIZED = 2;
+
 /**
  * Result from executing a model shard
  */
@@ -46,6 +50,8 @@ class NeuralLayer {
   public readonly outputShape: number[];
   public readonly activation: string;
   public readonly kernel?: number[];
+  public readonly indices: Int32Array;
+  public readonly indptr: Int32Array;
   public readonly postOps: NonNullable<
     ModelShard['layers'][0]['postOps']
   >;
@@ -53,12 +59,14 @@ class NeuralLayer {
   constructor(config: ModelShard['layers'][0]) {
     this.name = config.name;
     this.type = config.type;
-    this.weights = new Float32Array(config.weights);
-    this.biases = new Float32Array(config.biases);
+    this.weights = new Float32Array(config.weights ?? []);
+    this.biases = new Float32Array(config.biases ?? []);
     this.inputShape = config.inputShape;
     this.outputShape = config.outputShape;
     this.activation = config.activation;
     this.kernel = config.kernel;
+    this.indices = new Int32Array(config.indices ?? []);
+    this.indptr = new Int32Array(config.indptr ?? []);
     // Legacy payloads carry only an activation name; treat it as a one-op chain
     this.postOps =
       config.postOps && config.postOps.length > 0
@@ -71,7 +79,8 @@ class NeuralLayer {
   /**
    * Execute the layer's affine computation (z = L·x + b), returning the RAW
    * pre-activation output. Every provable layer type is affine — dense
-   * (matmul) or conv2d (convolution) — which is exactly what lets the server
+   * (matmul), sparse_dense (pruned matmul) or conv2d (convolution) — which
+   * is exactly what lets the server
    * verify z with secret projection checks instead of recomputing it. The
    * post-ops are applied separately (and re-applied server-side) before
    * feeding the next layer.
@@ -88,6 +97,9 @@ class NeuralLayer {
       case 'fully_connected':
         output = this.denseForward(input);
         break;
+      case 'sparse_dense':
+        output = this.sparseDenseForward(input);
+        break;
       default:
         throw new Error(`Unsupported layer type: ${this.type}`);
     }
@@ -157,6 +169,25 @@ class NeuralLayer {
     return output;
   }
 
+  /**
+   * Pruned dense layer in CSR form: row o of the wire matrix holds output
+   * o's non-zero weights, so the cost is one multiply-add per non-zero.
+   */
+  private sparseDenseForward(input: Float32Array): Float32Array {
+    const outputSize = this.outputShape[this.outputShape.length - 1];
+    const output = new Float32Array(outputSize);
+
+    for (let o = 0; o < outputSize; o++) {
+      let sum = this.biases[o];
+      for (let k = this.indptr[o]; k < this.indptr[o + 1]; k++) {
+        sum += input[this.indices[k]] * this.weights[k];
+      }
+      output[o] = sum;
+    }
+
+    return output;
+  }
+
   /**
    * Apply the layer's post-op chain (activation, pooling, flatten) to its
    * pre-activation output. Cheap O(n) ops, mirrored exactly server-side.
@@ -262,6 +293,131 @@ class NeuralLayer {
   }
 }
 
+/**
+ * IEEE 754 half float to float
+ */
+function halfToFloat(half: number): number {
+  const sign = half & 0x8000 ? -1 : 1;
+  const exponent = (half >> 10) & 0x1f;
+  const fraction = half & 0x3ff;
+  if (exponent === 0) {
+    return sign * fraction * 2 ** -24;
+  }
+  if (exponent === 0x1f) {
+    return fraction ? NaN : sign * Infinity;
+  }
+  return sign * (1 + fraction / 1024) * 2 ** (exponent - 15);
+}
+
+/**
+ * Decode a layer's wire bytes into float32 weights and biases.
+ *
+ * - float32: weights then biases, float32 LE
+ * - float16: weights as half floats, then float32 biases
+ * - int8: per-output-channel float32 scales, float32 biases, then int8
+ *   weights (dequantized as `q * scale[channel]`, exactly as the server does)
+ * - sparse_dense: CSR values, biases, row pointers and column indices
+ */
+export function decodeLayerWire(
+  bytes: Uint8Array,
+  layer: NeuralLayerConfig
+): {
+  weights: Float32Array;
+  biases: Float32Array;
+  indices?: Int32Array;
+  indptr?: Int32Array;
+} {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const floats = (offset: number, count: number): Float32Array => {
+    const out = new Float32Array(count);
+    for (let i = 0; i < count; i++) {
+      out[i] = view.getFloat32(offset + i * 4, true);
+    }
+    return out;
+  };
+
+  if (layer.type === 'sparse_dense') {
+    // values, biases, row pointers, then column indices (uint16 when the
+    // inputs fit, else int32)
+    const nnz = layer.weightCount ?? 0;
+    const inputSize = layer.inputShape[layer.inputShape.length - 1];
+    const outputSize = layer.outputShape[layer.outputShape.length - 1];
+    const weights = floats(0, nnz);
+    const biases = floats(nnz * 4, outputSize);
+    let offset = (nnz + outputSize) * 4;
+    const indptr = new Int32Array(outputSize + 1);
+    for (let o = 0; o <= outputSize; o++, offset += 4) {
+      indptr[o] = view.getInt32(offset, true);
+    }
+    const indices = new Int32Array(nnz);
+    const wide = inputSize > 1 << 16;
+    for (let k = 0; k < nnz; k++) {
+      indices[k] = wide
+        ? view.getInt32(offset + k * 4, true)
+        : view.getUint16(offset + k * 2, true);
+    }
+    return { weights, biases, indices, indptr };
+  }
+
+  const encoding = layer.weightEncoding ?? 'float32';
+  if (encoding === 'float16') {
+    const weightCount = layer.weightCount ?? 0;
+    const weights = new Float32Array(weightCount);
+    for (let i = 0; i < weightCount; i++) {
+      weights[i] = halfToFloat(view.getUint16(i * 2, true));
+    }
+    const offset = weightCount * 2;
+    return { weights, biases: floats(offset, (bytes.byteLength - offset) / 4) };
+  }
+  if (encoding === 'int8') {
+    const weightCount = layer.weightCount ?? 0;
+    const channels = (bytes.byteLength - weightCount) / 8;
+    const scales = floats(0, channels);
+    const biases = floats(channels * 4, channels);
+    const quantized = new Int8Array(bytes.buffer, bytes.byteOffset + channels * 8, weightCount);
+    const perChannel = weightCount / channels;
+    const weights = new Float32Array(weightCount);
+    for (let i = 0; i < weightCount; i++) {
+      weights[i] = quantized[i] * scales[Math.floor(i / perChannel)];
+    }
+    return { weights, biases };
+  }
+  const values =
+    bytes.byteOffset % 4 === 0
+      ? new Float32Array(bytes.buffer, bytes.byteOffset, bytes.byteLength / 4)
+      : floats(0, bytes.byteLength / 4);
+  const weightCount = layer.weightCount ?? values.length;
+  return { weights: values.subarray(0, weightCount), biases: values.subarray(weightCount) };
+}
+
+/**
+ * Wire bytes of a layer whose float32 weights came inline: weights then
+ * biases, followed for sparse_dense by its row pointers and column indices.
+ */
+function encodeInlineWire(layer: NeuralLayerConfig): Uint8Array {
+  const parts: Uint8Array[] = [
+    new Uint8Array(new Float32Array(layer.weights ?? []).buffer),
+    new Uint8Array(new Float32Array(layer.biases ?? []).buffer),
+  ];
+  if (layer.type === 'sparse_dense') {
+    const inputSize = layer.inputShape[layer.inputShape.length - 1];
+    const indices = layer.indices ?? [];
+    parts.push(new Uint8Array(new Int32Array(layer.indptr ?? []).buffer));
+    parts.push(
+      new Uint8Array(
+        (inputSize > 1 << 16 ? new Int32Array(indices) : new Uint16Array(indices)).buffer
+      )
+    );
+  }
+  const bytes = new Uint8Array(parts.reduce((total, part) => total + part.byteLength, 0));
+  let offset = 0;
+  for (const part of parts) {
+    bytes.set(part, offset);
+    offset += part.byteLength;
+  }
+  return bytes;
+}
+
 /**
  * Shard Inference Engine
  *
@@ -270,6 +426,8 @@ class NeuralLayer {
 export class ShardInferenceEngine {
   private config: Config;
   private layers: NeuralLayer[] = [];
+  /** Raw wire bytes of resolved shards, hashed as received */
+  private wireBytes = new WeakMap<ModelShard, Uint8Array>();
 
   constructor(config: Config) {
     this.config = config;
@@ -289,21 +447,54 @@ export class ShardInferenceEngine {
   }
 
   /**
-   * Verify a shard's integrity: SHA-256 over the exact float32 wire bytes
-   * (weights then biases) must match the checksum pinned in the model
-   * manifest. Rejects tampered or substituted weights before any compute.
+   * Download layer weights a shard references by `weightsUrl`. The URL is
+   * content-addressed (it names the checksum) and served immutable, so the
+   * browser HTTP cache answers repeat visits without touching the network.
+   * Quantized layers may instead carry their wire bytes inline (`wireData`).
+   */
+  async resolveShardWeights(shard: ModelShard): Promise<void> {
+    const layer = shard.layers[0];
+    if (!layer || layer.weights) {
+      return;
+    }
+    let bytes: Uint8Array;
+    if (layer.wireData) {
+      bytes = Uint8Array.from(atob(layer.wireData), (c) => c.charCodeAt(0));
+    } else if (shard.weightsUrl) {
+      const base = this.config.get('apiUrl') || window.location.href;
+      const response = await fetch(new URL(shard.weightsUrl, base).toString(), {
+        method: 'GET',
+        mode: 'cors',
+      });
+      if (!response.ok) {
+        throw new Error(`Failed to fetch shard ${shard.name}: ${response.status}`);
+      }
+      bytes = new Uint8Array(await response.arrayBuffer());
+    } else {
+      return;
+    }
+    this.wireBytes.set(shard, bytes);
+    const { weights, biases, indices, indptr } = decodeLayerWire(bytes, layer);
+    layer.weights = weights;
+    layer.biases = biases;
+    if (indices && indptr) {
+      layer.indices = indices;
+      layer.indptr = indptr;
+    }
+  }
+
+  /**
+   * Verify a shard's integrity: SHA-256 over the exact wire bytes (weights
+   * then biases, in the layer's weight encoding) must match the checksum
+   * pinned in the model manifest. Rejects tampered or substituted weights
+   * before any compute.
    */
   async verifyShardChecksum(shard: ModelShard): Promise<boolean> {
     if (!shard.checksum || !shard.layers.length) {
       return true; // no checksum to verify against
     }
-    const layer = shard.layers[0];
-    const weights = new Float32Array(layer.weights);
-    const biases = new Float32Array(layer.biases);
-    const bytes = new Uint8Array(weights.byteLength + biases.byteLength);
-    bytes.set(new Uint8Array(weights.buffer), 0);
-    bytes.set(new Uint8Array(biases.buffer), weights.byteLength);
-    const digest = await crypto.subtle.digest('SHA-256', bytes.buffer);
+    const bytes = this.wireBytes.get(shard) ?? encodeInlineWire(shard.layers[0]);
+    const digest = await crypto.subtle.digest('SHA-256', bytes);
     const hex = Array.from(new Uint8Array(digest))
       .map((byte) => byte.toString(16).padStart(2, '0'))
       .join('');
@@ -321,8 +512,9 @@ export class ShardInferenceEngine {
   async executeShards(task: ShardTask): Promise<ShardExecutionResult> {
     const totalStartTime = performance.now();
 
-    // Integrity check before executing anything
+    // Fetch referenced weights, then integrity-check before executing anything
     for (const shard of task.shards) {
+      await this.resolveShardWeights(shard);
       const ok = await this.verifyShardChecksum(shard);
       if (!ok) {
         throw new Error(`Shard ${shard.name} failed checksum verification`);
@@ -370,11 +562,13 @@ export class ShardInferenceEngine {
       prediction = this.generatePrediction(current, task.labels || []);
     }
 
+    const proofVersion = Math.min(task.proofVersion ?? 1, PROOF_VERSION_QUANTIZED);
     const proof = await this.generateProof(
       task.taskId,
       task.sampleId,
       segmentStart,
       preActivations,
+      proofVersion,
       prediction
     );
 
@@ -513,11 +707,12 @@ export class ShardInferenceEngine {
     sampleId: string,
     segmentStart: number,
     preActivations: Float32Array[],
+    proofVersion: number,
     prediction?: Prediction
   ): Promise<InferenceProof> {
     const outputHashes: string[] = [];
     for (const output of preActivations) {
-      const hash = await this.hashTensor(output);
+      const hash = await this.hashTensor(output, proofVersion);
       outputHashes.push(hash);
     }
 
@@ -552,7 +747,8 @@ export class ShardInferenceEngine {
       sampleId,
       segmentStart,
       layerCount: preActivations.length,
-      preActivations: preActivations.map((pre) => Array.from(pre)),
+      proofVersion,
+      preActivationsB64: preActivations.map((pre) => encodeFloat32(pre)),
       outputHashes,
       predictionHash,
       proofHash,
@@ -563,7 +759,18 @@ export class ShardInferenceEngine {
   /**
    * Hash a tensor (Float32Array)
    */
-  private async hashTensor(tensor: Float32Array): Promise<string> {
+  private async hashTensor(tensor: Float32Array, proofVersion = 1): Promise<string> {
+    if (proofVersion >= PROOF_VERSION_QUANTIZED) {
+      // v2: floor(v * 1e4 + 0.5) saturated to int32, hashed as LE bytes.
+      // Clamping before the Int32Array store keeps +/-Infinity saturating;
+      // NaN stores as 0, matching the server.
+      const quantized = new Int32Array(tensor.length);
+      for (let i = 0; i < tensor.length; i++) {
+        const q = Math.floor(tensor[i] * 1e4 + 0.5);
+        quantized[i] = Math.min(Math.max(q, -2147483648), 2147483647);
+      }
+      return await hashData(quantized.buffer);
+    }
     const canonical = Array.from(tensor, (value) => value.toFixed(4)).join(',');
     return await hashData(canonical);
   }
@@ -576,6 +783,21 @@ export class ShardInferenceEngine {
   }
 }
 
+/**
+ * Encode a Float32Array as base64 little-endian float32 (the inverse of
+ * decodeInput). Typed arrays use platform byte order, which is little-endian
+ * on every browser target.
+ */
+function encodeFloat32(values: Float32Array): string {
+  const bytes = new Uint8Array(values.buffer, values.byteOffset, values.byteLength);
+  let binary = '';
+  const chunk = 0x8000;
+  for (let i = 0; i < bytes.length; i += chunk) {
+    binary += String.fromCharCode(...bytes.subarray(i, i + chunk));
+  }
+  return btoa(binary);
+}
+
 /**
  * Utility to check if shard engine is supported
  */
@@ -20,8 +20,14 @@ export interface ModelShard {
   outputShape: number[];
   /** Activation function */
   activation?: string;
-  /** SHA-256 over the layer's float32 wire bytes; verified before execution */
+  /** SHA-256 over the layer's wire bytes (in its weight encoding); verified before execution */
   checksum?: string;
+  /**
+   * Content-addressed raw wire bytes of the layer (float32 LE weights+biases,
+   * or the layer's `weightEncoding`; immutable, HTTP-cached across sessions).
+   * Present when the layer weights are not inlined.
+   */
+  weightsUrl?: string;
   /** Layer configurations for shard execution */
   layers: NeuralLayerConfig[];
 }
@@ -45,12 +51,29 @@ export interface PostOpConfig {
 export interface NeuralLayerConfig {
   /** Layer name */
   name: string;
-  /** Provable layer type (dense, conv2d) */
+  /** Provable layer type (dense, conv2d, sparse_dense) */
   type: string;
-  /** Layer weights as flat array (dense: [out][in]; conv2d: [oc][ic][kh][kw]) */
-  weights: number[];
+  /**
+   * Layer weights as flat array (dense: [out][in]; conv2d: [oc][ic][kh][kw]).
+   * Omitted when the shard references its weights by `weightsUrl`.
+   */
+  weights?: number[] | Float32Array;
   /** Layer biases as flat array */
-  biases: number[];
+  biases?: number[] | Float32Array;
+  /** Number of weights leading the downloaded shard bytes (rest are biases) */
+  weightCount?: number;
+  /**
+   * Wire encoding of the weights when quantized: `float16` (half-float
+   * weights, then float32 biases) or `int8` (float32 per-channel scales,
+   * float32 biases, then int8 weights). Biases always stay float32.
+   */
+  weightEncoding?: 'float32' | 'float16' | 'int8';
+  /** Base64 wire bytes of a quantized layer inlined in the shard */
+  wireData?: string;
+  /** sparse_dense only: input index of each weight (CSR column indices) */
+  indices?: number[] | Uint16Array | Int32Array;
+  /** sparse_dense only: row pointer per output unit into `weights` */
+  indptr?: number[] | Int32Array;
   /** Input shape (dense: [1, in]; conv2d: [C, H, W]) */
   inputShape: number[];
   /** Output shape (dense: [1, out]; conv2d: [OC, OH, OW]) */
@@ -97,6 +120,8 @@ export interface ShardTask {
   labels: string[];
   /** Model checksum (hash of layer checksums) */
   modelChecksum?: string;
+  /** Highest commitment-hash protocol version the server accepts */
+  proofVersion?: number;
   /** Optional test/known-label key for seeded evaluation samples */
   groundTruthKey?: string;
   /** Progress callback */
@@ -115,11 +140,14 @@ export interface InferenceProof {
   segmentStart: number;
   /** Number of layers computed */
   layerCount: number;
+  /** Commitment-hash protocol version (1 = decimal string, 2 = quantized int32) */
+  proofVersion: number;
   /**
-   * Pre-activation output of each computed layer. The server verifies these
-   * with secret projection checks without re-running the computation.
+   * Pre-activation output of each computed layer as base64 little-endian
+   * float32. The server verifies these with secret projection checks without
+   * re-running the computation.
    */
-  preActivations: number[][];
+  preActivationsB64: string[];
   /** Commitment hashes of each pre-activation vector */
   outputHashes: string[];
   /** Hash of prediction (empty for mid-pipeline segments) */
@@ -2,7 +2,11 @@
  * Tests for Shard Inference Engine
  */
 import { describe, it, expect, beforeEach, vi } from 'vitest';
-import { ShardInferenceEngine, isShardEngineSupported } from '../src/ml/shard-engine';
+import {
+  ShardInferenceEngine,
+  decodeLayerWire,
+  isShardEngineSupported,
+} from '../src/ml/shard-engine';
 import { Config } from '../src/core/config';
 import type { ShardTask, ModelShard, NeuralLayerConfig } from '../src/types';
 
@@ -73,6 +77,48 @@ describe('ShardInferenceEngine', () => {
       expect(result.proof).toHaveProperty('proofHash');
     });
 
+    it('should execute a sparse_dense layer like its dense equivalent', async () => {
+      // Dense [[0, 0, 1.5, 0], [-1, 0, 0, 2]] in CSR form
+      const layerConfig: NeuralLayerConfig = {
+        name: 'sparse_1',
+        type: 'sparse_dense',
+        weights: [1.5, -1, 2],
+        indices: [2, 0, 3],
+        indptr: [0, 1, 3],
+        biases: [0.5, 0],
+        inputShape: [1, 4],
+        outputShape: [1, 2],
+        activation: 'linear',
+      };
+      const task: ShardTask = {
+        taskId: 'test-task-sparse',
+        sampleId: 'sample-1',
+        modelName: 'test-model',
+        modelVersion: '1.0',
+        shards: [
+          {
+            index: 0,
+            name: 'shard_0',
+            layerType: 'sparse_dense',
+            inputShape: [1, 4],
+            outputShape: [1, 2],
+            layers: [layerConfig],
+          },
+        ],
+        inputData: btoa(String.fromCharCode(...new Uint8Array(new Float32Array([1, 2, 3, 4]).buffer))),
+        inputShape: [1, 4],
+        expectedLayers: 1,
+        difficulty: 'easy',
+        expectedTimeMs: 100,
+        groundTruthKey: 'gt-key',
+        labels: ['a', 'b'],
+      };
+
+      const result = await engine.executeShards(task);
+
+      expect(Array.from(result.layerOutputs[0])).toEqual([5, 7]);
+    });
+
     it('should handle multiple layers', async () => {
       const layers: NeuralLayerConfig[] = [
         {
@@ -231,4 +277,69 @@ describe('ShardInferenceEngine', () => {
       expect(result1.proof.proofHash).toBe(result2.proof.proofHash);
     });
   });
+
+  describe('decodeLayerWire', () => {
+    const layer = (weightEncoding: 'float16' | 'int8'): NeuralLayerConfig => ({
+      name: 'q',
+      type: 'dense',
+      weightCount: 4,
+      weightEncoding,
+      inputShape: [1, 2],
+      outputShape: [1, 2],
+      activation: 'linear',
+    });
+
+    it('should decode float16 weights and float32 biases', () => {
+      const bytes = new Uint8Array(4 * 2 + 2 * 4);
+      const view = new DataView(bytes.buffer);
+      // 1.0, -2.0, 0.5, 0.0 as IEEE half floats
+      [0x3c00, 0xc000, 0x3800, 0x0000].forEach((h, i) => view.setUint16(i * 2, h, true));
+      view.setFloat32(8, 0.25, true);
+      view.setFloat32(12, -1, true);
+
+      const { weights, biases } = decodeLayerWire(bytes, layer('float16'));
+      expect(Array.from(weights)).toEqual([1, -2, 0.5, 0]);
+      expect(Array.from(biases)).toEqual([0.25, -1]);
+    });
+
+    it('should dequantize int8 weights per output channel', () => {
+      const bytes = new Uint8Array(2 * 4 + 2 * 4 + 4);
+      const view = new DataView(bytes.buffer);
+      view.setFloat32(0, 0.5, true); // scales
+      view.setFloat32(4, 2, true);
+      view.setFloat32(8, 1, true); // biases
+      view.setFloat32(12, 3, true);
+      [2, -4, 1, -1].forEach((q, i) => view.setInt8(16 + i, q));
+
+      const { weights, biases } = decodeLayerWire(bytes, layer('int8'));
+      expect(Array.from(weights)).toEqual([1, -2, 2, -2]);
+      expect(Array.from(biases)).toEqual([1, 3]);
+    });
+
+    it('should decode sparse_dense CSR wire bytes', () => {
+      // 2 outputs x 3 inputs, non-zeros (0,2)=1.5 and (1,0)=-1
+      const bytes = new Uint8Array(2 * 4 + 2 * 4 + 3 * 4 + 2 * 2);
+      const view = new DataView(bytes.buffer);
+      view.setFloat32(0, 1.5, true);
+      view.setFloat32(4, -1, true);
+      view.setFloat32(8, 0.5, true); // biases
+      view.setFloat32(12, 0, true);
+      [0, 1, 2].forEach((p, i) => view.setInt32(16 + i * 4, p, true));
+      view.setUint16(28, 2, true);
+      view.setUint16(30, 0, true);
+
+      const decoded = decodeLayerWire(bytes, {
+        name: 's',
+        type: 'sparse_dense',
+        weightCount: 2,
+        inputShape: [1, 3],
+        outputShape: [1, 2],
+        activation: 'linear',
+      });
+      expect(Array.from(decoded.weights)).toEqual([1.5, -1]);
+      expect(Array.from(decoded.biases)).toEqual([0.5, 0]);
+      expect(Array.from(decoded.indptr ?? [])).toEqual([0, 1, 2]);
+      expect(Array.from(decoded.indices ?? [])).toEqual([2, 0]);
+    });
+  });
 });
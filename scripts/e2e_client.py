@@ -16,6 +16,7 @@ import hashlib
 import struct
 import sys
 import time
+from urllib.parse import urljoin
 
 import numpy as np
 import httpx
@@ -25,11 +26,64 @@ def hash_text(value: str) -> str:
     return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
-def hash_tensor(values) -> str:
+def hash_tensor(values, proof_version: int = 1) -> str:
+    if proof_version >= 2:
+        q = np.floor(np.asarray(values, dtype=np.float64) * 1e4 + 0.5)
+        q = np.clip(np.nan_to_num(q), -(2**31), 2**31 - 1).astype("<i4")
+        return hashlib.sha256(q.tobytes()).hexdigest()
     return hash_text(",".join(f"{float(v):.4f}" for v in values))
 
 
+def decode_layer_wire(raw: bytes, layer) -> None:
+    """Decode wire bytes per ``weightEncoding`` (float32 / float16 / int8)."""
+    count = layer["weightCount"]
+    encoding = layer.get("weightEncoding", "float32")
+    if layer["type"] == "sparse_dense":
+        out_size, in_size = layer["outputShape"][-1], layer["inputShape"][-1]
+        offset = 4 * (count + out_size)
+        w = np.frombuffer(raw, dtype="<f4", count=count)
+        b = np.frombuffer(raw, dtype="<f4", count=out_size, offset=4 * count)
+        layer["indptr"] = np.frombuffer(raw, dtype="<i4", count=out_size + 1, offset=offset)
+        index_dtype = "<u2" if in_size <= 1 << 16 else "<i4"
+        layer["indices"] = np.frombuffer(
+            raw, dtype=index_dtype, count=count, offset=offset + 4 * (out_size + 1)
+        )
+    elif encoding == "float16":
+        w = np.frombuffer(raw, dtype="<f2", count=count).astype(np.float32)
+        b = np.frombuffer(raw, dtype="<f4", offset=count * 2)
+    elif encoding == "int8":
+        channels = (len(raw) - count) // 8
+        scales = np.frombuffer(raw, dtype="<f4", count=channels)
+        b = np.frombuffer(raw, dtype="<f4", count=channels, offset=channels * 4)
+        q = np.frombuffer(raw, dtype=np.int8, offset=channels * 8)
+        w = (q.reshape(channels, -1).astype(np.float32) * scales[:, None]).reshape(-1)
+    else:
+        values = np.frombuffer(raw, dtype="<f4")
+        w, b = values[:count], values[count:]
+    layer["weights"], layer["biases"] = w, b
+
+
+def resolve_shard_weights(client: httpx.Client, api: str, shard) -> None:
+    """Download content-addressed weights (browser: HTTP-cached across sessions)."""
+    url = shard.get("weightsUrl")
+    layer = shard["layers"][0]
+    if layer.get("weights") is not None:
+        return
+    if layer.get("wireData"):
+        raw = base64.b64decode(layer["wireData"])
+    elif url:
+        response = client.get(urljoin(api, url))
+        response.raise_for_status()
+        raw = response.content
+    else:
+        return
+    shard["_wire"] = raw
+    decode_layer_wire(raw, layer)
+
+
 def verify_shard_checksum(shard) -> bool:
+    if "_wire" in shard:
+        return hashlib.sha256(shard["_wire"]).hexdigest() == shard["checksum"]
     layer = shard["layers"][0]
     w = np.asarray(layer["weights"], dtype="<f4").tobytes()
     b = np.asarray(layer["biases"], dtype="<f4").tobytes()
@@ -73,7 +127,7 @@ def apply_post_ops(values: np.ndarray, layer: dict) -> np.ndarray:
 
 
 def forward_pre_activation(current: np.ndarray, layer: dict) -> np.ndarray:
-    """Affine layer compute (dense or conv2d), float32 like the browser."""
+    """Affine layer compute (dense, sparse_dense or conv2d), float32 like the browser."""
     if layer["type"] == "conv2d":
         in_ch, in_h, in_w = layer["inputShape"]
         out_ch, out_h, out_w = layer["outputShape"]
@@ -96,6 +150,12 @@ def forward_pre_activation(current: np.ndarray, layer: dict) -> np.ndarray:
 
     in_size = layer["inputShape"][-1]
     out_size = layer["outputShape"][-1]
+    if layer["type"] == "sparse_dense":
+        w = np.asarray(layer["weights"], dtype=np.float64)
+        indices = np.asarray(layer["indices"], dtype=np.intp)
+        rows = np.repeat(np.arange(out_size), np.diff(np.asarray(layer["indptr"])))
+        z = np.bincount(rows, weights=current.astype(np.float64)[indices] * w, minlength=out_size)
+        return (z + np.asarray(layer["biases"], dtype=np.float64)).astype(np.float32)
     w = np.asarray(layer["weights"], dtype=np.float32).reshape(out_size, in_size)
     b = np.asarray(layer["biases"], dtype=np.float32)
     return (current.astype(np.float64) @ w.T.astype(np.float64) + b).astype(
@@ -121,8 +181,9 @@ def solve_once(client: httpx.Client, api: str, solver_id: int) -> dict:
     data = init.json()
     task = data["task"]
 
-    # Verify shard integrity like the browser does
+    # Fetch referenced weights and verify integrity like the browser does
     for shard in task["shards"]:
+        resolve_shard_weights(client, api, shard)
         assert verify_shard_checksum(shard), f"checksum failed for {shard['name']}"
 
     # Decode input and compute the segment (float32, like Float32Array)
@@ -166,7 +227,8 @@ def solve_once(client: httpx.Client, api: str, solver_id: int) -> dict:
             )
         )
 
-    output_hashes = [hash_tensor(z) for z in pre_activations]
+    proof_version = min(task.get("proofVersion", 1), 2)
+    output_hashes = [hash_tensor(z, proof_version) for z in pre_activations]
     proof_hash = hash_text(
         ":".join(
             [
@@ -192,7 +254,11 @@ def solve_once(client: httpx.Client, api: str, solver_id: int) -> dict:
                 "sampleId": task["sampleId"],
                 "segmentStart": segment_start,
                 "layerCount": len(pre_activations),
-                "preActivations": [z.tolist() for z in pre_activations],
+                "proofVersion": proof_version,
+                "preActivationsB64": [
+                    base64.b64encode(z.astype("<f4").tobytes()).decode("ascii")
+                    for z in pre_activations
+                ],
                 "outputHashes": output_hashes,
                 "predictionHash": prediction_hash,
                 "proofHash": proof_hash,
@@ -34,9 +34,10 @@ sys.path.insert(0, str(SERVER_DIR))
 
 from app.ml.model_store import apply_post_ops, get_model_store  # noqa: E402
 from app.ml.proof_verifier import (  # noqa: E402
+    CURRENT_PROOF_VERSION,
     NUM_PROJECTIONS,
     ProofVerifier,
-    canonical_vector_hash,
+    commitment_hash,
     compute_proof_hash,
 )
 
@@ -54,6 +55,13 @@ def client_compute(model, x, start: int, end: int) -> list[list[float]]:
     return pre_activations
 
 
+def client_compute_batch(model, activations, layer_index: int) -> np.ndarray:
+    """client_compute of one layer for every sample at once: (N, out) float32."""
+    layer = model.layers[layer_index]
+    h = np.asarray(activations, dtype=np.float32).astype(np.float64)
+    return layer.forward_batch(h).astype(np.float32)
+
+
 def build_proof(
     model,
     x,
@@ -64,7 +72,7 @@ def build_proof(
     prediction_hash: str = "",
 ):
     pre = client_compute(model, x, start, end)
-    hashes = [canonical_vector_hash(z) for z in pre]
+    hashes = [commitment_hash(z, CURRENT_PROOF_VERSION) for z in pre]
     proof_hash = compute_proof_hash(
         task_id,
         sample_id,
@@ -137,41 +145,56 @@ def evaluate_model(model, inputs, ground_truth, seed: int) -> dict:
     tamper_rejections = 0
     audit_rejections = 0
 
-    for sample_index, x in enumerate(inputs):
+    # Direct inference for every sample in one batched forward pass; the
+    # per-sample timings below are what a single inline audit costs.
+    X = np.asarray(inputs, dtype=np.float64)
+    start_time = time.perf_counter()
+    direct_pre, direct_probs = model.forward_segment_batch(X, 0, model.total_layers)
+    direct_batch_ms = (time.perf_counter() - start_time) * 1000
+    direct_labels = [model.labels[int(i)] for i in np.argmax(direct_probs, axis=1)]
+    for x in X:
         start_time = time.perf_counter()
-        direct_probs = model.predict(np.asarray(x, dtype=np.float64))
+        model.predict(x)
         direct_times.append((time.perf_counter() - start_time) * 1000)
-        direct_label = model.labels[int(np.argmax(direct_probs))]
 
-        activation = x
-        final_report = None
-        for layer_index in range(model.total_layers):
-            pre, hashes, proof_hash = build_proof(
-                model,
-                activation,
-                layer_index,
-                layer_index + 1,
-                task_id=f"honest-{sample_index}-{layer_index}",
-                sample_id=f"sample-{sample_index}",
+    # Honest distributed pipeline, one single-layer segment per solver. The
+    # client side runs batched across samples, layer by layer; every segment
+    # is still verified on its own.
+    activations = X
+    final_reports = [None] * samples
+    for layer_index in range(model.total_layers):
+        pre_batch = client_compute_batch(model, activations, layer_index)
+        next_activations = []
+        for sample_index in range(samples):
+            task_id = f"honest-{sample_index}-{layer_index}"
+            sample_id = f"sample-{sample_index}"
+            pre = [pre_batch[sample_index].tolist()]
+            hashes = [commitment_hash(pre[0], CURRENT_PROOF_VERSION)]
+            proof_hash = compute_proof_hash(
+                task_id, sample_id, layer_index, 1, hashes, ""
             )
             start_time = time.perf_counter()
             report = verifier.verify_segment(
                 model,
                 layer_index,
-                activation,
+                activations[sample_index],
                 pre,
                 hashes,
                 proof_hash,
-                f"honest-{sample_index}-{layer_index}",
-                f"sample-{sample_index}",
+                task_id,
+                sample_id,
+                proof_version=CURRENT_PROOF_VERSION,
             )
             segmented_verify_times.append((time.perf_counter() - start_time) * 1000)
             if report.valid:
                 honest_passes += 1
-            activation = [float(v) for v in report.final_activation]
-            final_report = report
+            next_activations.append(report.final_activation)
+            final_reports[sample_index] = report
+        activations = np.asarray(next_activations, dtype=np.float64)
 
-        if final_report and final_report.predicted_label == direct_label:
+    for sample_index, x in enumerate(inputs):
+        final_report = final_reports[sample_index]
+        if final_report and final_report.predicted_label == direct_labels[sample_index]:
             labels_match += 1
         if (
             final_report
@@ -185,25 +208,24 @@ def evaluate_model(model, inputs, ground_truth, seed: int) -> dict:
         tamper_input = (
             x
             if tamper_layer == 0
-            else [
-                float(v)
-                for v in model.forward_segment(
-                    np.asarray(x, dtype=np.float64), 0, tamper_layer
-                )[1]
-            ]
+            else apply_post_ops(
+                direct_pre[tamper_layer - 1][sample_index],
+                model.layers[tamper_layer - 1].post_ops,
+            ).tolist()
         )
         pre, _, _ = build_proof(
             model, tamper_input, tamper_layer, tamper_layer + 1,
             "tamper-task", f"sample-{sample_index}",
         )
         pre[0][int(rng.integers(0, len(pre[0])))] += 0.5
-        tampered_hashes = [canonical_vector_hash(pre[0])]
+        tampered_hashes = [commitment_hash(pre[0], CURRENT_PROOF_VERSION)]
         tampered_proof = compute_proof_hash(
             "tamper-task", f"sample-{sample_index}", tamper_layer, 1, tampered_hashes, ""
         )
         tamper_report = verifier.verify_segment(
             model, tamper_layer, tamper_input, pre, tampered_hashes,
             tampered_proof, "tamper-task", f"sample-{sample_index}",
+            proof_version=CURRENT_PROOF_VERSION,
         )
         if not tamper_report.valid:
             tamper_rejections += 1
@@ -211,13 +233,14 @@ def evaluate_model(model, inputs, ground_truth, seed: int) -> dict:
         # Full audit should catch small coherent drift.
         pre, _, _ = build_proof(model, x, 0, 1, "audit-task", f"sample-{sample_index}")
         pre[0] = [v + 0.002 for v in pre[0]]
-        audit_hashes = [canonical_vector_hash(pre[0])]
+        audit_hashes = [commitment_hash(pre[0], CURRENT_PROOF_VERSION)]
         audit_proof = compute_proof_hash(
             "audit-task", f"sample-{sample_index}", 0, 1, audit_hashes, ""
         )
         audit_report = auditing_verifier.verify_segment(
             model, 0, x, pre, audit_hashes, audit_proof,
             "audit-task", f"sample-{sample_index}",
+            proof_version=CURRENT_PROOF_VERSION,
         )
         if not audit_report.valid:
             audit_rejections += 1
@@ -258,6 +281,7 @@ def evaluate_model(model, inputs, ground_truth, seed: int) -> dict:
         "latency_ms": {
             "direct_full_inference_mean": round(statistics.mean(direct_times), 4),
             "direct_full_inference_p95": round(percentile(direct_times, 95), 4),
+            "direct_batched_inference_per_sample": round(direct_batch_ms / samples, 4),
             "segment_projection_verify_mean": round(
                 statistics.mean(segmented_verify_times), 4
             ),
@@ -295,8 +319,8 @@ def run_evaluation(samples: int, seed: int) -> dict:
         "seed": seed,
         "input_source": input_source,
         "models": [
-            evaluate_model(model, inputs, ground_truth, seed)
-            for model in get_model_store().list_models()
+            evaluate_model(get_model_store().get(name), inputs, ground_truth, seed)
+            for name in get_model_store().model_names()
         ],
     }
 
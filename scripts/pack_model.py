@@ -0,0 +1,57 @@
+"""
+Pack a model's weights into a memory-mapped single-file container.
+
+Reads ``models/<name>/manifest.json`` + ``weights.npz`` through the server's
+model loader (so every checksum is verified first), writes
+``models/<name>/weights.pouw`` — one aligned block of wire bytes per layer —
+and records it in the manifest as ``container_file``. The server then maps
+the container read-only instead of decompressing the npz in every worker,
+so all workers on a host share one page-cache copy of the weights.
+
+``weights.npz`` is left in place for the training scripts; re-run this after
+retraining (a re-exported manifest without ``container_file`` falls back to
+the npz).
+
+Usage (from repo root):
+    python scripts/pack_model.py models/mnist-tiny [models/mnist-cnn ...]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "server"))
+
+from app.ml.model_store import ModelStore, write_container  # noqa: E402
+
+CONTAINER_FILE = "weights.pouw"
+
+
+def pack(model_dir: Path) -> Path:
+    manifest_path = model_dir / "manifest.json"
+    # Always pack from the verified npz, never from a previous container
+    spec = ModelStore()._load_model(manifest_path, use_container=False)
+
+    container_path = model_dir / CONTAINER_FILE
+    write_container(container_path, spec.layers)
+
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["container_file"] = CONTAINER_FILE
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return container_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack model weights into a container")
+    parser.add_argument("model_dirs", nargs="+", help="e.g. models/mnist-tiny")
+    args = parser.parse_args()
+
+    for model_dir in args.model_dirs:
+        path = pack(Path(model_dir))
+        print(f"Wrote {path} ({path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Prune a model's dense layers into sparse_dense (CSR) layers.
+
+Reads ``models/<name>/manifest.json`` + ``weights.npz`` through the server's
+model loader (so every checksum is verified first), zeroes the smallest
+magnitude weights of each selected dense layer and re-exports it as a
+``sparse_dense`` layer: ``W{i}`` holds the surviving values, ``I{i}`` their
+input indices and ``P{i}`` the row pointer per output unit. Wire size,
+client compute and the server's projection precompute then scale with the
+non-zeros.
+
+Pruning changes the model, so give it a new ``--version`` and re-run
+pack_model.py if the model was packed. Fine-tune after pruning for anything
+beyond light sparsity — this script does not retrain.
+
+Usage (from repo root):
+    python scripts/prune_model.py models/mnist-tiny --sparsity 0.8 --version 2.2.0
+    python scripts/prune_model.py models/mnist-cnn --sparsity 0.9 --layers 2 \
+        --version 1.2.0
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "server"))
+
+from app.ml.model_store import WEIGHTS_FLOAT32, ModelStore, _load_layer  # noqa: E402
+
+
+def to_csr(weights: np.ndarray, sparsity: float):
+    """CSR arrays (values, indices, indptr) of a pruned (in, out) matrix, rows = outputs."""
+    rows = np.asarray(weights, dtype=np.float32).T
+    threshold = np.quantile(np.abs(rows), sparsity) if sparsity > 0 else -1.0
+    keep = np.abs(rows) > threshold
+    out_idx, in_idx = np.nonzero(keep)  # row-major, so already CSR ordered
+    indptr = np.zeros(rows.shape[0] + 1, dtype=np.int32)
+    np.cumsum(np.bincount(out_idx, minlength=rows.shape[0]), out=indptr[1:])
+    return rows[keep].astype(np.float32), in_idx.astype(np.int32), indptr
+
+
+def stored_arrays(layer) -> dict:
+    """npz entries of a layer left as it is."""
+    i = layer.index
+    if layer.layer_type == "sparse_dense":
+        return {f"W{i}": layer.weights, f"I{i}": layer.indices, f"P{i}": layer.indptr,
+                f"b{i}": layer.biases}
+    if layer.weight_encoding != WEIGHTS_FLOAT32:
+        raise SystemExit(f"layer {i} is quantized; prune the float32 export instead")
+    return {f"W{i}": layer.weights, f"b{i}": layer.biases}
+
+
+def prune(model_dir: Path, sparsity: float, layer_indices, version: str) -> dict:
+    manifest_path = model_dir / "manifest.json"
+    spec = ModelStore()._load_model(manifest_path, use_container=False)
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    dense = {layer.index for layer in spec.layers if layer.layer_type == "dense"}
+    selected = set(layer_indices) if layer_indices else dense
+    if selected - dense:
+        raise SystemExit(f"only dense layers can be pruned, not {sorted(selected - dense)}")
+
+    weights = {}
+    for layer, entry in zip(spec.layers, manifest["layers"]):
+        if layer.index not in selected:
+            weights.update(stored_arrays(layer))
+            continue
+        i = layer.index
+        values, indices, indptr = to_csr(layer.weights, sparsity)
+        arrays = {f"W{i}": values, f"I{i}": indices, f"P{i}": indptr, f"b{i}": layer.biases}
+        weights.update(arrays)
+        entry["type"] = "sparse_dense"
+        entry["nnz"] = int(values.size)
+        entry.pop("weight_encoding", None)
+        sparse = _load_layer(entry, arrays)
+        entry["checksum"] = sparse.compute_checksum()
+        print(
+            f"  layer {i} {layer.name}: {values.size}/{layer.weights.size} weights kept, "
+            f"{len(layer.wire_bytes())} -> {len(sparse.wire_bytes())} bytes"
+        )
+
+    weights_path = model_dir / manifest["weights_file"]
+    np.savez(weights_path, **weights)
+    manifest["checksum"] = hashlib.sha256(
+        "".join(entry["checksum"] for entry in manifest["layers"]).encode("ascii")
+    ).hexdigest()
+    manifest["weights_file_sha256"] = hashlib.sha256(weights_path.read_bytes()).hexdigest()
+    manifest["version"] = version
+    manifest.pop("container_file", None)  # stale until re-packed
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune dense layers into sparse_dense")
+    parser.add_argument("model_dir", help="e.g. models/mnist-tiny")
+    parser.add_argument("--sparsity", type=float, required=True,
+                        help="fraction of weights to drop per layer, e.g. 0.9")
+    parser.add_argument("--layers", type=int, nargs="*",
+                        help="dense layer indices (default: all dense)")
+    parser.add_argument("--version", required=True, help="new model version")
+    args = parser.parse_args()
+    if not 0 <= args.sparsity < 1:
+        parser.error("--sparsity must be in [0, 1)")
+
+    manifest = prune(Path(args.model_dir), args.sparsity, args.layers, args.version)
+    print(
+        f"Wrote {manifest['name']} v{manifest['version']} "
+        f"(checksum {manifest['checksum'][:12]}…)"
+    )
+
+
+if __name__ == "__main__":
+    main()
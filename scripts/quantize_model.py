@@ -0,0 +1,124 @@
+"""
+Re-export a model with quantized (float16 / int8) wire weights.
+
+Reads ``models/<name>/manifest.json`` + ``weights.npz`` through the server's
+model loader (so every checksum is verified first), re-encodes the selected
+layers and rewrites the npz and manifest in place:
+
+* ``float16`` — weights as IEEE half floats (2x smaller);
+* ``int8``    — symmetric per-output-channel int8 with one float32 scale
+  per channel (~4x smaller).
+
+Biases stay float32. Each re-encoded layer gets ``weight_encoding`` in the
+manifest and a new checksum over its encoded wire bytes; the server projects
+against the dequantized weights, so proofs remain exact for what clients
+run. Quantization changes the model, so give it a new ``--version`` (running
+servers then roll it in like a retrain) and re-run pack_model.py if the model
+was packed.
+
+Usage (from repo root):
+    python scripts/quantize_model.py models/mnist-cnn --encoding int8 --version 1.1.0
+    python scripts/quantize_model.py models/mnist-tiny --encoding float16 --layers 0 1 \
+        --version 2.1.0
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "server"))
+
+from app.ml.model_store import (  # noqa: E402
+    WEIGHTS_FLOAT16,
+    WEIGHTS_FLOAT32,
+    WEIGHTS_INT8,
+    ModelStore,
+    _load_layer,
+    quantize_int8,
+)
+
+
+def stored_arrays(layer, encoding: str) -> dict:
+    """npz entries of one layer in ``encoding`` (layout _load_layer expects)."""
+    i = layer.index
+    arrays = {f"b{i}": layer.biases.astype(np.float32)}
+    if layer.layer_type == "sparse_dense":
+        if encoding != WEIGHTS_FLOAT32:
+            raise SystemExit(f"layer {i} is sparse_dense; only dense and conv2d quantize")
+        arrays.update({f"W{i}": layer.weights, f"I{i}": layer.indices, f"P{i}": layer.indptr})
+    elif encoding == WEIGHTS_FLOAT16:
+        arrays[f"W{i}"] = layer.weights.astype(np.float16)
+    elif encoding == WEIGHTS_INT8:
+        channel_axis = 1 if layer.layer_type == "dense" else 0
+        if layer.scales is not None:
+            # Already int8: keep its scales so the wire bytes do not change
+            shape = [1] * layer.weights.ndim
+            shape[channel_axis] = -1
+            q = np.rint(layer.weights / layer.scales.reshape(shape))
+            arrays[f"W{i}"] = q.astype(np.int8)
+            arrays[f"S{i}"] = layer.scales
+        else:
+            arrays[f"W{i}"], arrays[f"S{i}"] = quantize_int8(layer.weights, channel_axis)
+    else:
+        arrays[f"W{i}"] = layer.weights.astype(np.float32)
+    return arrays
+
+
+def quantize(model_dir: Path, encoding: str, layer_indices, version: str) -> dict:
+    manifest_path = model_dir / "manifest.json"
+    spec = ModelStore()._load_model(manifest_path, use_container=False)
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    selected = set(layer_indices) if layer_indices else {
+        layer.index for layer in spec.layers if layer.layer_type != "sparse_dense"
+    }
+
+    weights = {}
+    for layer, entry in zip(spec.layers, manifest["layers"]):
+        layer_encoding = encoding if layer.index in selected else layer.weight_encoding
+        arrays = stored_arrays(layer, layer_encoding)
+        weights.update(arrays)
+        if layer.index not in selected:
+            continue
+        entry["weight_encoding"] = layer_encoding
+        quantized = _load_layer(entry, arrays)
+        entry["checksum"] = quantized.compute_checksum()
+        error = float(np.abs(quantized.weights - layer.weights).max())
+        print(
+            f"  layer {layer.index} {layer.name}: {len(layer.wire_bytes())} -> "
+            f"{len(quantized.wire_bytes())} bytes, max |dw| = {error:.2e}"
+        )
+
+    weights_path = model_dir / manifest["weights_file"]
+    np.savez(weights_path, **weights)
+    manifest["checksum"] = hashlib.sha256(
+        "".join(entry["checksum"] for entry in manifest["layers"]).encode("ascii")
+    ).hexdigest()
+    manifest["weights_file_sha256"] = hashlib.sha256(weights_path.read_bytes()).hexdigest()
+    manifest["version"] = version
+    manifest.pop("container_file", None)  # stale until re-packed
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize a model's wire weights")
+    parser.add_argument("model_dir", help="e.g. models/mnist-cnn")
+    parser.add_argument("--encoding", choices=[WEIGHTS_FLOAT16, WEIGHTS_INT8], required=True)
+    parser.add_argument("--layers", type=int, nargs="*", help="layer indices (default: all)")
+    parser.add_argument("--version", required=True, help="new model version")
+    args = parser.parse_args()
+
+    manifest = quantize(Path(args.model_dir), args.encoding, args.layers, args.version)
+    print(
+        f"Wrote {manifest['name']} v{manifest['version']} "
+        f"(checksum {manifest['checksum'][:12]}…)"
+    )
+
+
+if __name__ == "__main__":
+    main()
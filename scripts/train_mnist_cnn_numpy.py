@@ -33,8 +33,12 @@ from pathlib import Path
 import numpy as np
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
 from train_mnist_numpy import download_mnist, load_idx_images, load_idx_labels  # noqa: E402
 
+# Same patch layout the server's conv layers use for audits and projections
+from app.ml.model_store import im2col  # noqa: E402
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("train_mnist_cnn")
 
@@ -90,17 +94,6 @@ LAYER_SPECS = [
 # Batched conv / pool primitives (im2col)
 # ---------------------------------------------------------------------------
 
-def im2col(x: np.ndarray, kh: int, kw: int) -> np.ndarray:
-    """(N,C,H,W) -> (N, OH*OW, C*kh*kw) patch matrix for valid stride-1 conv."""
-    n, c, h, w = x.shape
-    oh, ow = h - kh + 1, w - kw + 1
-    cols = np.empty((n, c, kh, kw, oh, ow), dtype=x.dtype)
-    for u in range(kh):
-        for v in range(kw):
-            cols[:, :, u, v] = x[:, :, u : u + oh, v : v + ow]
-    return cols.transpose(0, 4, 5, 1, 2, 3).reshape(n, oh * ow, c * kh * kw)
-
-
 def conv_forward(x: np.ndarray, w: np.ndarray, b: np.ndarray):
     n = x.shape[0]
     oc, _, kh, kw = w.shape
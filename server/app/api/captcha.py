@@ -15,8 +15,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Header, status, Response
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.config import get_settings
 from app.models import get_db, Session, Task, Sample, Prediction
@@ -35,7 +36,11 @@ from app.schemas import (
 from app.core.task_coordinator import TaskCoordinator
 from app.core.pipeline import PipelineCoordinator
 from app.core.risk_scorer import RiskScorer
+from app.core.audit_queue import AuditQueue, AuditRecord, is_token_revoked
 from app.ml.inference_validator import InferenceValidator
+from app.ml.model_store import encode_float32_array, get_model_by_checksum
+from app.ml.proof_verifier import CURRENT_PROOF_VERSION
+from app.ml.task_ticket import TICKET_CLAIM, TaskTicket
 from app.utils.security import create_jwt_token, verify_jwt_token, generate_captcha_token
 from app.utils.redis_client import get_redis
 from app.services.site_registry import SiteRegistry, SiteRegistryError
@@ -116,7 +121,7 @@ async def init_captcha(
         db.add(session)
         await db.flush()
 
-        task, sample, shard_task = await task_coordinator.assign_task(
+        task, shard_task = await task_coordinator.assign_task(
             session_id=session.id,
             difficulty=difficulty,
         )
@@ -125,14 +130,9 @@ async def init_captcha(
             "site_key_prefix": registered_site.site_key_prefix,
         }
 
+        # Carries the signed task ticket /captcha/submit verifies against
         challenge_token = create_jwt_token(
-            data={
-                "session_id": str(session.id),
-                "task_id": str(task.id),
-                "difficulty": difficulty,
-                "domain": registered_site.config.domain,
-                "site_key_prefix": registered_site.site_key_prefix,
-            },
+            data=TaskTicket.from_task(task, session).challenge_claims(),
             expires_delta=timedelta(seconds=settings.captcha_token_expiry_seconds),
         )
 
@@ -142,7 +142,7 @@ async def init_captcha(
             sample_id=shard_task.sample_id,
             model_name=shard_task.model_name,
             model_version=shard_task.model_version,
-            shards=shard_task.shards,
+            shards=[],  # spliced in pre-serialized below
             input_data=shard_task.input_data,
             input_shape=shard_task.input_shape,
             segment_start=shard_task.segment_start,
@@ -152,6 +152,7 @@ async def init_captcha(
             expected_time_ms=shard_task.expected_time_ms,
             labels=shard_task.labels,
             model_checksum=shard_task.model_checksum,
+            proof_version=CURRENT_PROOF_VERSION,
         )
 
         await db.commit()
@@ -165,13 +166,14 @@ async def init_captcha(
             shard_task.run_id,
         )
 
-        return CaptchaInitResponse(
+        response = CaptchaInitResponse(
             session_id=str(session.id),
             challenge_token=challenge_token,
             task=task_info,
             difficulty=difficulty,
             expires_at=expires_at,
         )
+        return _splice_shards(response, shard_task.shards_json)
 
     except Exception as e:
         logger.exception(f"Error initializing CAPTCHA: {e}")
@@ -181,6 +183,23 @@ async def init_captcha(
         )
 
 
+def _splice_shards(response: CaptchaInitResponse, shards_json: bytes) -> Response:
+    """
+    Serialize the init response with the shard payloads spliced in as raw,
+    pre-built JSON (see model_store.WirePayloadCache), so the weights are
+    never materialized as Python lists or re-validated per request.
+    """
+    body = response.model_dump_json(by_alias=True).encode("utf-8")
+    # Any '"' inside string values is escaped, so the first match is the key.
+    head, marker, tail = body.partition(b'"shards":[]')
+    if not marker:
+        raise ValueError("init response has no shards placeholder")
+    return Response(
+        content=head + b'"shards":' + shards_json + tail,
+        media_type="application/json",
+    )
+
+
 @router.post("/captcha/submit", response_model=CaptchaSubmitResponse)
 async def submit_captcha(
     request: CaptchaSubmitRequest,
@@ -189,84 +208,97 @@ async def submit_captcha(
     """
     Submit a computed segment.
 
-    1. Validate session/task
+    1. Resolve the task ticket — from the signed challenge token, with no
+       database reads (or from the session/task rows for clients that do
+       not send it) — and claim it, so a replay is refused before it costs
+       a verification
     2. Verify proof of computation (projection checks — no recomputation)
-    3. Advance the distributed pipeline with the verified activation
+    3. Close the still-pending session (the durable single-use guard) and
+       advance the distributed pipeline with the verified activation
     4. If the run completed, maybe ask this human to verify the label
     5. Return CAPTCHA token
     """
+    redis = None
+    claimed: Optional[TaskTicket] = None
     try:
         redis = await get_redis()
         validator = InferenceValidator(db, redis)
         pipeline = PipelineCoordinator(db)
 
-        session = await _get_session(db, request.session_id)
-        if not session:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
-        if session.is_expired:
-            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Session expired")
-
-        task = await _get_task(db, request.task_id, session.id)
-        if not task:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+        ticket = await _resolve_ticket(db, request)
+        if not await _claim_ticket(redis, ticket):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Session already submitted or expired",
+            )
+        claimed = ticket
 
         report = await validator.validate_submission(
-            task=task,
+            ticket=ticket,
             proof=request.proof,
             prediction=request.prediction,
             timing=request.timing,
         )
 
-        shard_meta = (task.metadata_ or {}).get("shard_task", {})
-        run_id = shard_meta.get("run_id")
-        segment_start = shard_meta.get("segment_start", 0)
-        expected_layers = shard_meta.get("expected_layers", 0)
-        run = await pipeline.get_run(uuid.UUID(run_id)) if run_id else None
+        session_id = uuid.UUID(ticket.session_id)
+        task_id = uuid.UUID(ticket.task_id)
+        run_id = ticket.run_id
+        segment_start = ticket.segment_start
+        expected_layers = ticket.layer_count
+        risk_scorer = RiskScorer(redis)
 
         if not report.valid:
-            risk_scorer = RiskScorer(redis)
             await risk_scorer.record_proof_outcome(
-                client_id=session.client_fingerprint,
-                site_key_prefix=(task.metadata_ or {}).get("site_key_prefix"),
+                client_id=ticket.client_id,
+                site_key_prefix=ticket.site_key_prefix,
                 valid=False,
                 reason=report.reason,
                 completion_time_ms=request.timing.total_ms,
             )
-            session.status = "failed"
-            task.status = "failed"
-            if run is not None and run.claimed_by_task == task.id:
-                await pipeline.release_claim(run)
+            if await _close_session(db, session_id, "failed"):
+                await _set_task_status(db, task_id, "failed")
+                await pipeline.release_claim(ticket)
             await db.commit()
             logger.warning(
-                "CAPTCHA validation failed: %s (%s)", session.id, report.reason
+                "CAPTCHA validation failed: %s (%s)", session_id, report.reason
             )
             return CaptchaSubmitResponse(success=False, requires_verification=False)
 
+        # Single use: a replayed (or concurrent) submit finds the session closed
+        completed_at = datetime.utcnow()
+        if not await _close_session(db, session_id, "completed", completed_at):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Session already submitted or expired",
+            )
+        await _set_task_status(db, task_id, "completed")
+
         # Advance the distributed pipeline with the verified result
+        run = await pipeline.get_run(uuid.UUID(run_id)) if run_id else None
         run_completed = False
         predicted_label = None
         confidence = None
         contributors = 1
+        advanced_run_id = None
         if run is not None:
             try:
                 run_completed, predicted_label, confidence = await pipeline.advance(
                     run=run,
-                    session_id=session.id,
+                    session_id=session_id,
                     segment_start=segment_start,
                     layer_count=expected_layers,
                     report=report,
                 )
                 contributors = len(run.contributors)
+                advanced_run_id = run_id
             except ValueError:
                 # Claim expired and another solver advanced this run. The
                 # user's work was still verified valid — credit them anyway.
                 logger.info("Stale segment for run %s; crediting solver only", run_id)
 
-        task.status = "completed"
-        risk_scorer = RiskScorer(redis)
         await risk_scorer.record_proof_outcome(
-            client_id=session.client_fingerprint,
-            site_key_prefix=(task.metadata_ or {}).get("site_key_prefix"),
+            client_id=ticket.client_id,
+            site_key_prefix=ticket.site_key_prefix,
             valid=True,
             completion_time_ms=request.timing.total_ms,
         )
@@ -275,9 +307,9 @@ async def submit_captcha(
         prediction_row = None
         if run_completed:
             prediction_row = Prediction(
-                task_id=task.id,
-                session_id=session.id,
-                sample_id=task.sample_id,
+                task_id=task_id,
+                session_id=session_id,
+                sample_id=uuid.UUID(ticket.sample_id),
                 predicted_label=predicted_label,
                 confidence=confidence,
                 inference_time_ms=request.timing.inference_ms,
@@ -288,32 +320,23 @@ async def submit_captcha(
             await db.flush()
 
             # Honeypot check: known samples should match the model prediction
-            if task.is_known_sample and task.known_label:
-                if predicted_label.lower() != task.known_label.lower():
-                    logger.info(
-                        "Known-sample mismatch on run %s: predicted=%s expected=%s",
-                        run_id,
-                        predicted_label,
-                        task.known_label,
-                    )
-
-        await _log_inference(
-            db,
-            task,
-            session,
+            # (the ticket carries only a keyed digest of the known label)
+            if ticket.contradicts_known_label(predicted_label):
+                logger.info(
+                    "Known-sample mismatch on run %s: predicted=%s", run_id, predicted_label
+                )
+
+        _log_inference(
+            ticket,
             report,
             request,
             run_id=run_id,
-            segment_start=segment_start,
-            expected_layers=expected_layers,
             run_completed=run_completed,
             predicted_label=predicted_label,
             confidence=confidence,
         )
 
-        from app.ml.model_store import get_model_store
-
-        model = get_model_store().get(shard_meta.get("model_name", ""))
+        model = await get_model_by_checksum(ticket.model_checksum)
         pipeline_info = PipelineProgressInfo(
             run_id=run_id or "",
             layers_done=(run.next_layer if run else segment_start + expected_layers),
@@ -328,25 +351,31 @@ async def submit_captcha(
         requires_verification = False
         if run_completed and prediction_row is not None:
             requires_verification = await validator.should_require_verification(
-                session=session,
+                difficulty_tier=ticket.difficulty,
                 prediction=prediction_row,
             )
 
         if requires_verification:
             verification_id = str(uuid.uuid4())
             sample_result = await db.execute(
-                select(Sample).where(Sample.id == task.sample_id)
+                select(Sample).where(Sample.id == uuid.UUID(ticket.sample_id))
             )
             sample = sample_result.scalar_one_or_none()
 
             await redis.setex(
                 f"verification:{verification_id}",
                 settings.captcha_token_expiry_seconds,
-                f"{session.id}:{prediction_row.id}",
+                f"{session_id}:{prediction_row.id}",
             )
 
-            session.status = "verifying"
+            await db.execute(
+                update(Session)
+                .where(Session.id == session_id)
+                .values(status="verifying", completed_at=None)
+            )
             await db.commit()
+            if report.audit_pending:
+                await _queue_deferred_audit(redis, request, ticket, advanced_run_id, None)
 
             return CaptchaSubmitResponse(
                 success=True,
@@ -368,21 +397,25 @@ async def submit_captcha(
                 ),
             )
 
+        token_jti = str(uuid.uuid4())
         captcha_token = generate_captcha_token(
-            session_id=str(session.id),
-            domain=session.domain,
-            site_key_prefix=(task.metadata_ or {}).get("site_key_prefix"),
+            session_id=ticket.session_id,
+            domain=ticket.domain,
+            site_key_prefix=ticket.site_key_prefix,
             work_units=expected_layers,
+            jti=token_jti,
         )
         expires_at = datetime.utcnow() + timedelta(
             seconds=settings.captcha_token_expiry_seconds
         )
 
-        session.status = "completed"
-        session.completed_at = datetime.utcnow()
         await db.commit()
+        # Queued only after commit so a fast failing audit cannot be
+        # overwritten by this request's "completed" status.
+        if report.audit_pending:
+            await _queue_deferred_audit(redis, request, ticket, advanced_run_id, token_jti)
 
-        logger.info(f"CAPTCHA completed: {session.id}")
+        logger.info(f"CAPTCHA completed: {session_id}")
 
         return CaptchaSubmitResponse(
             success=True,
@@ -396,46 +429,130 @@ async def submit_captcha(
         raise
     except Exception as e:
         logger.exception(f"Error submitting CAPTCHA: {e}")
+        if claimed is not None:
+            # Our failure, not the client's: the transaction rolls back, so
+            # let the same ticket be submitted again
+            await _release_ticket(redis, claimed)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to submit CAPTCHA",
         )
 
 
-async def _log_inference(
+async def _resolve_ticket(db: AsyncSession, request: CaptchaSubmitRequest) -> TaskTicket:
+    """The task ticket a submission is verified against."""
+    if request.challenge_token is not None:
+        payload = verify_jwt_token(request.challenge_token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or expired challenge token",
+            )
+        if (
+            payload.get("session_id") != request.session_id
+            or payload.get("task_id") != request.task_id
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Challenge token does not match this task",
+            )
+        if TICKET_CLAIM in payload:
+            ticket = TaskTicket.from_claims(payload)
+            if ticket is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Invalid or expired challenge token",
+                )
+            return ticket
+
+    # Clients without the challenge token, or holding one issued before
+    # tickets: rebuild the ticket from the rows
+    session = await _get_session(db, request.session_id)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+    if session.is_expired:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Session expired")
+
+    task = await _get_task(db, request.task_id, session.id)
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return TaskTicket.from_task(task, session)
+
+
+async def _claim_ticket(redis, ticket: TaskTicket) -> bool:
+    """
+    Mark a ticket as submitted; False if it already was.
+
+    Checked before the proof is verified. Without Redis the submit goes
+    ahead and the conditional session close still rejects the replay, only
+    after the verification.
+    """
+    try:
+        claimed = await redis.set(
+            f"ticket_claimed:{ticket.task_id}",
+            ticket.session_id,
+            ex=settings.captcha_token_expiry_seconds,
+            nx=True,
+        )
+    except RedisError as exc:
+        logger.warning("Could not claim ticket %s: %s", ticket.task_id, exc)
+        return True
+    return bool(claimed)
+
+
+async def _release_ticket(redis, ticket: TaskTicket) -> None:
+    """Undo ``_claim_ticket`` after a server-side failure."""
+    try:
+        await redis.delete(f"ticket_claimed:{ticket.task_id}")
+    except RedisError as exc:
+        logger.warning("Could not release ticket %s: %s", ticket.task_id, exc)
+
+
+async def _close_session(
     db: AsyncSession,
-    task: Task,
-    session: Session,
+    session_id: uuid.UUID,
+    outcome: str,
+    completed_at: Optional[datetime] = None,
+) -> bool:
+    """Move a pending, unexpired session to ``outcome``; False if it was not."""
+    result = await db.execute(
+        update(Session)
+        .where(
+            Session.id == session_id,
+            Session.status == "pending",
+            Session.expires_at > datetime.utcnow(),
+        )
+        .values(status=outcome, completed_at=completed_at)
+    )
+    return result.rowcount == 1
+
+
+async def _set_task_status(db: AsyncSession, task_id: uuid.UUID, task_status: str) -> None:
+    await db.execute(update(Task).where(Task.id == task_id).values(status=task_status))
+
+
+def _log_inference(
+    ticket: TaskTicket,
     report,
     request: CaptchaSubmitRequest,
     *,
     run_id: Optional[str],
-    segment_start: int,
-    expected_layers: int,
     run_completed: bool,
     predicted_label: Optional[str],
     confidence: Optional[float],
 ) -> None:
     """Append a record to the in-memory dashboard log."""
-    sample_result = await db.execute(select(Sample).where(Sample.id == task.sample_id))
-    sample = sample_result.scalar_one_or_none()
-
-    image_url = None
-    if sample:
-        if sample.data_blob:
-            image_url = f"/api/v1/sample/{task.sample_id}/image"
-        elif sample.data_url:
-            image_url = sample.data_url
-
+    segment_start = ticket.segment_start
     record = {
-        "id": str(task.id),
-        "session_id": str(session.id),
-        "task_id": str(task.id),
-        "sample_id": str(task.sample_id),
+        "id": ticket.task_id,
+        "session_id": ticket.session_id,
+        "task_id": ticket.task_id,
+        "sample_id": ticket.sample_id,
         "run_id": run_id,
-        "segment": [segment_start, segment_start + expected_layers],
+        "segment": [segment_start, segment_start + ticket.layer_count],
         "run_completed": run_completed,
-        "image_url": image_url,
+        # Serves the blob, or redirects to the sample's data_url
+        "image_url": f"/api/v1/sample/{ticket.sample_id}/image",
         "predicted_label": predicted_label or "(partial)",
         "confidence": confidence or 0.0,
         "top_k": [
@@ -497,6 +614,8 @@ async def validate_captcha(
             return CaptchaValidateResponse(valid=False)
 
         redis = await get_redis()
+        if await is_token_revoked(redis, token_id):
+            return CaptchaValidateResponse(valid=False)
         replay_key = f"captcha_token_used:{token_id}"
         if await redis.get(replay_key):
             return CaptchaValidateResponse(valid=False)
@@ -524,6 +643,36 @@ async def validate_captcha(
         return CaptchaValidateResponse(valid=False)
 
 
+async def _queue_deferred_audit(
+    redis,
+    request: CaptchaSubmitRequest,
+    ticket: TaskTicket,
+    run_id: Optional[str],
+    token_jti: Optional[str],
+) -> None:
+    """Record a segment picked for a spot audit on the background audit queue."""
+    proof = request.proof
+    if proof.pre_activations_b64 is not None:
+        pre_activations = list(proof.pre_activations_b64)
+    else:
+        pre_activations = [encode_float32_array(z) for z in proof.pre_activations]
+    await AuditQueue(redis).enqueue(
+        AuditRecord(
+            task_id=ticket.task_id,
+            session_id=ticket.session_id,
+            model_name=ticket.model_name,
+            model_checksum=ticket.model_checksum,
+            segment_start=ticket.segment_start,
+            pre_activations=pre_activations,
+            token_jti=token_jti,
+            run_id=run_id,
+            client_id=ticket.client_id,
+            site_key_prefix=ticket.site_key_prefix,
+            completion_time_ms=request.timing.total_ms,
+        )
+    )
+
+
 def _encode_sample_data(sample: Sample) -> Optional[str]:
     """Encode sample data to base64."""
     import base64
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from collections import Counter
+from dataclasses import asdict
 from typing import Any
 
 from fastapi import APIRouter, Depends
@@ -10,9 +11,16 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.core.audit_queue import AuditQueue, get_audit_worker
+from app.core.task_prefetch import get_task_prefetcher
+from app.ml.activation_store import get_activation_store
+from app.ml.input_cache import get_input_cache
 from app.ml.model_store import get_model_store
+from app.ml.projection_batcher import get_projection_batcher
 from app.ml.proof_verifier import NUM_PROJECTIONS
+from app.ml.verification_pool import get_verification_pool
 from app.models import GoldenDataset, PipelineRun, Prediction, Session, Task, Verification, get_db
+from app.utils.redis_client import get_redis
 
 settings = get_settings()
 router = APIRouter()
@@ -43,7 +51,9 @@ async def get_economics_metrics(db: AsyncSession = Depends(get_db)) -> dict[str,
     model_store = get_model_store()
     for task in tasks:
         meta = (task.metadata_ or {}).get("shard_task", {})
-        model = model_store.get(meta.get("model_name", ""))
+        model = model_store.get_by_checksum(
+            meta.get("model_checksum", "")
+        ) or model_store.get(meta.get("model_name", ""))
         if model is None:
             continue
 
@@ -130,6 +140,47 @@ async def get_economics_metrics(db: AsyncSession = Depends(get_db)) -> dict[str,
     }
 
 
+@router.get("/metrics/models")
+async def get_model_metrics() -> dict[str, Any]:
+    """Model residency under the memory budget, and the segment-input caches."""
+    return {
+        **get_model_store().residency(),
+        "input_cache": get_input_cache().stats(),
+        "activation_store": get_activation_store().stats(),
+        "task_prefetch": {
+            "depth": settings.task_prefetch_depth,
+            **asdict(get_task_prefetcher().stats),
+        },
+    }
+
+
+@router.get("/metrics/verification")
+async def get_verification_metrics() -> dict[str, Any]:
+    """Queue depth and throughput of the off-loop proof verification pool."""
+    batcher = get_projection_batcher()
+    audit_worker = get_audit_worker()
+    return {
+        "pool": get_verification_pool().stats(),
+        "batching": (
+            {
+                "window_ms": settings.verify_batch_window_ms,
+                "pending": batcher.pending,
+                "batches": batcher.batches,
+                "segments": batcher.rows,
+            }
+            if batcher is not None
+            else None
+        ),
+        "audits": {
+            "deferred": settings.defer_audits,
+            "queue_depth": await AuditQueue(await get_redis()).depth(),
+            "audited": audit_worker.stats.audited,
+            "failed": audit_worker.stats.failed,
+            "skipped": audit_worker.stats.skipped,
+        },
+    }
+
+
 async def _count_by(db: AsyncSession, column) -> dict[str, int]:
     result = await db.execute(select(column, func.count()).group_by(column))
     return {str(status): int(count) for status, count in result.all()}
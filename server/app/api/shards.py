@@ -0,0 +1,131 @@
+"""
+Content-addressed model shard downloads.
+
+``GET /shards/{checksum}.bin`` serves a layer's raw wire bytes — little-endian
+float32 weights followed by its biases, or the layer's float16/int8 encoding
+(see ``encode_layer_wire``) — exactly the bytes ``compute_checksum()``
+hashes, so the URL names the content. Responses are immutable: browsers and
+CDNs cache them across sessions and sites, and a returning solver only
+downloads activations, never weights.
+"""
+
+import re
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from app.ml.model_store import WIRE_FORMAT_BIN, get_model_store
+
+router = APIRouter()
+
+CHECKSUM_RE = re.compile(r"^[0-9a-f]{64}$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/shards/{checksum}.bin")
+async def get_shard_bytes(
+    checksum: str,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+):
+    """Raw wire bytes of one layer, addressed by its checksum."""
+    if not CHECKSUM_RE.match(checksum):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown shard")
+
+    cache = get_model_store().wire_cache
+    body = cache.get(checksum, WIRE_FORMAT_BIN)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown shard")
+
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+    }
+
+    # The content never changes for a checksum, so any validator matches.
+    if if_none_match and _etag_matches(if_none_match, checksum):
+        headers["ETag"] = f'"{checksum}"'
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if range_header:
+        byte_range = _parse_range(range_header, len(body))
+        if byte_range is None:
+            headers["Content-Range"] = f"bytes */{len(body)}"
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers=headers,
+            )
+        if byte_range != (0, len(body) - 1):
+            start, end = byte_range
+            headers["ETag"] = f'"{checksum}"'
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return Response(
+                content=body[start : end + 1],
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="application/octet-stream",
+                headers=headers,
+            )
+
+    # Whole-body responses use the pre-compressed variants when accepted.
+    encoding = _negotiate_encoding(accept_encoding)
+    if encoding != "identity":
+        encoded = cache.get(checksum, WIRE_FORMAT_BIN, encoding)
+        if encoded is not None:
+            headers["ETag"] = f'"{checksum}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+            return Response(
+                content=encoded, media_type="application/octet-stream", headers=headers
+            )
+
+    headers["ETag"] = f'"{checksum}"'
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
+
+
+def _etag_matches(if_none_match: str, checksum: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').split("-", 1)[0] == checksum:
+            return True
+    return False
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive (start, end). Multi-range
+    requests are answered with the full body, which RFC 9110 permits.
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return (0, size - 1)
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:  # suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return None
+            return (max(0, size - length), size - 1)
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return (0, size - 1)
+    if start >= size or end < start:
+        return None
+    return (start, min(end, size - 1))
+
+
+def _negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in (accept_encoding or "").split(",")
+        if part.strip() and not part.strip().endswith("q=0")
+    }
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return "identity"
@@ -76,6 +76,12 @@ async def submit_verification(
                 status_code=status.HTTP_410_GONE,
                 detail="Session expired",
             )
+        if session.status == "failed":
+            # A deferred spot audit rejected the computation meanwhile
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Session failed verification",
+            )
 
         # Determine verified label
         verified_label = None
@@ -87,7 +87,122 @@ class Settings(BaseSettings):
         description="CDN URL for samples",
     )
     default_model: str = Field(default="mnist-tiny", description="Default model")
+    shard_base_url: str = Field(
+        default="/api/v1/shards",
+        description="Base URL of the content-addressed shard weight endpoint "
+        "(point at a CDN that proxies /api/v1/shards to cache across sites)",
+    )
+    inline_shard_weights: bool = Field(
+        default=False,
+        description="Inline layer weights in /captcha/init as JSON floats "
+        "(legacy widgets) instead of referencing {checksum}.bin downloads",
+    )
     inference_timeout_ms: int = Field(default=10000, description="Inference timeout")
+    verify_workers: int = Field(
+        default=4,
+        description="Threads verifying proofs off the event loop; also the "
+        "limit on concurrent verifications (further submits queue)",
+    )
+    warm_projections: bool = Field(
+        default=True,
+        description="Precompute every loaded layer's secret projections at "
+        "startup; /ready reports 'warming' until done",
+    )
+    cache_projections: bool = Field(
+        default=True,
+        description="Persist secret projections, encrypted with a key derived "
+        "from secret_key, under cache_dir",
+    )
+    cache_model_verification: bool = Field(
+        default=True,
+        description="Skip re-hashing model files whose (path, size, mtime, "
+        "inode) already verified, via a signed record under cache_dir",
+    )
+    model_load_workers: int = Field(
+        default=4, description="Threads loading and verifying models at startup"
+    )
+    model_memory_budget_mb: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="Memory for resident models (weights, wire payloads, "
+        "projections); models then load on demand and are evicted LRU, "
+        "except those with in-flight runs (0 keeps every model resident)",
+    )
+    input_cache_entries: int = Field(
+        default=4096, description="Preprocessed sample inputs kept per worker (LRU)"
+    )
+    input_cache_redis_ttl_seconds: int = Field(
+        default=0,
+        description="Also share preprocessed inputs across workers through "
+        "Redis for this long (0 keeps them per worker)",
+    )
+    activation_cache_ttl_seconds: int = Field(
+        default=600,
+        description="Keep segment input activations hot in Redis this long; "
+        "the activation_blobs table holds each until its run moves past it, "
+        "and a stale submit of a consumed handoff verifies from this copy "
+        "(0 reads the table only)",
+    )
+    cache_dir: str = Field(
+        default=".cache", description="Directory for derived on-disk caches"
+    )
+    model_reload_interval_s: float = Field(
+        default=10.0,
+        ge=0.0,
+        description="Poll models_dir for new or retrained manifests this often "
+        "and hot-swap them in (0 disables hot reload)",
+    )
+    proof_audit_rate: float = Field(
+        default=0.08,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of verified segments that also get a full "
+        "recompute spot audit (raise during attacks)",
+    )
+    defer_audits: bool = Field(
+        default=True,
+        description="Run spot audits from a background queue instead of "
+        "inline in /captcha/submit; failures revoke the issued token",
+    )
+    audit_batch_size: int = Field(
+        default=32, description="Queued audits the worker takes per pass"
+    )
+    audit_poll_interval_ms: int = Field(
+        default=250, description="Audit worker sleep when the queue is empty"
+    )
+    pipeline_ready_queue: bool = Field(
+        default=True,
+        description="Claim pipeline segments from per-model-version Redis "
+        "sorted sets (atomic Lua pop) instead of scanning pipeline_runs; "
+        "always the database with the in-memory Redis fallback",
+    )
+    task_prefetch_depth: int = Field(
+        default=0,
+        description="Segments pre-claimed per (difficulty tier, model) in Redis "
+        "so /captcha/init only pops one (0 disables prefetching)",
+    )
+    task_prefetch_lease_seconds: float = Field(
+        default=30.0,
+        description="Claim lease on a prefetched segment until init binds it",
+    )
+    task_prefetch_poll_interval_ms: int = Field(
+        default=200, description="Prefetcher sleep between buffer top-ups"
+    )
+    verify_batch_window_ms: float = Field(
+        default=0.0,
+        description="Micro-batching window for projection checks of concurrent "
+        "submits to the same layer (0 disables batching)",
+    )
+    verify_batch_max_size: int = Field(
+        default=256, description="Flush a projection batch early at this size"
+    )
+    fused_projection_tiers: List[str] = Field(
+        default=["suspicious", "bot_like"],
+        description="Difficulty tiers whose segments are verified against one "
+        "folded random linear combination of each layer's projections, "
+        "picked per task from a secret pool, instead of all of them (full "
+        "checks only run to pinpoint a failure)",
+    )
 
     # Task Coordinator
     normal_difficulty_time_ms: int = Field(
@@ -0,0 +1,329 @@
+"""
+Deferred spot-audit queue.
+
+A spot audit is a full recompute of a submitted segment. Running it inline
+makes the audited fraction of submits noticeably slower, so with
+``defer_audits`` enabled the submit path only records the proof — submitted
+pre-activations as compact float32, plus references to the task (whose shard
+metadata holds the segment input) and the issued token — on an append-only
+Redis list. AuditWorker drains the list in batches on the verification pool,
+recomputing each segment shape of a batch in one batched forward pass.
+
+A failed audit is applied retroactively:
+
+* the captcha token's jti is revoked (``captcha_token_revoked:{jti}``), and
+  the session and task are failed, so ``/captcha/validate`` rejects it;
+* the pipeline run the segment fed is failed and its machine label marked
+  invalid, since every later layer built on the bad activation;
+* the failure is fed to RiskScorer.record_proof_outcome, raising the
+  client's difficulty tier on its next attempt.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.risk_scorer import RiskScorer
+from app.core.run_queue import ready_queue_for
+from app.ml.activation_store import get_activation_store, load_shard_input
+from app.ml.model_store import decode_float32_array, get_model_by_checksum
+from app.ml.proof_verifier import get_proof_verifier
+from app.ml.verification_pool import get_verification_pool
+from app.models import PipelineRun, Prediction, Session, Task
+from app.models.base import async_session_maker
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+AUDIT_QUEUE_KEY = "audit_queue"
+REVOKED_TOKEN_PREFIX = "captcha_token_revoked:"
+
+
+@dataclass
+class AuditRecord:
+    """One verified segment awaiting its spot audit."""
+
+    task_id: str
+    session_id: str
+    model_name: str
+    model_checksum: str
+    segment_start: int
+    # base64 little-endian float32, one entry per layer
+    pre_activations: List[str]
+    token_jti: Optional[str] = None
+    run_id: Optional[str] = None
+    client_id: Optional[str] = None
+    site_key_prefix: Optional[str] = None
+    completion_time_ms: Optional[int] = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "AuditRecord":
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return cls(**json.loads(raw))
+
+
+class AuditQueue:
+    """Append-only Redis list of pending audits."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def enqueue(self, record: AuditRecord) -> None:
+        await self.redis.rpush(AUDIT_QUEUE_KEY, record.to_json())
+
+    async def pop_batch(self, size: int) -> List[AuditRecord]:
+        raw = await self.redis.lpop(AUDIT_QUEUE_KEY, size)
+        if not raw:
+            return []
+        records = []
+        for item in raw:
+            try:
+                records.append(AuditRecord.from_json(item))
+            except (TypeError, ValueError):
+                logger.error("Dropping malformed audit record: %r", item[:200])
+        return records
+
+    async def depth(self) -> int:
+        return int(await self.redis.llen(AUDIT_QUEUE_KEY))
+
+
+async def is_token_revoked(redis, jti: str) -> bool:
+    """Whether a deferred audit revoked the captcha token with this jti."""
+    return bool(await redis.exists(f"{REVOKED_TOKEN_PREFIX}{jti}"))
+
+
+@dataclass
+class AuditStats:
+    audited: int = 0
+    failed: int = 0
+    skipped: int = 0
+    last_failure: Optional[str] = None
+
+
+class AuditWorker:
+    """Background task draining the audit queue."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_maker,
+        batch_size: Optional[int] = None,
+        poll_interval_ms: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.audit_batch_size
+        self.poll_interval = (poll_interval_ms or settings.audit_poll_interval_ms) / 1000.0
+        self.stats = AuditStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="audit-worker")
+            logger.info("Audit worker started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Audit worker stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Audit pass failed")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Audit one batch from the queue; returns how many were taken."""
+        redis = await get_redis()
+        records = await AuditQueue(redis).pop_batch(self.batch_size)
+        if not records:
+            return 0
+
+        async with self.session_factory() as db:
+            inputs, handoffs = await self._segment_inputs(db, redis, records)
+            pool = get_verification_pool()
+            # One batched recompute per segment shape in the batch
+            groups: Dict[Tuple[str, str, int, int], List[AuditRecord]] = {}
+            for record in records:
+                key = (
+                    record.model_name,
+                    record.model_checksum,
+                    record.segment_start,
+                    len(record.pre_activations),
+                )
+                groups.setdefault(key, []).append(record)
+            outcomes = await asyncio.gather(
+                *(self._audit(pool, group, inputs) for group in groups.values())
+            )
+            for group, failures in zip(groups.values(), outcomes):
+                for record, failure in zip(group, failures):
+                    if failure is not None:
+                        await self._apply_failure(db, redis, record, failure)
+            # advance() kept these handoffs for the audit; no longer needed
+            store = get_activation_store()
+            for digest in handoffs:
+                await store.discard(digest, db)
+            await db.commit()
+        return len(records)
+
+    async def _segment_inputs(
+        self, db: AsyncSession, redis, records: List[AuditRecord]
+    ) -> Tuple[Dict[str, np.ndarray], Set[str]]:
+        """
+        Segment input of each record, read from its task's shard metadata,
+        and the activation-store digests of those that were run handoffs.
+        """
+        task_ids = []
+        for record in records:
+            try:
+                task_ids.append(uuid.UUID(record.task_id))
+            except ValueError:
+                continue
+        result = await db.execute(select(Task).where(Task.id.in_(task_ids)))
+        inputs = {}
+        handoffs = set()
+        for task in result.scalars().all():
+            meta = (task.metadata_ or {}).get("shard_task", {})
+            values = await load_shard_input(meta, db, redis)
+            if values is not None:
+                inputs[str(task.id)] = values
+            if meta.get("input_hash") and meta.get("segment_start", 0) > 0:
+                handoffs.add(meta["input_hash"])
+        return inputs, handoffs
+
+    async def _audit(
+        self, pool, group: List[AuditRecord], inputs: Dict[str, np.ndarray]
+    ) -> List[Optional[str]]:
+        """Failure reason (or None) per record of one segment shape."""
+        first = group[0]
+        model = await get_model_by_checksum(first.model_checksum)
+        failures: List[Optional[str]] = [None] * len(group)
+        if model is None:
+            # That version was unloaded since submission; nothing to compare against.
+            self.stats.skipped += len(group)
+            return failures
+        # Records whose task was purged meanwhile are skipped
+        rows = [n for n, record in enumerate(group) if record.task_id in inputs]
+        self.stats.skipped += len(group) - len(rows)
+        if not rows:
+            return failures
+        audited = await pool.run(
+            get_proof_verifier().audit_segments,
+            model,
+            first.segment_start,
+            [inputs[group[n].task_id] for n in rows],
+            [
+                [decode_float32_array(blob) for blob in group[n].pre_activations]
+                for n in rows
+            ],
+        )
+        self.stats.audited += len(rows)
+        for n, failure in zip(rows, audited):
+            failures[n] = failure
+        return failures
+
+    async def _apply_failure(
+        self, db: AsyncSession, redis, record: AuditRecord, reason: str
+    ) -> None:
+        self.stats.failed += 1
+        self.stats.last_failure = reason
+        logger.warning(
+            "Deferred audit failed: task=%s session=%s (%s)",
+            record.task_id,
+            record.session_id,
+            reason,
+        )
+
+        if record.token_jti:
+            await redis.setex(
+                f"{REVOKED_TOKEN_PREFIX}{record.token_jti}",
+                settings.captcha_token_expiry_seconds,
+                reason[:200],
+            )
+
+        await db.execute(
+            update(Session)
+            .where(Session.id == uuid.UUID(record.session_id))
+            .values(status="failed")
+        )
+        await db.execute(
+            update(Task).where(Task.id == uuid.UUID(record.task_id)).values(status="failed")
+        )
+        if record.run_id:
+            await self._fail_run(db, redis, uuid.UUID(record.run_id))
+
+        await RiskScorer(redis).record_proof_outcome(
+            client_id=record.client_id,
+            site_key_prefix=record.site_key_prefix,
+            valid=False,
+            reason=f"deferred {reason}",
+            completion_time_ms=record.completion_time_ms,
+        )
+
+    async def _fail_run(self, db: AsyncSession, redis, run_id: uuid.UUID) -> None:
+        """Later layers were computed on top of the bad activation."""
+        result = await db.execute(select(PipelineRun).where(PipelineRun.id == run_id))
+        run = result.scalar_one_or_none()
+        if run is None:
+            return
+        if run.status == "completed":
+            # The final contributor's session recorded the run's label.
+            contributor_sessions = [
+                uuid.UUID(c["session_id"]) for c in run.contributors or []
+            ]
+            await db.execute(
+                update(Prediction)
+                .where(
+                    Prediction.sample_id == run.sample_id,
+                    Prediction.session_id.in_(contributor_sessions),
+                )
+                .values(is_valid=False)
+            )
+        consumed = run.activation_hash
+        run.status = "failed"
+        run.activation_hash = None
+        run.claimed_by_task = None
+        run.claimed_until = None
+        if consumed is not None:
+            await db.flush()
+            await get_activation_store().discard(consumed, db)
+        queue = ready_queue_for(redis)
+        if queue is not None:
+            await queue.discard(run)
+
+
+_worker: Optional[AuditWorker] = None
+
+
+def get_audit_worker() -> AuditWorker:
+    """Get or create the global audit worker."""
+    global _worker
+    if _worker is None:
+        _worker = AuditWorker()
+    return _worker
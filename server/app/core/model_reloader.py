@@ -0,0 +1,116 @@
+"""
+Hot model reload.
+
+ModelReloader polls the models directory and rolls retrained or newly added
+models in without a restart:
+
+1. ``ModelStore.scan`` loads every manifest whose checksum changed — verify,
+   wire payload cache — off the event loop, without publishing anything;
+2. the proof verifier derives (or loads from its disk cache) the new
+   version's secret projections, so its first submit is not a cold one;
+3. ``ModelStore.activate`` swaps the new version in as current.
+
+New runs start on the new version from then on. The previous version stays
+resident: in-flight PipelineRuns are pinned by ``model_version`` and keep
+being resumed, verified and audited against the weights they started on.
+Once no run of it is in progress any more, the version is unloaded along
+with its wire payloads and projections.
+
+Each pass also refreshes the store's pins from the same in-flight query, so
+a memory budget never evicts a version that runs are still pinned to.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.ml.model_store import ModelSpec, get_model_store
+from app.ml.proof_verifier import get_proof_verifier
+from app.models import PipelineRun
+from app.models.base import async_session_maker
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ModelReloader:
+    """Background task polling for model changes."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_maker,
+        interval_s: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = settings.model_reload_interval_s if interval_s is None else interval_s
+        self.reloads = 0
+        self.unloaded = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="model-reloader")
+            logger.info("Model reloader started (every %.0fs)", self.interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Model reloader stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Model reload pass failed")
+
+    async def run_once(self) -> List[ModelSpec]:
+        """Swap in changed models and unload drained ones; returns the new versions."""
+        store = get_model_store()
+        fresh = await asyncio.to_thread(store.scan)
+        if fresh:
+            await asyncio.to_thread(
+                get_proof_verifier().warm, fresh, settings.verify_workers
+            )
+            store.activate(fresh)
+            self.reloads += len(fresh)
+
+        async with self.session_factory() as db:
+            in_flight = await self._in_flight_versions(db)
+        # Pins keep memory-budget eviction off versions runs still need
+        store.set_pinned(in_flight)
+        self.unloaded += len(store.retire_drained(in_flight))
+        return fresh
+
+    async def _in_flight_versions(self, db: AsyncSession) -> Set[Tuple[str, str]]:
+        result = await db.execute(
+            select(PipelineRun.model_name, PipelineRun.model_version)
+            .where(PipelineRun.status == "in_progress")
+            .distinct()
+        )
+        return {(name, version) for name, version in result.all()}
+
+
+_reloader: Optional[ModelReloader] = None
+
+
+def get_model_reloader() -> ModelReloader:
+    """Get or create the global model reloader."""
+    global _reloader
+    if _reloader is None:
+        _reloader = ModelReloader()
+    return _reloader
@@ -12,23 +12,32 @@ which human verification later confirms into the golden dataset.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import io
 import logging
 import random
+import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from functools import partial
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
-from sqlalchemy import select, or_
+from redis.exceptions import RedisError
+from sqlalchemy import and_, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.core.run_queue import RunReadyQueue, ready_queue_for
+from app.ml.activation_store import get_activation_store
+from app.ml.input_cache import get_input_cache
 from app.ml.model_store import ModelSpec, get_model_store
 from app.ml.proof_verifier import VerificationReport
+from app.ml.task_ticket import TaskTicket
 from app.models import PipelineRun, Sample
+from app.utils.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -44,6 +53,27 @@ SEGMENT_LAYERS_BY_DIFFICULTY = {
 # A claimed segment is reassignable after this long without a submission.
 CLAIM_TTL_SECONDS = 90
 
+# Ready-queue pops per claim before starting a new run instead, and how long
+# a popped run whose row is busy (mid-advance/release) waits to be retried.
+QUEUE_CLAIM_ATTEMPTS = 3
+QUEUE_RETRY_SECONDS = 1
+
+# An empty ready queue is trusted; at most this often per process it is
+# confirmed against the database, so runs the sets lost are not stranded.
+QUEUE_RECONCILE_SECONDS = 30.0
+
+_queue_reconciled_at: Optional[float] = None
+
+
+def _queue_reconcile_due() -> bool:
+    global _queue_reconciled_at
+    now = time.monotonic()
+    last = _queue_reconciled_at
+    if last is not None and now - last < QUEUE_RECONCILE_SECONDS:
+        return False
+    _queue_reconciled_at = now
+    return True
+
 
 @dataclass
 class SegmentAssignment:
@@ -54,24 +84,44 @@ class SegmentAssignment:
     model: ModelSpec
     segment_start: int
     segment_end: int
-    input_vector: List[float]
+    # float32, read-only: shared with the input cache / the activation store
+    input_vector: np.ndarray
+    # Activation-store digest of input_vector
+    input_hash: str
 
     @property
     def layer_count(self) -> int:
         return self.segment_end - self.segment_start
 
 
+async def _resident_model(name: str, version: Optional[str] = None) -> ModelSpec:
+    """A model (version), loaded off the event loop if it is not resident."""
+    store = get_model_store()
+    lookup = store.get if version is None else partial(store.get_version, version=version)
+    if store.is_resident(name, version):
+        model = lookup(name)
+    else:
+        model = await asyncio.to_thread(lookup, name)
+    if model is None:
+        raise ValueError(f"Model {name} {version or ''} could not be loaded")
+    return model
+
+
 class PipelineCoordinator:
     """Claims, advances and completes distributed inference runs."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self._queue: Optional[RunReadyQueue] = None
+        self._queue_resolved = False
 
     async def claim_segment(
         self,
         task_id: uuid.UUID,
         difficulty: str,
         model: Optional[ModelSpec] = None,
+        model_name: Optional[str] = None,
+        claim_seconds: float = CLAIM_TTL_SECONDS,
     ) -> SegmentAssignment:
         """
         Claim the next unit of work for a new CAPTCHA task.
@@ -81,15 +131,19 @@ class PipelineCoordinator:
         otherwise. When no model is pinned, in-flight runs of ANY loaded model
         are continued and new runs rotate randomly across the model store, so
         every architecture (dense MLP, CNN, …) keeps labeling its dataset.
+        ``model_name`` narrows that to every available version of one model.
         """
         store = get_model_store()
         segment_layers = SEGMENT_LAYERS_BY_DIFFICULTY.get(difficulty, 1)
         now = datetime.utcnow()
+        claimed_until = now + timedelta(seconds=claim_seconds)
 
-        run = await self._find_claimable_run(model, now)
+        run = await self._find_claimable_run(model, now, claimed_until, model_name)
         if run is None:
             if model is None:
-                model = random.choice(store.list_models())
+                model = await _resident_model(
+                    model_name or random.choice(store.model_names())
+                )
             sample = await self._select_sample()
             run = PipelineRun(
                 sample_id=sample.id,
@@ -102,21 +156,25 @@ class PipelineCoordinator:
             )
             self.db.add(run)
             await self.db.flush()
+            # Enters the ready queue already leased to this claim
+            queue = await self._ready_queue()
+            if queue is not None:
+                await queue.schedule(run, claimed_until)
         else:
-            model = store.get(run.model_name)
+            # Pinned: a run started before a reload finishes on its version
+            model = await _resident_model(run.model_name, run.model_version)
             sample = await self._get_sample(run.sample_id)
+        # Until the reloader's next pass pins it from the database
+        store.pin(model.name, model.version, claim_seconds)
 
         segment_start = run.next_layer
         segment_end = min(segment_start + segment_layers, model.total_layers)
 
         run.claimed_by_task = task_id
-        run.claimed_until = now + timedelta(seconds=CLAIM_TTL_SECONDS)
+        run.claimed_until = claimed_until
         await self.db.flush()
 
-        if run.activation is not None:
-            input_vector = [float(v) for v in run.activation]
-        else:
-            input_vector = model.preprocess_sample(sample.data_blob, sample.data_url)
+        input_vector, input_hash = await self._segment_input(run, model, sample)
 
         logger.debug(
             "Claimed segment [%d,%d) of run %s for task %s",
@@ -132,42 +190,147 @@ class PipelineCoordinator:
             segment_start=segment_start,
             segment_end=segment_end,
             input_vector=input_vector,
+            input_hash=input_hash,
         )
 
+    async def _segment_input(
+        self, run: PipelineRun, model: ModelSpec, sample: Sample
+    ) -> Tuple[np.ndarray, str]:
+        """
+        Input of the run's next segment and its activation-store digest. A
+        handoff stored in the legacy JSON ``activation`` column moves into
+        the store here.
+        """
+        redis = await get_redis()
+        store = get_activation_store()
+        if run.activation_hash is not None:
+            values = await store.get(run.activation_hash, self.db, redis)
+            if values is None:
+                raise ValueError(
+                    f"Activation {run.activation_hash} of run {run.id} is missing"
+                )
+            return values, run.activation_hash
+        if run.activation is None:
+            values = await get_input_cache().input_vector(model, sample, redis)
+            return values, await store.put(values, self.db, redis)
+        values = np.asarray(run.activation, dtype=np.float32)
+        run.activation_hash = await store.put(values, self.db, redis)
+        run.activation = None
+        return values, run.activation_hash
+
+    async def _ready_queue(self) -> Optional[RunReadyQueue]:
+        if not self._queue_resolved:
+            self._queue = ready_queue_for(await get_redis())
+            self._queue_resolved = True
+        return self._queue
+
     async def _find_claimable_run(
-        self, model: Optional[ModelSpec], now: datetime
+        self,
+        model: Optional[ModelSpec],
+        now: datetime,
+        claimed_until: datetime,
+        model_name: Optional[str] = None,
     ) -> Optional[PipelineRun]:
         """
-        Oldest in-flight, unclaimed (or claim-expired) run. When ``model`` is
-        None, runs of any model still loaded at the same version qualify
-        (version-isolated: runs for rotated-out checkpoints are never resumed).
+        Earliest-ready in-flight, unclaimed (or claim-expired) run, locked
+        for this claim. When ``model`` is None, runs of any model version
+        still available qualify — including a version a hot reload is
+        retiring, so its runs drain — while runs of unloaded checkpoints are
+        never resumed. An empty ready queue is trusted, and confirmed against
+        the database every QUEUE_RECONCILE_SECONDS, so runs missing from
+        Redis are not stranded while claims stay off the table scan.
+        """
+        if model is not None:
+            versions = [(model.name, model.version)]
+        else:
+            versions = [
+                (name, version)
+                for name, version in get_model_store().available_versions()
+                if model_name is None or name == model_name
+            ]
+        if not versions:
+            return None
+
+        queue = await self._ready_queue()
+        if queue is not None:
+            try:
+                run = await self._claim_from_queue(queue, versions, now, claimed_until)
+                if run is not None or not _queue_reconcile_due():
+                    return run
+            except RedisError as exc:
+                logger.warning("Ready queue unavailable (%s); claiming from the database", exc)
+        run = await self._claim_from_db(versions, now)
+        if run is not None and queue is not None:
+            # Missing from the ready sets (lost write, flushed Redis): it
+            # rejoins them under this claim
+            await queue.schedule(run, claimed_until)
+        return run
+
+    def _claimable(self, now: datetime):
+        return select(PipelineRun).where(
+            PipelineRun.status == "in_progress",
+            or_(
+                PipelineRun.claimed_until.is_(None),
+                PipelineRun.claimed_until < now,
+            ),
+        )
+
+    async def _claim_from_queue(
+        self,
+        queue: RunReadyQueue,
+        versions: Sequence[Tuple[str, str]],
+        now: datetime,
+        claimed_until: datetime,
+    ) -> Optional[PipelineRun]:
+        """O(log n) pop from the Redis ready sets, confirmed against the row."""
+        for _ in range(QUEUE_CLAIM_ATTEMPTS):
+            entry = await queue.claim(versions, now, claimed_until)
+            if entry is None:
+                return None
+            result = await self.db.execute(
+                self._claimable(now)
+                .where(PipelineRun.id == entry.run_id)
+                .with_for_update(skip_locked=True)
+            )
+            run = result.scalar_one_or_none()
+            if run is not None:
+                return run
+            # Finished meanwhile, or mid-advance/release in another transaction
+            status = await self.db.scalar(
+                select(PipelineRun.status).where(PipelineRun.id == entry.run_id)
+            )
+            if status == "in_progress":
+                await queue.requeue(entry, now + timedelta(seconds=QUEUE_RETRY_SECONDS))
+            else:
+                await queue.drop(entry)
+        return None
+
+    async def _claim_from_db(
+        self, versions: Sequence[Tuple[str, str]], now: datetime
+    ) -> Optional[PipelineRun]:
+        """
+        Oldest claimable row, skipping locked ones: without Redis, or to
+        reconcile an empty ready queue.
         """
         query = (
-            select(PipelineRun)
+            self._claimable(now)
             .where(
-                PipelineRun.status == "in_progress",
                 or_(
-                    PipelineRun.claimed_until.is_(None),
-                    PipelineRun.claimed_until < now,
-                ),
+                    *(
+                        and_(
+                            PipelineRun.model_name == name,
+                            PipelineRun.model_version == version,
+                        )
+                        for name, version in versions
+                    )
+                )
             )
             .order_by(PipelineRun.updated_at.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
         )
-        if model is not None:
-            query = query.where(
-                PipelineRun.model_name == model.name,
-                PipelineRun.model_version == model.version,
-            )
-            result = await self.db.execute(query.limit(1))
-            return result.scalar_one_or_none()
-
-        store = get_model_store()
-        result = await self.db.execute(query.limit(20))
-        for run in result.scalars().all():
-            loaded = store.get(run.model_name)
-            if loaded is not None and loaded.version == run.model_version:
-                return run
-        return None
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
 
     async def _select_sample(self) -> Sample:
         """Least-served sample; creates a synthetic fallback if pool is empty."""
@@ -252,11 +415,17 @@ class PipelineCoordinator:
         run.claimed_by_task = None
         run.claimed_until = None
 
-        model = get_model_store().get(run.model_name)
+        model = get_model_store().get_version(run.model_name, run.model_version)
         completed = run.next_layer >= model.total_layers
+        queue = await self._ready_queue()
+        store = get_activation_store()
+        consumed = run.activation_hash
 
         if completed:
+            if queue is not None:
+                await queue.discard(run)
             run.status = "completed"
+            run.activation_hash = None
             run.activation = None
             run.predicted_label = report.predicted_label
             run.confidence = report.confidence
@@ -268,13 +437,76 @@ class PipelineCoordinator:
                 len(run.contributors),
             )
         else:
-            run.activation = [float(v) for v in np.asarray(report.final_activation)]
+            run.activation_hash = await store.put(
+                report.final_activation, self.db, await get_redis()
+            )
+            run.activation = None
+            if queue is not None:
+                await queue.schedule(run, datetime.utcnow())
 
         await self.db.flush()
+        if consumed not in (None, run.activation_hash) and not report.audit_pending:
+            # The handoff this segment consumed (a deferred audit still reads
+            # it, and discards it after). Segment-0 inputs are shared per
+            # sample and never handed off, so they stay.
+            await store.discard(consumed, self.db)
         return completed, run.predicted_label, run.confidence
 
-    async def release_claim(self, run: PipelineRun) -> None:
-        """Release a claim after a failed submission so others can take over."""
-        run.claimed_by_task = None
-        run.claimed_until = None
-        await self.db.flush()
+    async def extend_claim(
+        self,
+        run_id: uuid.UUID,
+        task_id: uuid.UUID,
+        segment_start: int,
+        model_name: str,
+        model_version: str,
+    ) -> Optional[ModelSpec]:
+        """
+        Turn a claim taken ahead of time (see task_prefetch) into a full one,
+        CLAIM_TTL_SECONDS from now. Returns the run's model, or None when the
+        claim was lost meanwhile — its lease ran out and another task took or
+        advanced the run — or that model version has been unloaded.
+        """
+        store = get_model_store()
+        if not store.is_available(model_name, model_version):
+            return None
+        claimed_until = datetime.utcnow() + timedelta(seconds=CLAIM_TTL_SECONDS)
+        result = await self.db.execute(
+            update(PipelineRun)
+            .where(
+                PipelineRun.id == run_id,
+                PipelineRun.claimed_by_task == task_id,
+                PipelineRun.next_layer == segment_start,
+                PipelineRun.status == "in_progress",
+            )
+            .values(claimed_until=claimed_until)
+        )
+        if not result.rowcount:
+            return None
+        queue = await self._ready_queue()
+        if queue is not None:
+            await queue.schedule_id(model_name, model_version, run_id, claimed_until)
+        model = await _resident_model(model_name, model_version)
+        store.pin(model.name, model.version, CLAIM_TTL_SECONDS)
+        return model
+
+    async def release_claim(self, ticket: TaskTicket) -> None:
+        """
+        Release a claim after a failed submission so others can take over —
+        if the ticket's task still holds it — without loading the run.
+        """
+        if ticket.run_id is None:
+            return
+        run_id = uuid.UUID(ticket.run_id)
+        result = await self.db.execute(
+            update(PipelineRun)
+            .where(
+                PipelineRun.id == run_id,
+                PipelineRun.claimed_by_task == uuid.UUID(ticket.task_id),
+            )
+            .values(claimed_by_task=None, claimed_until=None)
+        )
+        queue = await self._ready_queue()
+        if result.rowcount and queue is not None:
+            await queue.schedule_id(
+                ticket.model_name, ticket.model_version, run_id, datetime.utcnow()
+            )
@@ -0,0 +1,195 @@
+"""
+Redis ready queue for pipeline segment claims.
+
+Claimable in-flight runs are kept in one sorted set per model version
+(``pipeline_ready:{ready}:<model_name>:<model_version>``), scored by the
+time the run's next segment becomes claimable. The ``{ready}`` hash tag puts
+every set in one Redis Cluster slot, so the claim script may touch several.
+Claiming is a single Lua call that takes the lowest-scored ready member
+across the requested versions and re-scores it to the claim's expiry — so
+a claim that is never submitted puts the run back in line by itself, with
+no sweeper. That keeps a claim O(log n) per version and independent of the
+size of ``pipeline_runs``, and two concurrent inits can never pop the same
+run.
+
+The database stays the source of truth: the claimer still locks the popped
+row (``FOR UPDATE SKIP LOCKED``) and re-checks it, and entries for runs that
+finished meanwhile are dropped when they surface. Updates after a claim
+(advance, release, failure) are best-effort — if one is lost, the run comes
+back when its claim expires. The set is rebuilt from the database at
+startup, and PipelineCoordinator claims straight from the database when
+Redis is the in-memory fallback or unreachable. An empty queue is trusted,
+apart from a periodic reconcile against the database (a run the sets lost
+is claimed from its row and re-added).
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import PipelineRun
+from app.utils.redis_client import InMemoryRedis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Shared hash tag: the claim script reads several sets in one call
+READY_KEY_PREFIX = "pipeline_ready:{ready}:"
+REBUILD_BATCH_SIZE = 1000
+
+_EPOCH = datetime(1970, 1, 1)
+
+# KEYS: the ready sets to search. ARGV[1]: now, ARGV[2]: claim expiry.
+# Returns {key, run id} of the earliest-ready run, re-scored to the expiry.
+_CLAIM_SCRIPT = """
+local best_key, best_member, best_score
+for _, key in ipairs(KEYS) do
+  local head = redis.call('ZRANGEBYSCORE', key, '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, 1)
+  if head[1] and (best_score == nil or tonumber(head[2]) < best_score) then
+    best_key, best_member, best_score = key, head[1], tonumber(head[2])
+  end
+end
+if best_key == nil then
+  return false
+end
+redis.call('ZADD', best_key, ARGV[2], best_member)
+return {best_key, best_member}
+"""
+
+
+def _score(at: datetime) -> float:
+    """Ready-set score of a naive UTC time (as stored in ``claimed_until``)."""
+    return (at - _EPOCH).total_seconds()
+
+
+def _text(value) -> str:
+    return value.decode("ascii") if isinstance(value, bytes) else str(value)
+
+
+@dataclass(frozen=True)
+class QueuedRun:
+    """A run popped from a ready set; ``key`` is the set it came from."""
+
+    key: str
+    run_id: uuid.UUID
+
+
+class RunReadyQueue:
+    """Per-model-version sorted sets of claimable pipeline runs."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._claim = redis.register_script(_CLAIM_SCRIPT)
+
+    @staticmethod
+    def key(model_name: str, model_version: str) -> str:
+        return f"{READY_KEY_PREFIX}{model_name}:{model_version}"
+
+    async def claim(
+        self,
+        versions: Sequence[Tuple[str, str]],
+        now: datetime,
+        claim_until: datetime,
+    ) -> Optional[QueuedRun]:
+        """
+        Atomically take the earliest run ready at ``now`` among ``versions``,
+        leasing it until ``claim_until``. Raises RedisError when Redis fails.
+        """
+        if not versions:
+            return None
+        popped = await self._claim(
+            keys=[self.key(name, version) for name, version in versions],
+            args=[_score(now), _score(claim_until)],
+        )
+        if not popped:
+            return None
+        key, member = popped
+        try:
+            return QueuedRun(key=_text(key), run_id=uuid.UUID(_text(member)))
+        except ValueError:
+            await self.redis.zrem(key, member)
+            logger.error("Dropped malformed ready-queue entry %r from %s", member, key)
+            return None
+
+    async def schedule(self, run: PipelineRun, at: datetime) -> None:
+        """Make ``run`` claimable from ``at`` on (best-effort)."""
+        await self.schedule_id(run.model_name, run.model_version, run.id, at)
+
+    async def schedule_id(
+        self, model_name: str, model_version: str, run_id: uuid.UUID, at: datetime
+    ) -> None:
+        """``schedule`` for a run that is not loaded."""
+        key = self.key(model_name, model_version)
+        await self._best_effort("schedule", self.redis.zadd(key, {str(run_id): _score(at)}))
+
+    async def discard(self, run: PipelineRun) -> None:
+        """Forget a finished or failed run (best-effort)."""
+        key = self.key(run.model_name, run.model_version)
+        await self._best_effort("discard", self.redis.zrem(key, str(run.id)))
+
+    async def requeue(self, entry: QueuedRun, at: datetime) -> None:
+        """Put a popped entry back, claimable from ``at`` (best-effort)."""
+        await self._best_effort(
+            "requeue", self.redis.zadd(entry.key, {str(entry.run_id): _score(at)})
+        )
+
+    async def drop(self, entry: QueuedRun) -> None:
+        """Remove a popped entry whose run is no longer in progress (best-effort)."""
+        await self._best_effort("drop", self.redis.zrem(entry.key, str(entry.run_id)))
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Add every in-progress run to its ready set, scored by its claim
+        expiry (or as ready now). Entries already present keep their score.
+        Returns how many runs were scanned.
+        """
+        query = select(
+            PipelineRun.id,
+            PipelineRun.model_name,
+            PipelineRun.model_version,
+            PipelineRun.claimed_until,
+        ).where(PipelineRun.status == "in_progress")
+        result = await db.stream(query.execution_options(yield_per=REBUILD_BATCH_SIZE))
+        scanned = 0
+        async for rows in result.partitions():
+            pipe = self.redis.pipeline(transaction=False)
+            for run_id, name, version, claimed_until in rows:
+                score = _score(claimed_until) if claimed_until is not None else 0.0
+                pipe.zadd(self.key(name, version), {str(run_id): score}, nx=True)
+            await pipe.execute()
+            scanned += len(rows)
+        return scanned
+
+    async def _best_effort(self, operation: str, command) -> None:
+        try:
+            await command
+        except RedisError as exc:
+            # The run resurfaces when its current lease expires
+            logger.warning("Ready queue %s failed: %s", operation, exc)
+
+
+def ready_queue_for(redis) -> Optional[RunReadyQueue]:
+    """The ready queue over ``redis``, or None to claim from the database."""
+    if not settings.pipeline_ready_queue or redis is None or isinstance(redis, InMemoryRedis):
+        return None
+    return RunReadyQueue(redis)
+
+
+async def rebuild_ready_queue(redis, session_factory) -> int:
+    """Rebuild the ready sets at startup; returns how many runs were scanned."""
+    queue = ready_queue_for(redis)
+    if queue is None:
+        return 0
+    async with session_factory() as db:
+        scanned = await queue.rebuild(db)
+    logger.info("Pipeline ready queue rebuilt from %d in-progress runs", scanned)
+    return scanned
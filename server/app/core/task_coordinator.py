@@ -2,7 +2,7 @@
 
 import logging
 import uuid
-from typing import Tuple
+from typing import Optional, Tuple
 from dataclasses import dataclass, field
 
 from sqlalchemy import select, func
@@ -10,13 +10,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 
 from app.config import get_settings
-from app.models import Sample, Task
-from app.ml.model_store import encode_input_data, get_model_store
+from app.models import Task
+from app.ml.model_store import (
+    WIRE_FORMAT_JSON,
+    WIRE_FORMAT_JSON_REF,
+    ModelSpec,
+    get_model_store,
+)
 from app.core.pipeline import PipelineCoordinator, SegmentAssignment
+from app.core.task_prefetch import PrefetchedSegment, pop_prefetched
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Prefetched segments popped per init before claiming synchronously
+PREFETCH_BIND_ATTEMPTS = 3
+
 
 @dataclass
 class ShardTask:
@@ -27,7 +36,8 @@ class ShardTask:
     sample_id: str
     model_name: str
     model_version: str
-    shards: list = field(default_factory=list)
+    # Pre-serialized JSON array of ModelShardInfo objects (wire payload cache)
+    shards_json: bytes = b"[]"
     input_data: str = ""
     input_shape: list = field(default_factory=list)
     segment_start: int = 0
@@ -84,67 +94,110 @@ class TaskCoordinator:
         self,
         session_id: uuid.UUID,
         difficulty: str,
-    ) -> Tuple[Task, Sample, ShardTask]:
+    ) -> Tuple[Task, ShardTask]:
         """
         Assign the next pipeline segment to a session.
 
-        Returns (Task row, Sample, wire-ready ShardTask).
+        Takes a prefetched segment when one is buffered (see task_prefetch),
+        claiming synchronously otherwise. Returns (Task row, wire-ready
+        ShardTask).
         """
+        bound = await self._bind_prefetched(difficulty)
+        if bound is None:
+            task_id = uuid.uuid4()
+            assignment: SegmentAssignment = await self.pipeline.claim_segment(
+                task_id=task_id,
+                difficulty=difficulty,
+            )
+            bound = (
+                PrefetchedSegment.from_assignment(task_id, assignment),
+                assignment.model,
+            )
+        segment, model = bound
+        return await self._issue(session_id, difficulty, segment, model)
+
+    async def _bind_prefetched(
+        self, difficulty: str
+    ) -> Optional[Tuple[PrefetchedSegment, ModelSpec]]:
+        """Pop a prefetched segment and take over its claim, if one is still held."""
+        if settings.task_prefetch_depth <= 0:
+            return None
+        for _ in range(PREFETCH_BIND_ATTEMPTS):
+            segment = await pop_prefetched(self.redis, difficulty)
+            if segment is None:
+                return None
+            model = await self.pipeline.extend_claim(
+                run_id=uuid.UUID(segment.run_id),
+                task_id=uuid.UUID(segment.task_id),
+                segment_start=segment.segment_start,
+                model_name=segment.model_name,
+                model_version=segment.model_version,
+            )
+            if model is not None:
+                return segment, model
+            logger.debug("Prefetched claim on run %s was lost", segment.run_id)
+        return None
+
+    async def _issue(
+        self,
+        session_id: uuid.UUID,
+        difficulty: str,
+        segment: PrefetchedSegment,
+        model: ModelSpec,
+    ) -> Tuple[Task, ShardTask]:
+        """Build the Task row and wire payload for a claimed segment."""
         tier_config = self.DIFFICULTY_TIERS.get(
             difficulty, self.DIFFICULTY_TIERS["normal"]
         )
-        task_id = uuid.uuid4()
-
-        assignment: SegmentAssignment = await self.pipeline.claim_segment(
-            task_id=task_id,
-            difficulty=difficulty,
-        )
-        model = assignment.model
+        task_id = uuid.UUID(segment.task_id)
+        wire_cache = get_model_store().wire_cache
 
         shard_task = ShardTask(
             task_id=task_id,
-            run_id=str(assignment.run.id),
-            sample_id=str(assignment.sample.id),
+            run_id=segment.run_id,
+            sample_id=segment.sample_id,
             model_name=model.name,
             model_version=model.version,
-            shards=model.shard_payloads(
-                assignment.segment_start, assignment.segment_end
+            shards_json=wire_cache.segment_json(
+                model,
+                segment.segment_start,
+                segment.segment_end,
+                WIRE_FORMAT_JSON if settings.inline_shard_weights else WIRE_FORMAT_JSON_REF,
             ),
-            input_data=encode_input_data(assignment.input_vector),
-            input_shape=[1, len(assignment.input_vector)],
-            segment_start=assignment.segment_start,
+            input_data=segment.input_data,
+            input_shape=[1, segment.input_size],
+            segment_start=segment.segment_start,
             total_layers=model.total_layers,
-            expected_layers=assignment.layer_count,
+            expected_layers=segment.layer_count,
             difficulty=difficulty,
             expected_time_ms=tier_config["inference_time_ms"],
             labels=model.labels,
             model_checksum=model.checksum,
         )
 
-        known_label = (assignment.sample.metadata_ or {}).get("known_label")
-
         task = Task(
             id=task_id,
             session_id=session_id,
-            sample_id=assignment.sample.id,
+            sample_id=uuid.UUID(segment.sample_id),
             task_type="shard_inference",
             expected_time_ms=tier_config["inference_time_ms"],
-            is_known_sample=known_label is not None,
-            known_label=known_label,
+            is_known_sample=segment.known_label is not None,
+            known_label=segment.known_label,
             status="assigned",
             metadata_={
                 "shard_task": {
-                    "run_id": str(assignment.run.id),
-                    "sample_id": str(assignment.sample.id),
+                    "run_id": segment.run_id,
+                    "sample_id": segment.sample_id,
                     "model_name": model.name,
                     "model_version": model.version,
-                    "segment_start": assignment.segment_start,
-                    "expected_layers": assignment.layer_count,
+                    "segment_start": segment.segment_start,
+                    "expected_layers": segment.layer_count,
                     "difficulty": difficulty,
                     "model_checksum": model.checksum,
-                    # The exact input the client must have used; the verifier
-                    # replays projection checks against this.
-                    "input_vector": [float(v) for v in assignment.input_vector],
+                    # Activation-store digest of the exact input the client
+                    # was sent; the verifier replays projection checks
+                    # against it.
+                    "input_hash": segment.input_hash,
                 }
             },
         )
@@ -154,13 +207,13 @@ class TaskCoordinator:
 
         logger.debug(
             "Assigned segment [%d,%d) of run %s to task %s (difficulty %s)",
-            assignment.segment_start,
-            assignment.segment_end,
-            assignment.run.id,
+            segment.segment_start,
+            segment.segment_end,
+            segment.run_id,
             task_id,
             difficulty,
         )
-        return task, assignment.sample, shard_task
+        return task, shard_task
 
     async def get_task_stats(self) -> dict:
         """Get task assignment statistics."""
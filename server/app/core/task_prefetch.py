@@ -0,0 +1,259 @@
+"""
+Pre-built segment assignments for /captcha/init.
+
+Claiming a segment — a ready-queue pop or a new run on the least-served
+sample — then preprocessing the sample and storing its activation all used
+to sit on the init path. With ``task_prefetch_depth`` set, TaskPrefetcher
+keeps a Redis list per (difficulty tier, model) of assignments built ahead
+of time: the run claimed under a short lease (``task_prefetch_lease_seconds``)
+for a task id that does not exist yet, the input stored and encoded for the
+wire. Init then pops one, extends the lease to a full claim and binds it to
+the new session (TaskCoordinator.assign_task), so its latency no longer
+depends on model size or sample decoding.
+
+An entry whose lease ran out is dropped — on pop, or by the producer
+trimming its buffers — and its run simply becomes claimable again. When a
+buffer is empty, init claims synchronously as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.pipeline import (
+    SEGMENT_LAYERS_BY_DIFFICULTY,
+    PipelineCoordinator,
+    SegmentAssignment,
+)
+from app.ml.model_store import encode_input_data, get_model_store
+from app.models.base import async_session_maker
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PREFETCH_KEY_PREFIX = "task_prefetch:"
+
+# Entries this close to losing their lease are not handed out
+LEASE_MARGIN_SECONDS = 2.0
+
+
+@dataclass
+class PrefetchedSegment:
+    """A claimed segment waiting for a session; see TaskCoordinator.assign_task."""
+
+    task_id: str
+    run_id: str
+    sample_id: str
+    model_name: str
+    model_version: str
+    segment_start: int
+    segment_end: int
+    input_hash: str
+    # base64 little-endian float32, as sent to the client
+    input_data: str
+    input_size: int
+    known_label: Optional[str] = None
+    # Epoch seconds; the claim may be taken over after this
+    lease_until: float = 0.0
+
+    @classmethod
+    def from_assignment(
+        cls, task_id: uuid.UUID, assignment: SegmentAssignment, lease_until: float = 0.0
+    ) -> "PrefetchedSegment":
+        return cls(
+            task_id=str(task_id),
+            run_id=str(assignment.run.id),
+            sample_id=str(assignment.sample.id),
+            model_name=assignment.model.name,
+            model_version=assignment.model.version,
+            segment_start=assignment.segment_start,
+            segment_end=assignment.segment_end,
+            input_hash=assignment.input_hash,
+            input_data=encode_input_data(assignment.input_vector),
+            input_size=len(assignment.input_vector),
+            known_label=(assignment.sample.metadata_ or {}).get("known_label"),
+            lease_until=lease_until,
+        )
+
+    @property
+    def layer_count(self) -> int:
+        return self.segment_end - self.segment_start
+
+    def is_expiring(self, now: Optional[float] = None) -> bool:
+        return self.lease_until - LEASE_MARGIN_SECONDS <= (now or time.time())
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "PrefetchedSegment":
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return cls(**json.loads(raw))
+
+
+class PrefetchBuffer:
+    """Redis lists of prefetched segments, one per (tier, model)."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    @staticmethod
+    def key(difficulty: str, model_name: str) -> str:
+        return f"{PREFETCH_KEY_PREFIX}{difficulty}:{model_name}"
+
+    async def push(self, difficulty: str, segment: PrefetchedSegment) -> None:
+        await self.redis.rpush(self.key(difficulty, segment.model_name), segment.to_json())
+
+    async def pop(
+        self, difficulty: str, model_names: Sequence[str]
+    ) -> Optional[PrefetchedSegment]:
+        """Oldest live entry from the first non-empty buffer in ``model_names``."""
+        for name in model_names:
+            key = self.key(difficulty, name)
+            while True:
+                segment = self._parse(await self.redis.lpop(key))
+                if segment is None:
+                    break
+                if not segment.is_expiring():
+                    return segment
+        return None
+
+    async def trim(self, difficulty: str, model_name: str) -> int:
+        """Drop expired entries from the head of a buffer; returns how many."""
+        key = self.key(difficulty, model_name)
+        dropped = 0
+        while True:
+            raw = await self.redis.lpop(key)
+            if raw is None:
+                return dropped
+            segment = self._parse(raw)
+            if segment is not None and not segment.is_expiring():
+                # Oldest live entry: back in line (behind any pushed meanwhile)
+                await self.redis.rpush(key, raw)
+                return dropped
+            dropped += 1
+
+    async def depth(self, difficulty: str, model_name: str) -> int:
+        return int(await self.redis.llen(self.key(difficulty, model_name)))
+
+    @staticmethod
+    def _parse(raw: Any) -> Optional[PrefetchedSegment]:
+        if raw is None:
+            return None
+        try:
+            return PrefetchedSegment.from_json(raw)
+        except (TypeError, ValueError):
+            logger.error("Dropping malformed prefetched segment: %r", raw[:200])
+            return None
+
+
+async def pop_prefetched(redis, difficulty: str) -> Optional[PrefetchedSegment]:
+    """A prefetched segment for ``difficulty``, models in random order (as claims rotate)."""
+    names = get_model_store().model_names()
+    random.shuffle(names)
+    return await PrefetchBuffer(redis).pop(difficulty, names)
+
+
+@dataclass
+class PrefetchStats:
+    produced: int = 0
+    expired: int = 0
+    failures: int = 0
+
+
+class TaskPrefetcher:
+    """Background task keeping every (tier, model) buffer ``depth`` deep."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_maker,
+        depth: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        poll_interval_ms: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.depth = settings.task_prefetch_depth if depth is None else depth
+        self.lease_seconds = lease_seconds or settings.task_prefetch_lease_seconds
+        self.poll_interval = (
+            poll_interval_ms or settings.task_prefetch_poll_interval_ms
+        ) / 1000.0
+        self.stats = PrefetchStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self.depth > 0:
+            self._task = asyncio.create_task(self._run(), name="task-prefetcher")
+            logger.info("Task prefetcher started (depth %d)", self.depth)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Task prefetcher stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.failures += 1
+                logger.exception("Task prefetch pass failed")
+            await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Top up every buffer; returns how many segments were produced."""
+        buffer = PrefetchBuffer(await get_redis())
+        produced = 0
+        for difficulty in SEGMENT_LAYERS_BY_DIFFICULTY:
+            for name in get_model_store().model_names():
+                self.stats.expired += await buffer.trim(difficulty, name)
+                missing = self.depth - await buffer.depth(difficulty, name)
+                for _ in range(max(0, missing)):
+                    await buffer.push(difficulty, await self._build(difficulty, name))
+                    produced += 1
+        self.stats.produced += produced
+        return produced
+
+    async def _build(self, difficulty: str, model_name: str) -> PrefetchedSegment:
+        """Claim a segment under a short lease, committed before it is offered."""
+        task_id = uuid.uuid4()
+        async with self.session_factory() as db:
+            assignment = await PipelineCoordinator(db).claim_segment(
+                task_id=task_id,
+                difficulty=difficulty,
+                model_name=model_name,
+                claim_seconds=self.lease_seconds,
+            )
+            await db.commit()
+        return PrefetchedSegment.from_assignment(
+            task_id, assignment, lease_until=time.time() + self.lease_seconds
+        )
+
+
+_prefetcher: Optional[TaskPrefetcher] = None
+
+
+def get_task_prefetcher() -> TaskPrefetcher:
+    """Get or create the global task prefetcher."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = TaskPrefetcher()
+    return _prefetcher
@@ -4,6 +4,7 @@ PoUW CAPTCHA Server - Main Application
 FastAPI application entry point with middleware, routes, and lifecycle management.
 """
 
+import asyncio
 import json
 import logging
 from pathlib import Path
@@ -16,10 +17,18 @@ from fastapi.responses import JSONResponse, HTMLResponse, FileResponse
 from fastapi.exceptions import RequestValidationError
 
 from app.config import get_settings
-from app.api import captcha, verification, federated, metrics, sites
+from app.api import captcha, verification, federated, metrics, sites, shards
 from app.api.captcha import inference_log  # Import shared inference log
 from app.models import init_db, close_db
-from app.utils.redis_client import init_redis, close_redis
+from app.models.base import async_session_maker
+from app.utils.redis_client import get_redis, init_redis, close_redis
+from app.ml.verification_pool import shutdown_verification_pool
+from app.core.audit_queue import get_audit_worker
+from app.core.model_reloader import get_model_reloader
+from app.core.run_queue import rebuild_ready_queue
+from app.core.task_prefetch import get_task_prefetcher
+from app.ml.model_store import get_model_store
+from app.ml.proof_verifier import get_proof_verifier
 
 # Configure logging
 logging.basicConfig(
@@ -46,17 +55,53 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await init_redis()
     logger.info("Redis initialized")
 
+    try:
+        # Runs started while Redis was down (or flushed) rejoin the ready queue
+        await rebuild_ready_queue(await get_redis(), async_session_maker)
+    except Exception:
+        # Claims keep working; runs missing from the queue wait for a rebuild
+        logger.exception("Pipeline ready queue rebuild failed")
+
+    if settings.defer_audits:
+        get_audit_worker().start()
+
+    # Keeps segments claimed ahead of /captcha/init (no-op when the depth is 0)
+    get_task_prefetcher().start()
+
+    if settings.warm_projections:
+        # Serve traffic meanwhile; /ready holds the instance back until done
+        app.state.projection_warmup = asyncio.create_task(_warm_projections())
+
+    # Retrained models roll in without a restart (no-op when the interval is 0)
+    get_model_reloader().start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down PoUW CAPTCHA Server...")
 
+    await get_task_prefetcher().stop()
+    await get_model_reloader().stop()
+    await get_audit_worker().stop()
+    shutdown_verification_pool()
     await close_db()
     await close_redis()
 
     logger.info("Shutdown complete")
 
 
+async def _warm_projections() -> None:
+    """Precompute secret projections for every loaded model off the loop."""
+    verifier = get_proof_verifier()
+    try:
+        models = get_model_store().list_models()
+        await asyncio.to_thread(verifier.warm, models, settings.verify_workers)
+    except Exception as exc:
+        # Submits still derive projections lazily; /ready reports it as such
+        verifier.warm_error = str(exc) or type(exc).__name__
+        logger.exception("Projection warm-up failed")
+
+
 # Create FastAPI application
 app = FastAPI(
     title="PoUW CAPTCHA API",
@@ -154,11 +199,10 @@ async def health_check():
 # Ready check endpoint
 @app.get("/ready", tags=["Health"])
 async def ready_check():
-    """Readiness check: verifies DB, Redis and model store connectivity."""
+    """Readiness check: DB, Redis, model store and projection warm-up."""
     from sqlalchemy import text
     from app.models.base import engine
     from app.utils.redis_client import get_redis
-    from app.ml.model_store import get_model_store
 
     checks = {}
 
@@ -177,15 +221,36 @@ async def ready_check():
         checks["redis"] = f"error: {exc}"
 
     try:
-        models = get_model_store().list_models()
-        checks["models"] = f"ok ({len(models)} loaded)"
+        store = get_model_store()
+        checks["models"] = (
+            f"ok ({len(store.model_names())} available, "
+            f"{len(store.list_models())} resident)"
+        )
     except Exception as exc:
         checks["models"] = f"error: {exc}"
 
+    verifier = get_proof_verifier()
+    if not settings.warm_projections:
+        checks["projections"] = "ok (lazy)"
+    elif verifier.warmed:
+        checks["projections"] = f"ok ({verifier.warm_total} layers)"
+    elif verifier.warm_error is not None:
+        checks["projections"] = f"ok (lazy; warm-up failed: {verifier.warm_error})"
+    else:
+        checks["projections"] = (
+            f"warming ({verifier.warm_done}/{verifier.warm_total} layers)"
+        )
+
     all_ok = all(v.startswith("ok") for v in checks.values())
+    if all_ok:
+        status_label = "ready"
+    elif all(v.startswith(("ok", "warming")) for v in checks.values()):
+        status_label = "warming"
+    else:
+        status_label = "degraded"
     return JSONResponse(
         status_code=200 if all_ok else 503,
-        content={"status": "ready" if all_ok else "degraded", "checks": checks},
+        content={"status": status_label, "checks": checks},
     )
 
 
@@ -195,6 +260,7 @@ app.include_router(verification.router, prefix="/api/v1", tags=["Verification"])
 app.include_router(federated.router, prefix="/api/v1", tags=["Federated Learning"])
 app.include_router(metrics.router, prefix="/api/v1", tags=["Metrics"])
 app.include_router(sites.router, prefix="/api/v1", tags=["Sites"])
+app.include_router(shards.router, prefix="/api/v1", tags=["Shards"])
 
 
 # Root endpoint
@@ -0,0 +1,170 @@
+"""
+Content-addressed store of segment input activations.
+
+A segment's input — the preprocessed sample for segment 0, the verified
+handoff activation after that — used to be copied as JSON floats into every
+Task's shard metadata, next to the run that already held it. Instead each
+vector is stored once, as raw little-endian float32, under the SHA-256 of
+those bytes: tasks and pipeline runs keep only the digest. Reads hit Redis
+first (a TTL'd hot copy) and fall back to the ``activation_blobs`` table;
+identical vectors (a sample served again) share one row. A run's handoff
+row is deleted once no run points at it any more (see ``discard``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.ml.model_store import shard_input_vector
+from app.models import ActivationBlob, PipelineRun
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REDIS_KEY_PREFIX = "activation:"
+
+
+def canonical_bytes(values: "np.ndarray | Sequence[float]") -> bytes:
+    """The bytes a vector is addressed by: contiguous little-endian float32."""
+    return np.ascontiguousarray(values, dtype="<f4").tobytes()
+
+
+def activation_digest(values: "np.ndarray | Sequence[float]") -> str:
+    return hashlib.sha256(canonical_bytes(values)).hexdigest()
+
+
+class ActivationStore:
+    """Redis-fronted, database-backed float32 vectors keyed by digest."""
+
+    def __init__(self, redis_ttl_seconds: int = 600):
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.hits = 0
+        self.cold_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.discards = 0
+
+    @staticmethod
+    def redis_key(digest: str) -> str:
+        return f"{REDIS_KEY_PREFIX}{digest}"
+
+    async def put(
+        self, values: "np.ndarray | Sequence[float]", db: AsyncSession, redis=None
+    ) -> str:
+        """Store ``values`` (if new) in the caller's transaction; returns the digest."""
+        raw = canonical_bytes(values)
+        digest = hashlib.sha256(raw).hexdigest()
+        await self._insert(db, digest, raw)
+        self.writes += 1
+        await self._cache(redis, digest, raw)
+        return digest
+
+    async def get(
+        self, digest: str, db: AsyncSession, redis=None
+    ) -> Optional[np.ndarray]:
+        """The vector stored under ``digest`` as a read-only view, or None."""
+        if redis is not None and self.redis_ttl_seconds > 0:
+            try:
+                raw = await redis.get(self.redis_key(digest))
+            except Exception as exc:
+                logger.debug("Activation lookup failed: %s", exc)
+                raw = None
+            if raw is not None:
+                self.hits += 1
+                return np.frombuffer(raw, dtype="<f4")
+
+        blob = await db.get(ActivationBlob, digest)
+        if blob is None:
+            self.misses += 1
+            return None
+        self.cold_hits += 1
+        await self._cache(redis, digest, blob.data)
+        return np.frombuffer(blob.data, dtype="<f4")
+
+    async def discard(self, digest: str, db: AsyncSession) -> bool:
+        """
+        Delete a handoff no pipeline run points at any more, in the caller's
+        transaction; True if the row went. The Redis copy is left to expire,
+        so a stale submit of the segment still verifies within the TTL.
+        """
+        result = await db.execute(
+            delete(ActivationBlob).where(
+                ActivationBlob.digest == digest,
+                ~exists().where(PipelineRun.activation_hash == digest),
+            )
+        )
+        if not result.rowcount:
+            return False
+        self.discards += 1
+        return True
+
+    async def _insert(self, db: AsyncSession, digest: str, raw: bytes) -> None:
+        dialect = db.bind.dialect.name if db.bind is not None else ""
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            if await db.get(ActivationBlob, digest) is None:
+                db.add(ActivationBlob(digest=digest, data=raw))
+            return
+        # Concurrent puts of the same vector (one sample, many inits) race here
+        await db.execute(
+            insert(ActivationBlob)
+            .values(digest=digest, data=raw)
+            .on_conflict_do_nothing(index_elements=["digest"])
+        )
+
+    async def _cache(self, redis, digest: str, raw: bytes) -> None:
+        if redis is None or self.redis_ttl_seconds <= 0:
+            return
+        try:
+            await redis.setex(self.redis_key(digest), self.redis_ttl_seconds, raw)
+        except Exception as exc:
+            logger.debug("Activation cache store failed: %s", exc)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "cold_hits": self.cold_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "discards": self.discards,
+        }
+
+
+async def load_shard_input(
+    shard_meta: Dict[str, Any], db: AsyncSession, redis=None
+) -> Optional[np.ndarray]:
+    """
+    The segment input a task was issued with: by ``input_hash`` from the
+    store, or inline for tasks assigned before the store existed.
+    """
+    digest = shard_meta.get("input_hash")
+    if digest is not None:
+        return await get_activation_store().get(digest, db, redis)
+    return shard_input_vector(shard_meta)
+
+
+_store: Optional[ActivationStore] = None
+
+
+def get_activation_store() -> ActivationStore:
+    """Get or create the global activation store."""
+    global _store
+    if _store is None:
+        _store = ActivationStore(redis_ttl_seconds=settings.activation_cache_ttl_seconds)
+    return _store
+
+
+def reset_activation_store() -> None:
+    """Reset the global store (for tests)."""
+    global _store
+    _store = None
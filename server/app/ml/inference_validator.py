@@ -9,10 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 
 from app.config import get_settings
-from app.models import Task, Session, Prediction
+from app.models import Prediction
 from app.schemas import PredictionData, TimingData, InferenceProofData
-from app.ml.model_store import get_model_store
+from app.ml.model_store import decode_float32_array, get_model_by_checksum, get_model_store
+from app.ml.projection_batcher import get_projection_batcher
 from app.ml.proof_verifier import VerificationReport, get_proof_verifier
+from app.ml.task_ticket import TaskTicket
+from app.ml.verification_pool import get_verification_pool
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -47,14 +50,15 @@ class InferenceValidator:
 
     async def validate_submission(
         self,
-        task: Task,
+        ticket: TaskTicket,
         proof: Optional[InferenceProofData],
         prediction: Optional[PredictionData],
         timing: TimingData,
     ) -> VerificationReport:
         """
-        Validate a segment submission. Returns the verifier report; the
-        report's final_activation/prediction fields drive the pipeline.
+        Validate a segment submission against the task ticket it was issued
+        with. Returns the verifier report; the report's
+        final_activation/prediction fields drive the pipeline.
         """
         report = VerificationReport(valid=False)
 
@@ -62,33 +66,33 @@ class InferenceValidator:
             report.reason = "missing inference proof"
             return report
 
-        if not self._validate_timing(task, timing):
+        if not self._validate_timing(ticket, timing):
             report.reason = "implausible timing"
             return report
 
-        shard_meta = (task.metadata_ or {}).get("shard_task", {})
-        model_name = shard_meta.get("model_name")
-        sample_id = shard_meta.get("sample_id")
-        segment_start = shard_meta.get("segment_start", 0)
-        expected_layers = shard_meta.get("expected_layers", 0)
-        input_vector = shard_meta.get("input_vector")
+        model_name = ticket.model_name
+        sample_id = ticket.sample_id
+        segment_start = ticket.segment_start
+        expected_layers = ticket.layer_count
+        input_vector = await ticket.input_vector(self.db, self.redis)
 
         if not model_name or input_vector is None:
             report.reason = "task missing shard metadata"
             return report
 
-        model = get_model_store().get(model_name)
-        if model is None:
-            report.reason = f"unknown model {model_name}"
-            return report
-
-        if shard_meta.get("model_checksum") != model.checksum:
-            # Model was retrained/rotated between assignment and submission.
-            report.reason = "model version rotated; please retry"
+        # The exact version the task was issued for, even if a hot reload
+        # has made a newer one current since
+        model = await get_model_by_checksum(ticket.model_checksum)
+        if model is None or model.name != model_name:
+            if model_name not in get_model_store().model_names():
+                report.reason = f"unknown model {model_name}"
+            else:
+                # That version was unloaded between assignment and submission.
+                report.reason = "model version rotated; please retry"
             return report
 
         # Bind the proof to the exact task it was issued for
-        if proof.task_id != str(task.id):
+        if proof.task_id != ticket.task_id:
             report.reason = "proof task mismatch"
             return report
         if proof.sample_id != sample_id:
@@ -116,22 +120,43 @@ class InferenceValidator:
                 report.reason = "prediction hash mismatch"
                 return report
 
+        if proof.pre_activations_b64 is not None:
+            try:
+                pre_activations = [
+                    decode_float32_array(blob) for blob in proof.pre_activations_b64
+                ]
+            except ValueError:
+                report.reason = "malformed pre-activation encoding"
+                return report
+        else:
+            pre_activations = proof.pre_activations
+
         verifier = get_proof_verifier()
-        report = verifier.verify_segment(
+        segment = dict(
             model=model,
             segment_start=segment_start,
             input_vector=input_vector,
-            pre_activations=proof.pre_activations,
+            pre_activations=pre_activations,
             output_hashes=proof.output_hashes,
             proof_hash=proof.proof_hash,
             task_id=proof.task_id,
             sample_id=proof.sample_id,
             prediction_hash=prediction_hash,
+            proof_version=proof.proof_version,
+            fused=ticket.difficulty in settings.fused_projection_tiers,
+            defer_audit=settings.defer_audits,
         )
+        # Verification is CPU-bound; keep it off the event loop
+        pool = get_verification_pool()
+        batcher = get_projection_batcher()
+        if batcher is not None:
+            report = await verifier.verify_segment_batched(batcher, pool, **segment)
+        else:
+            report = await pool.run(verifier.verify_segment, **segment)
 
         if not report.valid:
             logger.warning(
-                "Submission rejected for task %s: %s", task.id, report.reason
+                "Submission rejected for task %s: %s", ticket.task_id, report.reason
             )
             return report
 
@@ -147,9 +172,9 @@ class InferenceValidator:
 
         return report
 
-    def _validate_timing(self, task: Task, timing: TimingData) -> bool:
+    def _validate_timing(self, ticket: TaskTicket, timing: TimingData) -> bool:
         """Reject submissions faster than physically plausible."""
-        expected_ms = task.expected_time_ms
+        expected_ms = ticket.expected_time_ms
         min_time = expected_ms * 0.1
 
         if timing.inference_ms < min_time:
@@ -173,7 +198,7 @@ class InferenceValidator:
 
     async def should_require_verification(
         self,
-        session: Session,
+        difficulty_tier: str,
         prediction: Prediction,
     ) -> bool:
         """
@@ -182,8 +207,8 @@ class InferenceValidator:
         Only called when a pipeline run completes. Verified labels accumulate
         toward golden-dataset consensus and eventually retraining.
         """
-        if session.difficulty_tier == "bot_like":
+        if difficulty_tier == "bot_like":
             return True
-        if session.difficulty_tier == "suspicious":
+        if difficulty_tier == "suspicious":
             return random.random() < 0.5
         return random.random() < settings.verification_rate
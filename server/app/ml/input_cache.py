@@ -0,0 +1,131 @@
+"""
+LRU cache of preprocessed sample inputs.
+
+Every segment-0 claim turns a sample into its model input vector — for
+images a PIL decode, grayscale conversion, resize and normalization — and
+samples are served over and over (``Sample.times_served``). The result only
+depends on the sample bytes and the model's input contract, so it is cached
+as a compact float32 array under ``(data_hash, input_shape, preprocessing)``:
+in a bounded per-process LRU, and optionally in Redis so workers share what
+any one of them decoded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.ml.model_store import ModelSpec
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REDIS_KEY_PREFIX = "preprocessed_input:"
+
+InputKey = Tuple[str, Tuple[int, ...], str]
+
+
+class PreprocessedInputCache:
+    """Bounded LRU of read-only float32 input vectors."""
+
+    def __init__(self, max_entries: int = 4096, redis_ttl_seconds: int = 0):
+        self.max_entries = max(1, max_entries)
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: OrderedDict[InputKey, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data_hash: str, model: ModelSpec) -> InputKey:
+        return (data_hash, tuple(model.input_shape), model.preprocessing)
+
+    @staticmethod
+    def redis_key(key: InputKey) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        return f"{REDIS_KEY_PREFIX}{digest}"
+
+    def get(self, key: InputKey) -> Optional[np.ndarray]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: InputKey, values: np.ndarray) -> np.ndarray:
+        values = np.ascontiguousarray(values, dtype=np.float32)
+        values.flags.writeable = False  # shared by every request that hits it
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    async def input_vector(self, model: ModelSpec, sample, redis=None) -> np.ndarray:
+        """The model input for ``sample``; read-only, do not modify."""
+        key = self.key(sample.data_hash, model)
+        values = self.get(key)
+        if values is not None:
+            self.hits += 1
+            return values
+
+        use_redis = redis is not None and self.redis_ttl_seconds > 0
+        if use_redis:
+            try:
+                raw = await redis.get(self.redis_key(key))
+            except Exception as exc:
+                logger.debug("Preprocessed input lookup failed: %s", exc)
+                raw = None
+            if raw is not None and len(raw) == model.input_size * 4:
+                self.redis_hits += 1
+                return self.put(key, np.frombuffer(raw, dtype="<f4"))
+
+        self.misses += 1
+        values = self.put(
+            key, model.preprocess_sample_array(sample.data_blob, sample.data_url)
+        )
+        if use_redis:
+            try:
+                await redis.setex(
+                    self.redis_key(key), self.redis_ttl_seconds, values.astype("<f4").tobytes()
+                )
+            except Exception as exc:
+                logger.debug("Preprocessed input store failed: %s", exc)
+        return values
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+
+_cache: Optional[PreprocessedInputCache] = None
+
+
+def get_input_cache() -> PreprocessedInputCache:
+    """Get or create the global preprocessed-input cache."""
+    global _cache
+    if _cache is None:
+        _cache = PreprocessedInputCache(
+            max_entries=settings.input_cache_entries,
+            redis_ttl_seconds=settings.input_cache_redis_ttl_seconds,
+        )
+    return _cache
+
+
+def reset_input_cache() -> None:
+    """Reset the global cache (for tests)."""
+    global _cache
+    _cache = None
@@ -38,19 +38,17 @@ class ModelManager:
     def _models(self) -> Dict[str, ModelInfo]:
         store = get_model_store()
         models = {}
-        for spec in store.list_models():
-            weight_bytes = sum(
-                layer.weights.nbytes + layer.biases.nbytes for layer in spec.layers
-            )
-            models[spec.name] = ModelInfo(
-                name=spec.name,
-                version=spec.version,
-                url=f"{settings.model_cdn_url}/{spec.name}/manifest.json",
-                checksum=spec.checksum,
-                input_shape=spec.input_shape,
-                output_labels=spec.labels,
-                size_bytes=weight_bytes,
-                task_type=spec.task_type,
+        # From the manifests, so listing never loads evicted models
+        for entry in store.catalog():
+            models[entry.name] = ModelInfo(
+                name=entry.name,
+                version=entry.version,
+                url=f"{settings.model_cdn_url}/{entry.name}/manifest.json",
+                checksum=entry.checksum,
+                input_shape=entry.input_shape,
+                output_labels=entry.labels,
+                size_bytes=entry.weight_bytes,
+                task_type=entry.task_type,
             )
         return models
 
@@ -1,8 +1,9 @@
 """
 Plug-and-play model store.
 
-Loads trained models from ``models/<name>/manifest.json`` + ``weights.npz``.
-Each model declares its layers, labels, preprocessing and REAL SHA-256
+Loads trained models from ``models/<name>/manifest.json`` + ``weights.npz``
+(or a memory-mapped weights container, see scripts/pack_model.py). Each
+model declares its layers, labels, preprocessing and REAL SHA-256
 checksums (one per layer over the exact wire bytes, plus a model checksum
 that is a hash of the layer checksums, so clients holding only a segment of
 the model can still verify integrity).
@@ -20,7 +21,8 @@ input. Because every provable layer is affine, the same projection identity
     r · z  =  (Lᵀ r) · x  +  r · b
 
 verifies dense and convolutional work alike, so new architectures only need
-to implement ``forward`` and ``project``.
+to implement ``forward_batch`` and ``project_batch`` (over stacked inputs and
+projection vectors; conv2d runs both as a single im2col GEMM).
 
 Adding a new dataset/model to the system means dropping a new manifest +
 weights directory into ``models/`` — no code changes required for any
@@ -29,19 +31,35 @@ combination of dense and conv2d layers.
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import gzip
 import hashlib
 import io
+import hmac
 import json
 import logging
+import os
 import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from PIL import Image
 
+from app.config import get_settings
+
+try:  # optional: brotli variants are only built when the module is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on deployment extras
+    brotli = None
+
 logger = logging.getLogger(__name__)
 
 # models/ directory at the repository root (server/ is the CWD in dev)
@@ -60,15 +78,25 @@ def apply_post_ops(z: np.ndarray, post_ops: Sequence[dict]) -> np.ndarray:
     client computed — so the server can run them during verification without
     giving up the compute asymmetry. Mirrored exactly by the browser client.
     """
+    return apply_post_ops_batch(np.asarray(z)[None], post_ops)[0]
+
+
+def apply_post_ops_batch(z: np.ndarray, post_ops: Sequence[dict]) -> np.ndarray:
+    """
+    apply_post_ops over a batch: (N, n) flat pre-activations -> (N, m). Every
+    op acts per row (softmax normalises each sample, maxpool2d pools each
+    sample's channels).
+    """
     h = np.asarray(z, dtype=np.float64)
+    n = h.shape[0]
     for op in post_ops:
         kind = op["op"]
         if kind == "relu":
             h = np.maximum(h, 0.0)
         elif kind == "softmax":
-            shifted = h - np.max(h)
+            shifted = h - np.max(h, axis=1, keepdims=True)
             e = np.exp(shifted)
-            h = e / e.sum()
+            h = e / e.sum(axis=1, keepdims=True)
         elif kind == "sigmoid":
             h = 1.0 / (1.0 + np.exp(-h))
         elif kind == "tanh":
@@ -77,11 +105,11 @@ def apply_post_ops(z: np.ndarray, post_ops: Sequence[dict]) -> np.ndarray:
             c, height, width = op["shape"]
             pool = int(op.get("pool", 2))
             oh, ow = height // pool, width // pool
-            t = h.reshape(c, height, width)[:, : oh * pool, : ow * pool]
-            t = t.reshape(c, oh, pool, ow, pool)
-            h = t.max(axis=(2, 4)).reshape(-1)
+            t = h.reshape(n, c, height, width)[:, :, : oh * pool, : ow * pool]
+            t = t.reshape(n, c, oh, pool, ow, pool)
+            h = t.max(axis=(3, 5)).reshape(n, -1)
         elif kind == "flatten":
-            h = h.reshape(-1)
+            h = h.reshape(n, -1)
         elif kind == "linear":
             pass
         else:
@@ -100,10 +128,155 @@ def post_ops_output_size(input_size: int, post_ops: Sequence[dict]) -> int:
     return size
 
 
+# ---------------------------------------------------------------------------
+# Weight encodings: how a layer's weights travel to the client
+# ---------------------------------------------------------------------------
+
+# Declared per layer in the manifest as ``weight_encoding``. The layer's
+# checksum covers the encoded wire bytes, and its in-memory ``weights`` are
+# the DEQUANTIZED values — exactly what the client executes — so forward
+# passes and secret projections stay exact for quantized layers.
+WEIGHTS_FLOAT32 = "float32"
+WEIGHTS_FLOAT16 = "float16"
+# Symmetric per-output-channel int8 with a float32 scale per channel
+WEIGHTS_INT8 = "int8"
+WEIGHT_ENCODINGS = (WEIGHTS_FLOAT32, WEIGHTS_FLOAT16, WEIGHTS_INT8)
+
+
+def quantize_int8(weights: np.ndarray, channel_axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-channel symmetric int8 quantization: returns (q, scales) with
+    ``weights ≈ q * scales`` broadcast along ``channel_axis``.
+    """
+    w = np.moveaxis(np.asarray(weights, dtype=np.float32), channel_axis, 0)
+    peak = np.abs(w.reshape(len(w), -1)).max(axis=1)
+    scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+    q = np.clip(np.rint(w / _channel_view(scales, w.ndim, 0)), -127, 127).astype(np.int8)
+    return np.moveaxis(q, 0, channel_axis), scales
+
+
+def dequantize_int8(q: np.ndarray, scales: np.ndarray, channel_axis: int) -> np.ndarray:
+    """float32 weights of an int8 layer (one float32 multiply per weight)."""
+    scales = np.asarray(scales, dtype=np.float32)
+    return np.asarray(q, dtype=np.int8).astype(np.float32) * _channel_view(
+        scales, q.ndim, channel_axis
+    )
+
+
+def _channel_view(scales: np.ndarray, ndim: int, axis: int) -> np.ndarray:
+    shape = [1] * ndim
+    shape[axis] = -1
+    return scales.reshape(shape)
+
+
+def encode_layer_wire(
+    encoding: str,
+    weights: np.ndarray,
+    biases: np.ndarray,
+    scales: Optional[np.ndarray] = None,
+) -> bytes:
+    """
+    Wire bytes of a layer from its weights in wire (output-major) order:
+
+    * float32 — weights ``<f4``, then biases ``<f4``;
+    * float16 — weights ``<f2``, then biases ``<f4``;
+    * int8 — per-output-channel scales ``<f4``, biases ``<f4``, then the
+      weights as int8 (the float parts lead so they stay 4-byte aligned).
+    """
+    bias_bytes = np.ascontiguousarray(biases, dtype="<f4").tobytes()
+    if encoding == WEIGHTS_FLOAT32:
+        return np.ascontiguousarray(weights, dtype="<f4").tobytes() + bias_bytes
+    if encoding == WEIGHTS_FLOAT16:
+        return np.ascontiguousarray(weights, dtype="<f2").tobytes() + bias_bytes
+    if encoding == WEIGHTS_INT8:
+        rows = np.asarray(weights, dtype=np.float32).reshape(len(scales), -1)
+        # weights are q * scale in float32, so this division recovers q exactly
+        q = np.rint(rows / scales[:, None]).astype(np.int8)
+        return np.ascontiguousarray(scales, dtype="<f4").tobytes() + bias_bytes + q.tobytes()
+    raise ValueError(f"unknown weight encoding {encoding!r}")
+
+
+def _wire_arrays(
+    encoding: str, block: np.ndarray, weight_count: int, bias_count: int
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Inverse of ``encode_layer_wire`` over a byte buffer, without copying:
+    (weights in wire order as stored — f4, f2 or i1 —, biases, scales).
+    """
+    if encoding == WEIGHTS_INT8:
+        head = 4 * bias_count
+        scales = np.frombuffer(block, dtype="<f4", count=bias_count)
+        biases = np.frombuffer(block, dtype="<f4", count=bias_count, offset=head)
+        weights = np.frombuffer(block, dtype=np.int8, count=weight_count, offset=2 * head)
+        return weights, biases, scales
+    dtype = {WEIGHTS_FLOAT32: "<f4", WEIGHTS_FLOAT16: "<f2"}.get(encoding)
+    if dtype is None:
+        raise ValueError(f"unknown weight encoding {encoding!r}")
+    weights = np.frombuffer(block, dtype=dtype, count=weight_count)
+    biases = np.frombuffer(
+        block, dtype="<f4", count=bias_count, offset=weights.nbytes
+    )
+    return weights, biases, None
+
+
+def sparse_index_dtype(input_size: int) -> str:
+    """Column index dtype on the wire: uint16 whenever the inputs fit it."""
+    return "<u2" if input_size <= 1 << 16 else "<i4"
+
+
+def encode_sparse_wire(
+    values: np.ndarray,
+    biases: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    input_size: int,
+) -> bytes:
+    """
+    Wire bytes of a CSR layer (rows are output units): values ``<f4``,
+    biases ``<f4``, row pointers ``<i4`` (output + 1), then the column
+    indices as ``sparse_index_dtype`` — the 4-byte parts lead so they stay
+    aligned. Scales with the non-zeros instead of input × output.
+    """
+    return (
+        np.ascontiguousarray(values, dtype="<f4").tobytes()
+        + np.ascontiguousarray(biases, dtype="<f4").tobytes()
+        + np.ascontiguousarray(indptr, dtype="<i4").tobytes()
+        + np.ascontiguousarray(indices, dtype=sparse_index_dtype(input_size)).tobytes()
+    )
+
+
+def _sparse_wire_arrays(
+    block: np.ndarray, nnz: int, output_size: int, input_size: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Inverse of ``encode_sparse_wire`` without copying: (values, biases, indptr, indices)."""
+    values = np.frombuffer(block, dtype="<f4", count=nnz)
+    offset = values.nbytes
+    biases = np.frombuffer(block, dtype="<f4", count=output_size, offset=offset)
+    offset += biases.nbytes
+    indptr = np.frombuffer(block, dtype="<i4", count=output_size + 1, offset=offset)
+    offset += indptr.nbytes
+    indices = np.frombuffer(
+        block, dtype=sparse_index_dtype(input_size), count=nnz, offset=offset
+    )
+    return values, biases, indptr, indices
+
+
 # ---------------------------------------------------------------------------
 # Provable layers
 # ---------------------------------------------------------------------------
 
+def im2col(x: np.ndarray, kh: int, kw: int) -> np.ndarray:
+    """
+    (N, C, H, W) -> (N, OH*OW, C*kh*kw) patch matrix for a valid stride-1
+    convolution, so the convolution is one GEMM against the (out_ch, C*kh*kw)
+    kernel matrix. Built from a strided window view: the only copy is the
+    final reshape. Shared with scripts/train_mnist_cnn_numpy.py.
+    """
+    windows = sliding_window_view(x, (kh, kw), axis=(2, 3))  # (N, C, OH, OW, kh, kw)
+    n, c, oh, ow = windows.shape[:4]
+    return windows.transpose(0, 2, 3, 1, 4, 5).reshape(n, oh * ow, c * kh * kw)
+
+
 @dataclass
 class DenseLayer:
     """A dense affine layer ``z = x·W + b`` with its wire-format checksum."""
@@ -117,6 +290,11 @@ class DenseLayer:
     biases: np.ndarray  # shape (output_size,), float32
     checksum: str
     post_ops: List[dict] = field(default_factory=list)
+    weight_encoding: str = WEIGHTS_FLOAT32
+    # int8 only: one float32 scale per output unit
+    scales: Optional[np.ndarray] = None
+    # Read-only view of the wire bytes when loaded from a weights container
+    wire_buffer: Optional[memoryview] = field(default=None, repr=False, compare=False)
 
     layer_type = "dense"
 
@@ -136,6 +314,10 @@ class DenseLayer:
 
     def forward(self, x: np.ndarray) -> np.ndarray:
         """Reference pre-activation (float64). Used for audits/tests only."""
+        return self.forward_batch(np.asarray(x)[None])[0]
+
+    def forward_batch(self, x: np.ndarray) -> np.ndarray:
+        """Pre-activations (N, out) of a batch of inputs (N, in)."""
         return np.asarray(x, dtype=np.float64) @ self.weights.astype(
             np.float64
         ) + self.biases.astype(np.float64)
@@ -145,35 +327,48 @@ class DenseLayer:
         Freivalds precomputation: return (s, r·b) with s = Lᵀr = W·r so that
         r·z = s·x + r·b for any honest z = x·W + b.
         """
-        w = self.weights.astype(np.float64)
-        b = self.biases.astype(np.float64)
-        return w @ r, float(r @ b)
+        s, rb = self.project_batch(np.asarray(r)[None])
+        return s[0], float(rb[0])
 
-    def wire_payload(self) -> dict:
+    def project_batch(self, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """project() for K stacked vectors (K, out): returns (S (K, in), rb (K,))."""
+        r = np.asarray(r, dtype=np.float64)
+        return r @ self.weights.astype(np.float64).T, r @ self.biases.astype(np.float64)
+
+    def wire_payload(self, inline: bool = True) -> dict:
         """
         JSON payload the browser executes. Weights are flattened in
         (output, input) row-major order to match the client's
-        ``weights[o * inputSize + i]`` indexing.
+        ``weights[o * inputSize + i]`` indexing. With ``inline=False`` the
+        weights are left out and fetched by checksum (see ``wire_bytes``).
         """
-        return {
+        payload = {
             "name": self.name,
             "type": "dense",
-            "weights": np.ascontiguousarray(self.weights.T, dtype=np.float32)
-            .flatten()
-            .tolist(),
-            "biases": self.biases.astype(np.float32).tolist(),
             "inputShape": [1, self.input_size],
             "outputShape": [1, self.output_size],
             "activation": self.activation,
             "postOps": list(self.post_ops),
         }
+        if inline and self.weight_encoding == WEIGHTS_FLOAT32:
+            payload["weights"] = (
+                np.ascontiguousarray(self.weights.T, dtype=np.float32)
+                .flatten()
+                .tolist()
+            )
+            payload["biases"] = self.biases.astype(np.float32).tolist()
+            return payload
+        return _encoded_payload(self, payload, inline)
+
+    def wire_bytes(self) -> bytes:
+        """Exact bytes a client receives (see ``encode_layer_wire``)."""
+        return encode_layer_wire(
+            self.weight_encoding, self.weights.T, self.biases, self.scales
+        )
 
     def compute_checksum(self) -> str:
-        """SHA-256 over the exact float32 LE bytes a client receives."""
-        h = hashlib.sha256()
-        h.update(np.ascontiguousarray(self.weights.T, dtype="<f4").tobytes())
-        h.update(np.ascontiguousarray(self.biases, dtype="<f4").tobytes())
-        return h.hexdigest()
+        """SHA-256 over the exact wire bytes a client receives."""
+        return hashlib.sha256(_wire_view(self)).hexdigest()
 
 
 @dataclass
@@ -198,6 +393,11 @@ class Conv2DLayer:
     biases: np.ndarray  # (out_ch,), float32
     checksum: str
     post_ops: List[dict] = field(default_factory=list)
+    weight_encoding: str = WEIGHTS_FLOAT32
+    # int8 only: one float32 scale per output channel
+    scales: Optional[np.ndarray] = None
+    # Read-only view of the wire bytes when loaded from a weights container
+    wire_buffer: Optional[memoryview] = field(default=None, repr=False, compare=False)
 
     layer_type = "conv2d"
 
@@ -231,18 +431,21 @@ class Conv2DLayer:
 
     def forward(self, x: np.ndarray) -> np.ndarray:
         """Reference pre-activation (float64, flat). Audits/tests only."""
-        c, height, width = self.input_shape
+        return self.forward_batch(np.asarray(x)[None])[0]
+
+    def forward_batch(self, x: np.ndarray) -> np.ndarray:
+        """
+        Pre-activations (N, out) of a batch given flat (N, in) or (N, C, H, W):
+        one im2col GEMM for the whole batch.
+        """
         oc, oh, ow = self.output_shape
         kh, kw = self.kernel
-        x3 = np.asarray(x, dtype=np.float64).reshape(c, height, width)
-        w = self.weights.astype(np.float64)
-        z = np.zeros((oc, oh, ow))
-        for u in range(kh):
-            for v in range(kw):
-                patch = x3[:, u : u + oh, v : v + ow]
-                z += np.tensordot(w[:, :, u, v], patch, axes=(1, 0))
-        z += self.biases.astype(np.float64)[:, None, None]
-        return z.reshape(-1)
+        x4 = np.asarray(x, dtype=np.float64).reshape(-1, *self.input_shape)
+        cols = im2col(x4, kh, kw)  # (N, OH*OW, C*kh*kw)
+        z = cols @ self.weights.astype(np.float64).reshape(oc, -1).T
+        z += self.biases.astype(np.float64)
+        # (N, OH*OW, OC) -> channel-major (N, OC, OH, OW), flattened
+        return z.transpose(0, 2, 1).reshape(len(x4), oc * oh * ow)
 
     def project(self, r: np.ndarray) -> Tuple[np.ndarray, float]:
         """
@@ -251,43 +454,199 @@ class Conv2DLayer:
         after which each verification is a single O(in)+O(out) dot product —
         the asymmetry grows with kernel size × channels.
         """
+        s, rb = self.project_batch(np.asarray(r)[None])
+        return s[0], float(rb[0])
+
+    def project_batch(self, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        project() for K stacked vectors (K, out): returns (S (K, in), rb (K,)).
+
+        The transposed convolution is a valid convolution of r, zero-padded
+        by (kh-1, kw-1), with the spatially flipped kernels and in/out
+        channels swapped, so it reuses the same im2col GEMM as forward.
+        """
         c, height, width = self.input_shape
         oc, oh, ow = self.output_shape
         kh, kw = self.kernel
-        r3 = np.asarray(r, dtype=np.float64).reshape(oc, oh, ow)
-        w = self.weights.astype(np.float64)
-        s3 = np.zeros((c, height, width))
-        for u in range(kh):
-            for v in range(kw):
-                s3[:, u : u + oh, v : v + ow] += np.tensordot(
-                    w[:, :, u, v], r3, axes=(0, 0)
-                )
-        r_dot_b = float(
-            np.sum(self.biases.astype(np.float64) * r3.sum(axis=(1, 2)))
-        )
-        return s3.reshape(-1), r_dot_b
-
-    def wire_payload(self) -> dict:
-        return {
+        r4 = np.asarray(r, dtype=np.float64).reshape(-1, oc, oh, ow)
+        padded = np.pad(r4, ((0, 0), (0, 0), (kh - 1, kh - 1), (kw - 1, kw - 1)))
+        flipped = self.weights.astype(np.float64)[:, :, ::-1, ::-1]
+        kernel = flipped.transpose(1, 0, 2, 3).reshape(c, -1)  # (C, OC*kh*kw)
+        s = im2col(padded, kh, kw) @ kernel.T  # (K, H*W, C)
+        s = s.transpose(0, 2, 1).reshape(len(r4), c * height * width)
+        r_dot_b = r4.sum(axis=(2, 3)) @ self.biases.astype(np.float64)
+        return s, r_dot_b
+
+    def wire_payload(self, inline: bool = True) -> dict:
+        payload = {
             "name": self.name,
             "type": "conv2d",
-            "weights": np.ascontiguousarray(self.weights, dtype=np.float32)
-            .flatten()
-            .tolist(),
-            "biases": self.biases.astype(np.float32).tolist(),
             "inputShape": list(self.input_shape),
             "outputShape": list(self.output_shape),
             "kernel": list(self.kernel),
             "activation": self.activation,
             "postOps": list(self.post_ops),
         }
+        if inline and self.weight_encoding == WEIGHTS_FLOAT32:
+            payload["weights"] = (
+                np.ascontiguousarray(self.weights, dtype=np.float32)
+                .flatten()
+                .tolist()
+            )
+            payload["biases"] = self.biases.astype(np.float32).tolist()
+            return payload
+        return _encoded_payload(self, payload, inline)
+
+    def wire_bytes(self) -> bytes:
+        """Exact bytes a client receives (see ``encode_layer_wire``)."""
+        return encode_layer_wire(
+            self.weight_encoding, self.weights, self.biases, self.scales
+        )
 
     def compute_checksum(self) -> str:
-        """SHA-256 over the exact float32 LE bytes a client receives."""
-        h = hashlib.sha256()
-        h.update(np.ascontiguousarray(self.weights, dtype="<f4").tobytes())
-        h.update(np.ascontiguousarray(self.biases, dtype="<f4").tobytes())
-        return h.hexdigest()
+        """SHA-256 over the exact wire bytes a client receives."""
+        return hashlib.sha256(_wire_view(self)).hexdigest()
+
+
+@dataclass
+class SparseDenseLayer:
+    """
+    A pruned dense layer ``z = x·W + b`` stored as CSR over the wire-order
+    matrix Wᵀ: row ``o`` holds output unit ``o``'s non-zero input weights.
+
+    Forward passes, projections and the wire payload all cost O(nnz)
+    instead of O(input × output); the projection check itself is still
+    O(in + out) like any other provable layer.
+    """
+
+    index: int
+    name: str
+    activation: str
+    input_size: int
+    output_size: int
+    weights: np.ndarray  # (nnz,) non-zero values, float32
+    indices: np.ndarray  # (nnz,) input index of each value
+    indptr: np.ndarray  # (output_size + 1,) row pointers into weights
+    biases: np.ndarray  # (output_size,), float32
+    checksum: str
+    post_ops: List[dict] = field(default_factory=list)
+    weight_encoding: str = WEIGHTS_FLOAT32
+    scales: Optional[np.ndarray] = None  # sparse layers are never quantized
+    # Read-only view of the wire bytes when loaded from a weights container
+    wire_buffer: Optional[memoryview] = field(default=None, repr=False, compare=False)
+
+    layer_type = "sparse_dense"
+
+    def __post_init__(self) -> None:
+        if not self.post_ops and self.activation and self.activation != "linear":
+            self.post_ops = [{"op": self.activation}]
+        # output unit of each value, for bincount reductions
+        self._rows = np.repeat(
+            np.arange(self.output_size, dtype=np.intp), np.diff(self.indptr)
+        )
+        self._cols = np.asarray(self.indices, dtype=np.intp)
+
+    @property
+    def nnz(self) -> int:
+        return int(self.weights.size)
+
+    @property
+    def index_nbytes(self) -> int:
+        return self.indices.nbytes + self.indptr.nbytes + self._rows.nbytes + self._cols.nbytes
+
+    @property
+    def compute_ops(self) -> int:
+        return self.nnz
+
+    @property
+    def projection_ops(self) -> int:
+        return self.input_size + self.output_size
+
+    def to_dense(self) -> np.ndarray:
+        """The (input_size, output_size) matrix a DenseLayer would hold."""
+        dense = np.zeros((self.input_size, self.output_size), dtype=np.float32)
+        dense[self._cols, self._rows] = self.weights
+        return dense
+
+    def forward(self, x: np.ndarray) -> np.ndarray:
+        """Reference pre-activation (float64). Used for audits/tests only."""
+        return self.forward_batch(np.asarray(x)[None])[0]
+
+    def forward_batch(self, x: np.ndarray) -> np.ndarray:
+        """Pre-activations (N, out) of a batch (N, in): one bincount over N × nnz."""
+        x = np.asarray(x, dtype=np.float64).reshape(-1, self.input_size)
+        terms = x[:, self._cols] * self.weights.astype(np.float64)
+        z = _segment_sums(terms, self._rows, self.output_size)
+        return z + self.biases.astype(np.float64)
+
+    def project(self, r: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Freivalds precomputation (s = W·r, r·b), in O(nnz)."""
+        s, rb = self.project_batch(np.asarray(r)[None])
+        return s[0], float(rb[0])
+
+    def project_batch(self, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """project() for K stacked vectors (K, out): returns (S (K, in), rb (K,))."""
+        r = np.asarray(r, dtype=np.float64).reshape(-1, self.output_size)
+        terms = r[:, self._rows] * self.weights.astype(np.float64)
+        s = _segment_sums(terms, self._cols, self.input_size)
+        return s, r @ self.biases.astype(np.float64)
+
+    def wire_payload(self, inline: bool = True) -> dict:
+        """
+        JSON payload the browser executes: the CSR arrays inline, or
+        ``weightCount`` (the nnz) with the bytes fetched by checksum.
+        """
+        payload = {
+            "name": self.name,
+            "type": "sparse_dense",
+            "inputShape": [1, self.input_size],
+            "outputShape": [1, self.output_size],
+            "activation": self.activation,
+            "postOps": list(self.post_ops),
+        }
+        if inline:
+            payload["weights"] = self.weights.astype(np.float32).tolist()
+            payload["biases"] = self.biases.astype(np.float32).tolist()
+            payload["indices"] = np.asarray(self.indices).tolist()
+            payload["indptr"] = np.asarray(self.indptr).tolist()
+            return payload
+        return _encoded_payload(self, payload, inline)
+
+    def wire_bytes(self) -> bytes:
+        """Exact bytes a client receives (see ``encode_sparse_wire``)."""
+        return encode_sparse_wire(
+            self.weights, self.biases, self.indptr, self.indices, self.input_size
+        )
+
+    def compute_checksum(self) -> str:
+        """SHA-256 over the exact wire bytes a client receives."""
+        return hashlib.sha256(_wire_view(self)).hexdigest()
+
+
+def _segment_sums(terms: np.ndarray, segments: np.ndarray, size: int) -> np.ndarray:
+    """Per-row sums of (N, nnz) ``terms`` grouped by ``segments`` -> (N, size)."""
+    n = terms.shape[0]
+    ids = (np.arange(n, dtype=np.intp)[:, None] * size + segments).ravel()
+    return np.bincount(ids, weights=terms.ravel(), minlength=n * size).reshape(n, size)
+
+
+def _wire_view(layer) -> "bytes | memoryview":
+    """A layer's wire bytes, straight from its container block when it has one."""
+    return layer.wire_buffer if layer.wire_buffer is not None else layer.wire_bytes()
+
+
+def _encoded_payload(layer, payload: dict, inline: bool) -> dict:
+    """
+    Weights by reference (``weightCount``), or — for quantized layers sent
+    inline — as the base64 wire bytes, which the client decodes and hashes
+    exactly like a downloaded shard.
+    """
+    payload["weightCount"] = int(layer.weights.size)
+    if layer.weight_encoding != WEIGHTS_FLOAT32:
+        payload["weightEncoding"] = layer.weight_encoding
+        if inline:
+            payload["wireData"] = base64.b64encode(bytes(_wire_view(layer))).decode("ascii")
+    return payload
 
 
 ProvableLayer = DenseLayer  # legacy alias; layers are duck-typed
@@ -323,23 +682,33 @@ class ModelSpec:
     def total_compute_ops(self) -> int:
         return sum(layer.compute_ops for layer in self.layers)
 
-    def shard_payloads(self, start: int, end: int) -> List[dict]:
-        """Wire payloads (with checksums) for the layer segment [start, end)."""
+    def shard_payloads(
+        self, start: int, end: int, weights_base_url: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Wire payloads (with checksums) for the layer segment [start, end).
+
+        With ``weights_base_url`` the weights are not inlined; each shard
+        instead points at ``{weights_base_url}/{checksum}.bin``, the
+        content-addressed raw bytes its checksum covers.
+        """
+        inline = weights_base_url is None
         payloads = []
         for layer in self.layers[start:end]:
-            wire = layer.wire_payload()
-            payloads.append(
-                {
-                    "index": layer.index,
-                    "name": layer.name,
-                    "layerType": layer.layer_type,
-                    "inputShape": wire["inputShape"],
-                    "outputShape": wire["outputShape"],
-                    "activation": layer.activation,
-                    "checksum": layer.checksum,
-                    "layers": [wire],
-                }
-            )
+            wire = layer.wire_payload(inline=inline)
+            shard = {
+                "index": layer.index,
+                "name": layer.name,
+                "layerType": layer.layer_type,
+                "inputShape": wire["inputShape"],
+                "outputShape": wire["outputShape"],
+                "activation": layer.activation,
+                "checksum": layer.checksum,
+                "layers": [wire],
+            }
+            if not inline:
+                shard["weightsUrl"] = f"{weights_base_url}/{layer.checksum}.bin"
+            payloads.append(shard)
         return payloads
 
     def apply_activation(self, z: np.ndarray, activation: str) -> np.ndarray:
@@ -360,12 +729,24 @@ class ModelSpec:
         for spot audits and tests — routine validation uses the projection
         checks in proof_verifier, which never run this.
         """
+        pre_activations, h = self.forward_segment_batch(np.asarray(x)[None], start, end)
+        return [z[0] for z in pre_activations], h[0]
+
+    def forward_segment_batch(
+        self, x: np.ndarray, start: int, end: int
+    ) -> tuple[List[np.ndarray], np.ndarray]:
+        """
+        forward_segment for N samples at once: ``x`` is (N, in) and the result
+        is ((N, out) pre-activations per layer, (N, out) final output). Each
+        dense layer is one matmul and each conv layer one im2col GEMM over
+        the whole batch.
+        """
         pre_activations: List[np.ndarray] = []
         h = np.asarray(x, dtype=np.float64)
         for layer in self.layers[start:end]:
-            z = layer.forward(h)
+            z = layer.forward_batch(h)
             pre_activations.append(z)
-            h = apply_post_ops(z, layer.post_ops)
+            h = apply_post_ops_batch(z, layer.post_ops)
         return pre_activations, h
 
     def predict(self, x: np.ndarray) -> np.ndarray:
@@ -373,10 +754,21 @@ class ModelSpec:
         _, h = self.forward_segment(x, 0, self.total_layers)
         return h
 
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        """Class probabilities (N, classes) for a batch of inputs (N, in)."""
+        _, h = self.forward_segment_batch(x, 0, self.total_layers)
+        return h
+
     def preprocess_sample(
         self, sample_blob: Optional[bytes], sample_url: Optional[str] = None
     ) -> List[float]:
         """Convert raw sample bytes into the model's input vector."""
+        return self.preprocess_sample_array(sample_blob, sample_url).tolist()
+
+    def preprocess_sample_array(
+        self, sample_blob: Optional[bytes], sample_url: Optional[str] = None
+    ) -> np.ndarray:
+        """``preprocess_sample`` as a flat float32 array."""
         if sample_blob:
             try:
                 if len(self.input_shape) == 3:
@@ -389,50 +781,372 @@ class ModelSpec:
                     .resize((width, height))
                 )
                 pixels = np.asarray(image, dtype=np.float32) / 255.0
-                return pixels.flatten().tolist()
+                return pixels.reshape(-1)
             except Exception:
                 pass  # non-image blob: fall through to raw bytes
 
         source = sample_blob or (sample_url.encode("utf-8") if sample_url else b"")
-        values = [byte / 255.0 for byte in source[: self.input_size]]
-        values.extend([0.0] * (self.input_size - len(values)))
+        values = np.zeros(self.input_size, dtype=np.float32)
+        head = np.frombuffer(source[: self.input_size], dtype=np.uint8)
+        values[: head.size] = head / np.float32(255.0)
         return values
 
 
-def encode_input_data(input_data: Sequence[float]) -> str:
+def encode_input_data(input_data: "np.ndarray | Sequence[float]") -> str:
     """Encode float32 input data as base64 for the browser shard engine."""
-    packed = struct.pack(f"<{len(input_data)}f", *input_data)
-    return base64.b64encode(packed).decode("ascii")
+    return encode_float32_array(input_data)
+
 
+def decode_input_data(encoded: str) -> np.ndarray:
+    """Decode base64 float32 input data (a read-only view, see decode_float32_array)."""
+    return decode_float32_array(encoded)
 
-def decode_input_data(encoded: str) -> List[float]:
-    """Decode base64 float32 data back to a list."""
-    raw = base64.b64decode(encoded)
-    return list(struct.unpack(f"<{len(raw) // 4}f", raw))
+
+def shard_input_vector(shard_meta: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    The segment input inlined in a task's shard metadata, or None. Tasks now
+    reference the activation store instead (see activation_store); older
+    ones carry the base64 float32 the client was sent, or a JSON float list
+    under "input_vector".
+    """
+    if shard_meta.get("input_data") is not None:
+        return decode_input_data(shard_meta["input_data"])
+    if shard_meta.get("input_vector") is not None:
+        return np.asarray(shard_meta["input_vector"], dtype=np.float32)
+    return None
+
+
+def encode_float32_array(values: "np.ndarray | Sequence[float]") -> str:
+    """
+    Encode a vector as base64 little-endian float32 (see decode_float32_array).
+    A float32 array is encoded straight from its buffer, without a copy.
+    """
+    return base64.b64encode(np.ascontiguousarray(values, dtype="<f4")).decode("ascii")
+
+
+def decode_float32_array(encoded: str) -> np.ndarray:
+    """
+    Decode base64 little-endian float32 data into a read-only array view over
+    the decoded bytes (no per-element conversion). Raises ValueError on
+    malformed base64 or a byte length that is not a multiple of 4.
+    """
+    raw = base64.b64decode(encoded, validate=True)
+    if len(raw) % 4:
+        raise ValueError("float32 payload length is not a multiple of 4")
+    return np.frombuffer(raw, dtype="<f4")
+
+
+# ---------------------------------------------------------------------------
+# Wire payload cache
+# ---------------------------------------------------------------------------
+
+# Shard info with inline weights / with a weightsUrl reference, and the raw
+# wire bytes (see encode_layer_wire) a reference resolves to.
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_JSON_REF = "json-ref"
+WIRE_FORMAT_BIN = "bin"
+
+DEFAULT_SHARD_BASE_URL = "/api/v1/shards"
+
+# Content encodings every cache entry is pre-compressed into. "br" is only
+# populated when the optional brotli module is installed.
+WIRE_ENCODINGS = ("identity", "gzip", "br")
+
+# Level 9 spends ~2.5x the CPU of level 6 on the float JSON payloads for
+# <1% smaller output, and every worker compresses every layer at startup.
+WIRE_GZIP_LEVEL = 6
+
+
+class WirePayloadCache:
+    """
+    Serialized shard payloads keyed by (layer checksum, format, envelope).
+
+    Layer weights never change for a given checksum, so their wire form is
+    built ONCE at model load instead of on every ``/captcha/init``: no
+    ``.tolist()`` of the weight matrix, no Pydantic re-validation, just a byte
+    splice into the response. The ``json``/``json-ref`` formats are the
+    camelCase ``ModelShardInfo`` object the init response carries (weights
+    inline / by reference); ``bin`` is the raw wire bytes served by the
+    content-addressed shard endpoint. Each entry is also pre-compressed (gzip,
+    and brotli when available) for endpoints that serve it on its own.
+
+    The JSON objects also embed the layer's place in its model (index, name,
+    shapes, post-ops), which its checksum does not cover, so they are keyed
+    by ``envelope_key`` as well: identical weights at another position or
+    with other post-ops get their own entry. ``bin`` depends on the weights
+    alone and is shared.
+    """
+
+    def __init__(self, shard_base_url: str = DEFAULT_SHARD_BASE_URL) -> None:
+        self.shard_base_url = shard_base_url.rstrip("/")
+        # (checksum, format, envelope) -> {encoding: bytes}; envelope "" for bin
+        self._entries: Dict[Tuple[str, str, str], Dict[str, bytes]] = {}
+        # (model name, version) -> envelope key per layer
+        self._envelopes: Dict[Tuple[str, str], List[str]] = {}
+
+    def build(self, model: "ModelSpec") -> None:
+        """Serialize every layer of ``model`` that is not cached yet."""
+        end = model.total_layers
+        envelopes = [envelope_key(layer) for layer in model.layers]
+        self._envelopes[(model.name, model.version)] = envelopes
+        inline = by_ref = None
+        for n, (layer, envelope) in enumerate(zip(model.layers, envelopes)):
+            if (layer.checksum, WIRE_FORMAT_BIN, "") not in self._entries:
+                self._entries[(layer.checksum, WIRE_FORMAT_BIN, "")] = _precompress(
+                    _wire_view(layer)
+                )
+            if (layer.checksum, WIRE_FORMAT_JSON, envelope) in self._entries:
+                continue  # same layer, same place, already shipped by another version
+            if inline is None:
+                inline = model.shard_payloads(0, end)
+                by_ref = model.shard_payloads(0, end, weights_base_url=self.shard_base_url)
+            for fmt, body in (
+                (WIRE_FORMAT_JSON, _dump_json(inline[n])),
+                (WIRE_FORMAT_JSON_REF, _dump_json(by_ref[n])),
+            ):
+                self._entries[(layer.checksum, fmt, envelope)] = _precompress(body)
+
+    def get(
+        self,
+        checksum: str,
+        fmt: str,
+        encoding: str = "identity",
+        envelope: str = "",
+    ) -> Optional[bytes]:
+        """A cached body; JSON formats need the layer's ``envelope_key``."""
+        variants = self._entries.get((checksum, fmt, envelope))
+        if variants is None:
+            return None
+        return variants.get(encoding)
+
+    def segment_json(
+        self,
+        model: "ModelSpec",
+        start: int,
+        end: int,
+        fmt: str = WIRE_FORMAT_JSON,
+    ) -> bytes:
+        """JSON array of the shard payloads for layers [start, end)."""
+        envelopes = self._envelopes.get((model.name, model.version))
+        if envelopes is None:
+            self.build(model)
+            envelopes = self._envelopes[(model.name, model.version)]
+        parts = []
+        for layer, envelope in zip(model.layers[start:end], envelopes[start:end]):
+            body = self.get(layer.checksum, fmt, envelope=envelope)
+            if body is None:
+                self.build(model)
+                body = self.get(layer.checksum, fmt, envelope=envelope)
+            parts.append(body)
+        return b"[" + b",".join(parts) + b"]"
+
+    def layer_nbytes(self, checksum: str) -> int:
+        return sum(
+            len(body)
+            for (key, _, _), variants in list(self._entries.items())
+            if key == checksum
+            for body in variants.values()
+        )
+
+    def discard(self, checksum: str) -> None:
+        """Drop every cached format of one layer."""
+        for key in [k for k in self._entries if k[0] == checksum]:
+            del self._entries[key]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(body) for variants in self._entries.values() for body in variants.values()
+        )
+
+
+def envelope_key(layer) -> str:
+    """
+    Digest of what a layer's JSON shard embeds besides its weights: its
+    index and the by-reference payload (name, type, shapes, post-ops, …).
+    """
+    meta = json.dumps(
+        [layer.index, layer.wire_payload(inline=False)],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(meta.encode("utf-8")).hexdigest()[:16]
+
+
+def _dump_json(payload: dict) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _precompress(body: bytes) -> Dict[str, bytes]:
+    variants = {
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=WIRE_GZIP_LEVEL, mtime=0),
+    }
+    if brotli is not None:
+        variants["br"] = brotli.compress(body)
+    return variants
+
+
+# ---------------------------------------------------------------------------
+# Weights container
+# ---------------------------------------------------------------------------
+#
+# A single file holding every layer's wire bytes, laid out for np.memmap:
+#
+#   magic "POUWCNT1" | u32 LE header length | JSON header | padding
+#   block 0 | padding | block 1 | ...
+#
+# Each block is exactly the layer's wire bytes (see encode_layer_wire: float32
+# weights in wire order then biases, or the layer's quantized encoding)
+# starting on a CONTAINER_ALIGNMENT boundary, so the layer checksum is the
+# SHA-256 of its block and the shard endpoint can serve the block as-is.
+# Block offsets in the header are relative to the first aligned position
+# after the header. Mapping the file read-only lets every worker process
+# share one page-cache copy of the weights, paged in as layers are touched.
+
+CONTAINER_MAGIC = b"POUWCNT1"
+CONTAINER_VERSION = 1
+CONTAINER_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // CONTAINER_ALIGNMENT) * CONTAINER_ALIGNMENT
+
+
+def write_container(path: Path, layers: Sequence) -> dict:
+    """
+    Write ``layers`` (any provable layers) to a weights container at
+    ``path`` and return its header.
+    """
+    blocks = [layer.wire_bytes() for layer in layers]
+    entries = []
+    for layer, block in zip(layers, blocks):
+        weight_shape = (
+            [layer.output_size, layer.input_size]  # dense wire order is Wᵀ
+            if layer.layer_type == "dense"
+            else list(layer.weights.shape)
+        )
+        entry = {
+            "index": layer.index,
+            "checksum": layer.checksum,
+            "encoding": getattr(layer, "weight_encoding", WEIGHTS_FLOAT32),
+            "weights_shape": weight_shape,
+            "biases_shape": list(layer.biases.shape),
+            "nbytes": len(block),
+        }
+        if layer.layer_type == "sparse_dense":
+            entry["layout"] = "csr"
+            entry["input_size"] = layer.input_size
+        entries.append(entry)
+    # Offsets are relative to the data section, which starts at the first
+    # aligned position after the header.
+    offset = 0
+    for entry in entries:
+        entry["offset"] = offset
+        offset = _align(offset + entry["nbytes"])
+    header = {"version": CONTAINER_VERSION, "alignment": CONTAINER_ALIGNMENT, "layers": entries}
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _align(len(CONTAINER_MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = Path(path).with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(CONTAINER_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for entry, block in zip(entries, blocks):
+            f.write(b"\0" * (data_start + entry["offset"] - f.tell()))
+            f.write(block)
+    tmp_path.replace(path)
+    return header
+
+
+def read_container(path: Path) -> Tuple[dict, np.memmap]:
+    """Header and read-only byte map of a weights container."""
+    with open(path, "rb") as f:
+        magic = f.read(len(CONTAINER_MAGIC))
+        if magic != CONTAINER_MAGIC:
+            raise ValueError(f"{path} is not a weights container")
+        (header_length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_length))
+    if header.get("version") != CONTAINER_VERSION:
+        raise ValueError(f"unsupported container version {header.get('version')!r}")
+    data_start = _align(len(CONTAINER_MAGIC) + 4 + header_length)
+    return header, np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+
+
+def _container_arrays(header: dict, data: np.memmap) -> Tuple[dict, dict]:
+    """
+    Zero-copy ``W{i}``/``b{i}`` arrays (in the npz layout the layer loaders
+    expect) and the raw block of each layer, keyed by layer index.
+    """
+    arrays: dict = {}
+    blocks: dict = {}
+    for entry in header["layers"]:
+        i = entry["index"]
+        offset, nbytes = entry["offset"], entry["nbytes"]
+        if offset % CONTAINER_ALIGNMENT or offset + nbytes > len(data):
+            raise ValueError(f"container block {i} out of bounds")
+        block = data[offset : offset + nbytes]
+        if entry.get("layout") == "csr":
+            (nnz,), (output_size,) = entry["weights_shape"], entry["biases_shape"]
+            values, biases, indptr, indices = _sparse_wire_arrays(
+                block, nnz, output_size, entry["input_size"]
+            )
+            arrays.update({f"W{i}": values, f"b{i}": biases, f"P{i}": indptr, f"I{i}": indices})
+            blocks[i] = memoryview(block)
+            continue
+        weights, biases, scales = _wire_arrays(
+            entry.get("encoding", WEIGHTS_FLOAT32),
+            block,
+            int(np.prod(entry["weights_shape"])),
+            int(np.prod(entry["biases_shape"])),
+        )
+        weights = weights.reshape(entry["weights_shape"])
+        if len(entry["weights_shape"]) == 2:
+            weights = weights.T  # dense: back from wire order to (in, out)
+        arrays[f"W{i}"] = weights
+        arrays[f"b{i}"] = biases.reshape(entry["biases_shape"])
+        if scales is not None:
+            arrays[f"S{i}"] = scales
+        blocks[i] = memoryview(block)
+    return arrays, blocks
 
 
 # ---------------------------------------------------------------------------
 # Manifest loading
 # ---------------------------------------------------------------------------
 
-def _load_layer(layer_manifest: dict, weights: np.lib.npyio.NpzFile):
+def _load_layer(layer_manifest: dict, weights):
+    """
+    Build one layer from its manifest entry and a ``W{i}``/``b{i}`` mapping
+    (plus ``S{i}`` scales for int8 layers, whose ``W{i}`` holds the int8
+    values; float16 layers store ``W{i}`` as float16). sparse_dense layers
+    store CSR arrays: ``W{i}`` the non-zero values, ``I{i}`` their input
+    indices and ``P{i}`` the row pointer per output unit.
+    """
     i = layer_manifest["index"]
     layer_type = layer_manifest.get("type", "dense")
     post_ops = list(layer_manifest.get("post_ops", []))
+    encoding = layer_manifest.get("weight_encoding", WEIGHTS_FLOAT32)
 
     if layer_type == "dense":
+        # stored (in, out): output units are the columns
+        layer_weights, scales = _decode_weights(encoding, weights, i, channel_axis=1)
         return DenseLayer(
             index=i,
             name=layer_manifest["name"],
             activation=layer_manifest["activation"],
             input_size=layer_manifest["input_size"],
             output_size=layer_manifest["output_size"],
-            weights=weights[f"W{i}"].astype(np.float32),
-            biases=weights[f"b{i}"].astype(np.float32),
+            weights=layer_weights,
+            biases=np.asarray(weights[f"b{i}"], dtype=np.float32),
             checksum=layer_manifest["checksum"],
             post_ops=post_ops,
+            weight_encoding=encoding,
+            scales=scales,
         )
     if layer_type == "conv2d":
+        layer_weights, scales = _decode_weights(encoding, weights, i, channel_axis=0)
         return Conv2DLayer(
             index=i,
             name=layer_manifest["name"],
@@ -441,70 +1155,368 @@ def _load_layer(layer_manifest: dict, weights: np.lib.npyio.NpzFile):
             out_channels=layer_manifest["out_channels"],
             kernel=tuple(layer_manifest["kernel"]),
             input_shape=tuple(layer_manifest["input_shape"]),
-            weights=weights[f"W{i}"].astype(np.float32),
-            biases=weights[f"b{i}"].astype(np.float32),
+            weights=layer_weights,
+            biases=np.asarray(weights[f"b{i}"], dtype=np.float32),
+            checksum=layer_manifest["checksum"],
+            post_ops=post_ops,
+            weight_encoding=encoding,
+            scales=scales,
+        )
+    if layer_type == "sparse_dense":
+        if encoding != WEIGHTS_FLOAT32:
+            raise ValueError(f"sparse_dense layer {i} only supports float32 weights")
+        values = np.asarray(weights[f"W{i}"], dtype=np.float32)
+        indptr = np.asarray(weights[f"P{i}"])
+        indices = np.asarray(weights[f"I{i}"])
+        input_size, output_size = layer_manifest["input_size"], layer_manifest["output_size"]
+        if not _is_csr(values, indices, indptr, input_size, output_size):
+            raise ValueError(f"sparse_dense layer {i} has malformed CSR arrays")
+        return SparseDenseLayer(
+            index=i,
+            name=layer_manifest["name"],
+            activation=layer_manifest["activation"],
+            input_size=input_size,
+            output_size=output_size,
+            weights=values,
+            indices=indices,
+            indptr=indptr,
+            biases=np.asarray(weights[f"b{i}"], dtype=np.float32),
             checksum=layer_manifest["checksum"],
             post_ops=post_ops,
         )
     raise ValueError(f"unknown layer type {layer_type!r}")
 
 
+def _is_csr(
+    values: np.ndarray,
+    indices: np.ndarray,
+    indptr: np.ndarray,
+    input_size: int,
+    output_size: int,
+) -> bool:
+    """Structural check before a CSR layer is indexed (checksums come later)."""
+    return (
+        indptr.shape == (output_size + 1,)
+        and indices.shape == values.shape == (values.size,)
+        and indptr[0] == 0
+        and indptr[-1] == values.size
+        and not np.any(np.diff(indptr) < 0)
+        and (indices.size == 0 or 0 <= indices.min() <= indices.max() < input_size)
+    )
+
+
+def _decode_weights(
+    encoding: str, weights, index: int, channel_axis: int
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """float32 (dequantized) weights of a layer, and its int8 scales if any."""
+    raw = weights[f"W{index}"]
+    if encoding == WEIGHTS_FLOAT32:
+        return np.asarray(raw, dtype=np.float32), None
+    if encoding == WEIGHTS_FLOAT16:
+        if np.asarray(raw).dtype != np.float16:
+            raise ValueError(f"layer {index} declares float16 weights but stores {raw.dtype}")
+        return np.asarray(raw).astype(np.float32), None
+    if encoding == WEIGHTS_INT8:
+        if np.asarray(raw).dtype != np.int8:
+            raise ValueError(f"layer {index} declares int8 weights but stores {raw.dtype}")
+        scales = np.asarray(weights[f"S{index}"], dtype=np.float32)
+        return dequantize_int8(raw, scales, channel_axis), scales
+    raise ValueError(f"unknown weight encoding {encoding!r}")
+
+
+class VerifiedManifestCache:
+    """
+    Remembers which model files already passed full integrity verification.
+
+    Entries are keyed by the (path, size, mtime, inode) identity of a model's
+    manifest and weights file and hold the model checksum they verified to;
+    an unchanged identity lets a restart skip re-hashing the weights. The file
+    is authenticated with an HMAC under ``secret_key`` so it cannot be edited
+    to vouch for weights that were never verified.
+    """
+
+    def __init__(self, path: Path, secret_key: str):
+        self.path = Path(path)
+        self._key = hashlib.sha256(f"verified-models:{secret_key}".encode("utf-8")).digest()
+        self._entries: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._read()
+
+    @staticmethod
+    def identity(*paths: Path) -> str:
+        parts = []
+        for path in paths:
+            st = path.stat()
+            parts.append([str(path.resolve()), st.st_size, st.st_mtime_ns, st.st_ino])
+        return json.dumps(parts, separators=(",", ":"))
+
+    def is_verified(self, identity: str, model_checksum: str) -> bool:
+        return self._entries.get(identity) == model_checksum
+
+    def record(self, identity: str, model_checksum: str) -> None:
+        with self._lock:
+            if self._entries.get(identity) != model_checksum:
+                self._entries[identity] = model_checksum
+                self._dirty = True
+
+    def _mac(self, body: bytes) -> str:
+        return hmac.new(self._key, body, hashlib.sha256).hexdigest()
+
+    def _read(self) -> None:
+        try:
+            stored = json.loads(self.path.read_text(encoding="utf-8"))
+            body = json.dumps(stored["entries"], sort_keys=True).encode("utf-8")
+            if hmac.compare_digest(self._mac(body), stored["mac"]):
+                self._entries = dict(stored["entries"])
+            else:
+                logger.warning("Ignoring verified-model cache with a bad MAC")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable verified-model cache: %s", exc)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        body = json.dumps(self._entries, sort_keys=True).encode("utf-8")
+        payload = json.dumps({"entries": self._entries, "mac": self._mac(body)})
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            tmp_path.replace(self.path)
+            self._dirty = False
+        except OSError as exc:
+            logger.warning("Could not write verified-model cache: %s", exc)
+
+
+@dataclass
+class CatalogEntry:
+    """A model available under the models directory, resident or not."""
+
+    name: str
+    version: str
+    checksum: str
+    manifest_path: Path
+    task_type: str
+    labels: List[str]
+    input_shape: List[int]
+    # float32 weights + biases (and sparse indices), from the manifest's layer shapes
+    weight_bytes: int
+
+    @classmethod
+    def from_manifest(cls, manifest_path: Path, manifest: dict) -> "CatalogEntry":
+        params = 0
+        for layer in manifest["layers"]:
+            if layer.get("type", "dense") == "conv2d":
+                kh, kw = layer["kernel"]
+                params += layer["out_channels"] * (layer["in_channels"] * kh * kw + 1)
+            elif layer.get("type") == "sparse_dense":
+                # values + indices, biases + row pointers; a manifest without
+                # nnz is budgeted as if the layer were dense
+                nnz = layer.get("nnz", layer["output_size"] * layer["input_size"])
+                params += 2 * (nnz + layer["output_size"]) + 1
+            else:
+                params += layer["output_size"] * (layer["input_size"] + 1)
+        return cls(
+            name=manifest["name"],
+            version=manifest["version"],
+            checksum=manifest["checksum"],
+            manifest_path=manifest_path,
+            task_type=manifest["task_type"],
+            labels=manifest["labels"],
+            input_shape=manifest["input"]["shape"],
+            weight_bytes=params * 4,
+        )
+
+
+@dataclass
+class ResidencyStats:
+    hits: int = 0
+    loads: int = 0
+    load_failures: int = 0
+    evictions: int = 0
+
+
 class ModelStore:
-    """Loads and serves all models found under the models directory."""
+    """
+    Loads and serves the models found under the models directory.
+
+    Without a memory budget every model is loaded at startup and stays
+    resident. With ``memory_budget_bytes`` set, startup only reads the
+    manifests (the catalog); a model is loaded on first use and the least
+    recently used ones are evicted — weights, wire payloads and, through the
+    unload listeners, secret projections — whenever the resident footprint
+    exceeds the budget. Versions pinned by in-flight pipeline runs are never
+    evicted; an evicted model simply loads again on its next use.
+    """
 
-    def __init__(self, models_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        models_dir: Optional[Path] = None,
+        shard_base_url: str = DEFAULT_SHARD_BASE_URL,
+        verified_cache: Optional[VerifiedManifestCache] = None,
+        load_workers: int = 4,
+        memory_budget_bytes: int = 0,
+    ):
         self.models_dir = Path(models_dir) if models_dir else DEFAULT_MODELS_DIR
+        # name -> manifest metadata of every available model
+        self._catalog: Dict[str, CatalogEntry] = {}
+        # name -> current version (what new work is assigned against)
         self._models: Dict[str, ModelSpec] = {}
+        # (name, version) -> every resident version, current or retiring
+        self._versions: Dict[Tuple[str, str], ModelSpec] = {}
+        # (name, version) -> estimated resident bytes
+        self._footprints: Dict[Tuple[str, str], int] = {}
+        # resident current versions, least recently used first
+        self._lru: OrderedDict[str, None] = OrderedDict()
+        # versions with in-flight runs, and short leases taken by claims;
+        # neither is evicted
+        self._pinned: set = set()
+        self._leases: Dict[Tuple[str, str], float] = {}
+        # versions replaced by a reload, kept until their runs drain
+        self._retiring: set = set()
+        # manifest path -> source identity of a reload that failed to load
+        self._failed_reloads: Dict[str, str] = {}
+        # model checksum -> catalog entry of a scanned, not yet active version
+        self._scanned: Dict[str, CatalogEntry] = {}
+        self._unload_listeners: List[Callable[[ModelSpec], None]] = []
+        self._lock = threading.RLock()
+        # serializes on-demand loads without blocking lookups meanwhile
+        self._load_lock = threading.Lock()
         self._loaded = False
+        self.wire_cache = WirePayloadCache(shard_base_url)
+        self.verified_cache = verified_cache
+        self.load_workers = max(1, load_workers)
+        self.memory_budget_bytes = max(0, int(memory_budget_bytes))
+        self.stats = ResidencyStats()
+        # model name -> startup phase (read, verify, wire) -> milliseconds
+        self.load_timings: Dict[str, Dict[str, float]] = {}
+        # models whose integrity check was skipped via verified_cache
+        self.verified_from_cache: set = set()
 
     def load(self) -> None:
         if self._loaded:
             return
-        for manifest_path in sorted(self.models_dir.glob("*/manifest.json")):
+        started = time.perf_counter()
+        manifest_paths = sorted(self.models_dir.glob("*/manifest.json"))
+        for manifest_path in manifest_paths:
             try:
-                spec = self._load_model(manifest_path)
-                self._models[spec.name] = spec
-                logger.info(
-                    "Loaded model %s v%s (%d layers, checksum %s…)",
-                    spec.name,
-                    spec.version,
-                    spec.total_layers,
-                    spec.checksum[:12],
-                )
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                entry = CatalogEntry.from_manifest(manifest_path, manifest)
+            except (OSError, ValueError, KeyError) as exc:
+                logger.error("Failed to read manifest %s: %s", manifest_path, exc)
+                continue
+            self._catalog[entry.name] = entry
+        if self.memory_budget_bytes:
+            # Models load on first use
+            manifest_paths = []
+
+        # Hashing and decompression release the GIL, so models load in parallel
+        with ThreadPoolExecutor(
+            max_workers=self.load_workers, thread_name_prefix="model-load"
+        ) as executor:
+            futures = {
+                path: executor.submit(self._load_and_serialize, path)
+                for path in manifest_paths
+            }
+        for manifest_path, future in futures.items():
+            try:
+                spec = future.result()
             except Exception as exc:
                 logger.error("Failed to load model at %s: %s", manifest_path, exc)
+                self._forget(manifest_path)
+                continue
+            self._install(spec)
+            self._log_load(spec)
+        if self.verified_cache is not None:
+            self.verified_cache.save()
         self._loaded = True
-        if not self._models:
+        logger.info(
+            "Model store ready: %d models (%d resident) in %.1f ms",
+            len(self._catalog),
+            len(self._models),
+            (time.perf_counter() - started) * 1000,
+        )
+        if not self._catalog:
             raise RuntimeError(
                 f"No models found in {self.models_dir}. "
                 "Run scripts/train_mnist_numpy.py first."
             )
 
-    def _load_model(self, manifest_path: Path) -> ModelSpec:
+    def _log_load(self, spec: ModelSpec) -> None:
+        timings = self.load_timings[spec.name]
+        logger.info(
+            "Loaded model %s v%s (%d layers, checksum %s…) in %.1f ms "
+            "(read %.1f, verify %.1f%s, wire %.1f)",
+            spec.name,
+            spec.version,
+            spec.total_layers,
+            spec.checksum[:12],
+            sum(timings.values()),
+            timings["read"],
+            timings["verify"],
+            " from cache" if spec.name in self.verified_from_cache else "",
+            timings["wire"],
+        )
+
+    def _forget(self, manifest_path: Path) -> None:
+        """Drop a model that failed to load from the catalog."""
+        for name, entry in list(self._catalog.items()):
+            if entry.manifest_path == manifest_path:
+                del self._catalog[name]
+
+    def _load_and_serialize(self, manifest_path: Path) -> ModelSpec:
+        spec = self._load_model(manifest_path)
+        started = time.perf_counter()
+        self.wire_cache.build(spec)
+        self.load_timings[spec.name]["wire"] = (time.perf_counter() - started) * 1000
+        return spec
+
+    def _load_model(self, manifest_path: Path, use_container: bool = True) -> ModelSpec:
+        started = time.perf_counter()
         with open(manifest_path) as f:
             manifest = json.load(f)
 
         model_dir = manifest_path.parent
-        weights_path = model_dir / manifest["weights_file"]
-
-        # Verify the weights file is exactly the one the manifest was built from
-        actual_file_hash = hashlib.sha256(weights_path.read_bytes()).hexdigest()
-        expected_file_hash = manifest.get("weights_file_sha256")
-        if expected_file_hash and actual_file_hash != expected_file_hash:
-            raise ValueError(f"weights file hash mismatch for {manifest['name']}")
-
-        weights = np.load(weights_path)
-        layers = []
-        for layer_manifest in manifest["layers"]:
-            layer = _load_layer(layer_manifest, weights)
+        container_file = manifest.get("container_file")
+        blocks: dict = {}
+        if use_container and container_file and (model_dir / container_file).exists():
+            # Memory-mapped; the per-layer checksums below cover every block
+            source_path = model_dir / container_file
+            header, data = read_container(source_path)
+            weights, blocks = _container_arrays(header, data)
+        else:
+            source_path = model_dir / manifest["weights_file"]
+            weights = np.load(source_path)
+
+        identity = None
+        verified = False
+        if self.verified_cache is not None:
+            identity = VerifiedManifestCache.identity(manifest_path, source_path)
+            verified = self.verified_cache.is_verified(identity, manifest["checksum"])
+
+        layers = [_load_layer(layer_manifest, weights) for layer_manifest in manifest["layers"]]
+        for layer in layers:
+            layer.wire_buffer = blocks.get(layer.index)
+        read_done = time.perf_counter()
+
+        if not verified:
+            # Verify the weights file is exactly the one the manifest was built
+            # from (containers are covered block by block below)
+            expected_file_hash = manifest.get("weights_file_sha256")
+            if expected_file_hash and not blocks:
+                actual_file_hash = hashlib.sha256(source_path.read_bytes()).hexdigest()
+                if actual_file_hash != expected_file_hash:
+                    raise ValueError(f"weights file hash mismatch for {manifest['name']}")
             # Verify each layer's declared checksum against the actual weights
-            actual = layer.compute_checksum()
-            if actual != layer.checksum:
-                raise ValueError(
-                    f"layer checksum mismatch for {manifest['name']} "
-                    f"layer {layer.index}"
-                )
-            layers.append(layer)
+            for layer in layers:
+                if layer.compute_checksum() != layer.checksum:
+                    raise ValueError(
+                        f"layer checksum mismatch for {manifest['name']} "
+                        f"layer {layer.index}"
+                    )
 
         # Model checksum = hash of layer checksums (verify it too)
         expected_model_checksum = hashlib.sha256(
@@ -513,6 +1525,15 @@ class ModelStore:
         if expected_model_checksum != manifest["checksum"]:
             raise ValueError(f"model checksum mismatch for {manifest['name']}")
 
+        if verified:
+            self.verified_from_cache.add(manifest["name"])
+        elif identity is not None:
+            self.verified_cache.record(identity, manifest["checksum"])
+        self.load_timings[manifest["name"]] = {
+            "read": (read_done - started) * 1000,
+            "verify": (time.perf_counter() - read_done) * 1000,
+        }
+
         return ModelSpec(
             name=manifest["name"],
             version=manifest["version"],
@@ -525,20 +1546,333 @@ class ModelStore:
             metrics=manifest.get("metrics", {}),
         )
 
+    # -- lookup -------------------------------------------------------------
+
     def get(self, name: str) -> Optional[ModelSpec]:
+        """Current version of ``name``, loading it if it is not resident."""
+        self.load()
+        spec = self._models.get(name)
+        if spec is not None:
+            self._touch(name)
+            return spec
+        if name not in self._catalog:
+            return None
+        return self._load_resident(name)
+
+    def get_version(self, name: str, version: str) -> Optional[ModelSpec]:
+        """A resident version of ``name`` — current, or retiring but not drained."""
         self.load()
-        return self._models.get(name)
+        spec = self._versions.get((name, version))
+        if spec is not None:
+            self._touch(name)
+            return spec
+        entry = self._catalog.get(name)
+        if entry is not None and entry.version == version:
+            return self.get(name)
+        return None
+
+    def get_by_checksum(self, checksum: str) -> Optional[ModelSpec]:
+        self.load()
+        for spec in list(self._versions.values()):
+            if spec.checksum == checksum:
+                self._touch(spec.name)
+                return spec
+        for entry in list(self._catalog.values()):
+            if entry.checksum == checksum:
+                return self.get(entry.name)
+        return None
+
+    def is_resident(self, name: str, version: Optional[str] = None) -> bool:
+        if version is None:
+            return name in self._models
+        return (name, version) in self._versions
+
+    def is_resident_checksum(self, checksum: str) -> bool:
+        return any(spec.checksum == checksum for spec in list(self._versions.values()))
+
+    def is_available(self, name: str, version: str) -> bool:
+        """Whether ``get_version`` can serve this version (loading if needed)."""
+        if (name, version) in self._versions:
+            return True
+        entry = self._catalog.get(name)
+        return entry is not None and entry.version == version
+
+    def available_versions(self) -> List[Tuple[str, str]]:
+        """Every (name, version) ``is_available`` accepts, current or retiring."""
+        self.load()
+        pairs = {(entry.name, entry.version) for entry in list(self._catalog.values())}
+        pairs.update(list(self._versions))
+        return sorted(pairs)
 
     def get_default(self) -> ModelSpec:
         self.load()
-        if "mnist-tiny" in self._models:
-            return self._models["mnist-tiny"]
-        return next(iter(self._models.values()))
+        if "mnist-tiny" in self._catalog:
+            return self.get("mnist-tiny")
+        return self.get(next(iter(self._catalog)))
 
     def list_models(self) -> List[ModelSpec]:
+        """Resident current versions (every model when there is no budget)."""
         self.load()
         return list(self._models.values())
 
+    def model_names(self) -> List[str]:
+        """Every available model, resident or not."""
+        self.load()
+        return list(self._catalog)
+
+    def catalog(self) -> List[CatalogEntry]:
+        self.load()
+        return list(self._catalog.values())
+
+    # -- residency ----------------------------------------------------------
+
+    def add_unload_listener(self, listener: Callable[[ModelSpec], None]) -> None:
+        """Call ``listener`` with every version that is evicted or drained."""
+        self._unload_listeners.append(listener)
+
+    def pin(self, name: str, version: str, seconds: float) -> None:
+        """Keep a version resident for ``seconds`` regardless of ``set_pinned``."""
+        with self._lock:
+            key = (name, version)
+            self._leases[key] = max(self._leases.get(key, 0.0), time.monotonic() + seconds)
+
+    def _is_pinned(self, key: Tuple[str, str]) -> bool:
+        return key in self._pinned or self._leases.get(key, 0.0) > time.monotonic()
+
+    def set_pinned(self, in_flight: set) -> None:
+        """Replace the pins with the versions that have in-flight runs."""
+        with self._lock:
+            self._pinned = set(in_flight)
+            now = time.monotonic()
+            self._leases = {k: t for k, t in self._leases.items() if t > now}
+            self._enforce_budget()
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(self._footprints.values())
+
+    def residency(self) -> dict:
+        return {
+            "budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes,
+            "available": len(self._catalog),
+            "resident": sorted(f"{name}@{version}" for name, version in self._versions),
+            "pinned": sorted(
+                f"{name}@{version}"
+                for name, version in self._versions
+                if self._is_pinned((name, version))
+            ),
+            "hits": self.stats.hits,
+            "loads": self.stats.loads,
+            "load_failures": self.stats.load_failures,
+            "evictions": self.stats.evictions,
+        }
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            if name in self._lru:
+                self._lru.move_to_end(name)
+        self.stats.hits += 1
+
+    def _load_resident(self, name: str) -> Optional[ModelSpec]:
+        with self._load_lock:
+            spec = self._models.get(name)
+            if spec is not None:
+                return spec  # loaded by a concurrent caller meanwhile
+            entry = self._catalog.get(name)
+            if entry is None:
+                return None
+            try:
+                spec = self._load_and_serialize(entry.manifest_path)
+            except Exception as exc:
+                self.stats.load_failures += 1
+                logger.error("Failed to load model at %s: %s", entry.manifest_path, exc)
+                with self._lock:
+                    self._forget(entry.manifest_path)
+                return None
+            self.stats.loads += 1
+            self._install(spec)
+            self._log_load(spec)
+            if self.verified_cache is not None:
+                self.verified_cache.save()
+            self._enforce_budget(keep=spec.name)
+            return spec
+
+    def _install(self, spec: ModelSpec) -> None:
+        with self._lock:
+            key = (spec.name, spec.version)
+            self._versions[key] = spec
+            self._models[spec.name] = spec
+            self._lru[spec.name] = None
+            self._lru.move_to_end(spec.name)
+            self._footprints[key] = self._footprint(spec)
+
+    def _footprint(self, spec: ModelSpec) -> int:
+        """Weights, wire payloads and secret projections of one version."""
+        from app.ml.proof_verifier import NUM_PROJECTIONS
+
+        total = 0
+        for layer in spec.layers:
+            total += layer.weights.nbytes + layer.biases.nbytes
+            total += getattr(layer, "index_nbytes", 0)
+            total += self.wire_cache.layer_nbytes(layer.checksum)
+            # float64 (R, S, rb)
+            total += NUM_PROJECTIONS * (layer.output_size + layer.input_size + 1) * 8
+        return total
+
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """Evict least recently used, unpinned current versions over budget."""
+        if not self.memory_budget_bytes:
+            return
+        with self._lock:
+            for name in list(self._lru):
+                if self.resident_bytes <= self.memory_budget_bytes:
+                    return
+                spec = self._models[name]
+                if name == keep or self._is_pinned((name, spec.version)):
+                    continue
+                del self._models[name]
+                del self._lru[name]
+                self.stats.evictions += 1
+                self._unload(spec)
+                logger.info("Evicted model %s v%s (LRU)", spec.name, spec.version)
+            if self.resident_bytes > self.memory_budget_bytes:
+                logger.warning(
+                    "Resident models use %.1f MB, over the %.1f MB budget; "
+                    "the rest is pinned by in-flight runs or in use",
+                    self.resident_bytes / 2**20,
+                    self.memory_budget_bytes / 2**20,
+                )
+
+    def _unload(self, spec: ModelSpec) -> None:
+        """Release a version that is no longer current or resident."""
+        key = (spec.name, spec.version)
+        self._versions.pop(key, None)
+        self._footprints.pop(key, None)
+        shared = {
+            layer.checksum for other in self._versions.values() for layer in other.layers
+        }
+        for layer in spec.layers:
+            if layer.checksum not in shared:
+                self.wire_cache.discard(layer.checksum)
+        for listener in self._unload_listeners:
+            listener(spec)
+
+    # -- hot reload ---------------------------------------------------------
+
+    def scan(self) -> List[ModelSpec]:
+        """
+        Load every manifest whose checksum differs from the current version
+        of its model, WITHOUT making it current. Blocking (hashing, wire
+        serialization), so callers run it off the event loop and publish the
+        result with ``activate`` once the rest of their preparation is done.
+        Models that are not resident under a memory budget only have their
+        catalog entry updated; their next use loads the new version.
+
+        A retrain writes weights and manifest non-atomically, so a load that
+        fails (checksum mismatch mid-write) is retried on the next scan —
+        but only once the files changed again, to keep a broken export from
+        logging on every poll.
+        """
+        self.load()
+        fresh = []
+        for manifest_path in sorted(self.models_dir.glob("*/manifest.json")):
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                entry = CatalogEntry.from_manifest(manifest_path, manifest)
+                known = self._catalog.get(entry.name)
+                if known is not None and known.checksum == entry.checksum:
+                    continue
+                weights_file = manifest.get("container_file")
+                if not weights_file or not (manifest_path.parent / weights_file).exists():
+                    weights_file = manifest["weights_file"]
+                identity = VerifiedManifestCache.identity(
+                    manifest_path, manifest_path.parent / weights_file
+                )
+            except (OSError, ValueError, KeyError) as exc:
+                logger.debug("Skipping unreadable manifest %s: %s", manifest_path, exc)
+                continue
+            key = str(manifest_path)
+            if self._failed_reloads.get(key) == identity:
+                continue
+            if self.memory_budget_bytes and entry.name not in self._models:
+                with self._lock:
+                    self._catalog[entry.name] = entry
+                logger.info("Model %s v%s available", entry.name, entry.version)
+                continue
+            try:
+                spec = self._load_and_serialize(manifest_path)
+            except Exception as exc:
+                self._failed_reloads[key] = identity
+                logger.error("Failed to reload model at %s: %s", manifest_path, exc)
+                continue
+            self._failed_reloads.pop(key, None)
+            self._scanned[spec.checksum] = entry
+            fresh.append(spec)
+        if fresh and self.verified_cache is not None:
+            self.verified_cache.save()
+        return fresh
+
+    def activate(self, specs: Sequence[ModelSpec]) -> None:
+        """
+        Make prepared versions current. Each swap is a single dict store, so
+        a request sees either the old or the new version, never a mix. The
+        replaced version stays resident (``get_version``/``get_by_checksum``)
+        until ``retire_drained`` finds no in-flight run pinned to it.
+        """
+        for spec in specs:
+            key = (spec.name, spec.version)
+            with self._lock:
+                previous = self._models.get(spec.name)
+                entry = self._scanned.pop(spec.checksum, None)
+                if entry is not None:
+                    self._catalog[spec.name] = entry
+                self._install(spec)
+                self._retiring.discard(key)
+                if previous is not None and previous.version != spec.version:
+                    self._retiring.add((previous.name, previous.version))
+            if previous is None:
+                logger.info("Model %s v%s added", spec.name, spec.version)
+            elif previous.version == spec.version:
+                # Runs pin the version only, so there is nothing to drain to
+                logger.warning(
+                    "Model %s v%s re-exported with new weights; replaced in place "
+                    "(bump the manifest version for a draining rollout)",
+                    spec.name,
+                    spec.version,
+                )
+            else:
+                logger.info(
+                    "Model %s now serving v%s; v%s retiring",
+                    spec.name,
+                    spec.version,
+                    previous.version,
+                )
+        self._enforce_budget()
+
+    @property
+    def retiring(self) -> List[Tuple[str, str]]:
+        return sorted(self._retiring)
+
+    def retire_drained(self, in_flight: set) -> List[ModelSpec]:
+        """
+        Unload retiring versions with no entry in ``in_flight`` — the
+        (model_name, model_version) pairs of runs still in progress.
+        Returns the unloaded versions.
+        """
+        dropped = []
+        with self._lock:
+            for key in list(self._retiring):
+                if key in in_flight:
+                    continue
+                self._retiring.discard(key)
+                spec = self._versions.get(key)
+                if spec is not None:
+                    self._unload(spec)
+                    dropped.append(spec)
+                    logger.info("Model %s v%s drained and unloaded", spec.name, spec.version)
+        return dropped
+
 
 _store: Optional[ModelStore] = None
 
@@ -547,11 +1881,31 @@ def get_model_store() -> ModelStore:
     """Get or create the global model store."""
     global _store
     if _store is None:
-        _store = ModelStore()
+        settings = get_settings()
+        _store = ModelStore(
+            shard_base_url=settings.shard_base_url,
+            verified_cache=(
+                VerifiedManifestCache(
+                    Path(settings.cache_dir) / "verified-models.json", settings.secret_key
+                )
+                if settings.cache_model_verification
+                else None
+            ),
+            load_workers=settings.model_load_workers,
+            memory_budget_bytes=int(settings.model_memory_budget_mb * 2**20),
+        )
         _store.load()
     return _store
 
 
+async def get_model_by_checksum(checksum: str) -> Optional[ModelSpec]:
+    """``get_by_checksum``, loaded off the event loop if it is not resident."""
+    store = get_model_store()
+    if store.is_resident_checksum(checksum):
+        return store.get_by_checksum(checksum)
+    return await asyncio.to_thread(store.get_by_checksum, checksum)
+
+
 def reset_model_store() -> None:
     """Reset the global store (for tests)."""
     global _store
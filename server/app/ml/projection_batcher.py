@@ -0,0 +1,171 @@
+"""
+Cross-submission micro-batching of projection checks.
+
+A single projection check on a small model is two tiny matvecs (R·z and
+S·x), so per-submission cost is dominated by NumPy call overhead rather than
+arithmetic. Under load many concurrent submits verify the same layers of the
+same model; ProjectionBatcher collects them for a few milliseconds, stacks
+their z and x per layer into matrices and evaluates
+
+    Z·Rᵀ  and  X·Sᵀ + rb
+
+in one shot, handing every caller back its own (lhs, rhs) pair. Fused
+checks use a row picked per submission, so those rows are stacked too and
+each submission is multiplied by its own (one einsum per layer). The verdict
+logic stays in ProofVerifier, so batched and unbatched verification agree.
+The products run on a worker thread, never on the event loop.
+
+Batches are keyed by segment shape (model checksum, first layer, layer
+count, fused or full projections) rather than by single layer: the tiers
+assign a handful of fixed segment shapes, and one future per submission
+rather than per layer keeps the event-loop bookkeeping cheaper than the
+NumPy calls it replaces.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.ml.proof_verifier import LayerProjections
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# (model_checksum, segment_start, layer_count, fused)
+BatchKey = Tuple[str, int, int, bool]
+
+
+@dataclass
+class _PendingBatch:
+    # Per submission: the full projections are shared, fused rows are not
+    projections: List[List[LayerProjections]] = field(default_factory=list)
+    zs: List[List[np.ndarray]] = field(default_factory=list)
+    xs: List[List[np.ndarray]] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class ProjectionBatcher:
+    """
+    Collects projection requests per segment shape (model checksum, first
+    layer, layer count) and evaluates each batch with two matrix products per
+    layer once the window elapses or the batch is full. Must be used from a
+    single event loop.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int = 256):
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[BatchKey, _PendingBatch] = {}
+        # Batches being evaluated off the loop (strong refs for the tasks)
+        self._evaluating: Set[asyncio.Task] = set()
+        # Counters for metrics: batches flushed and segments evaluated
+        self.batches = 0
+        self.rows = 0
+
+    def project(
+        self,
+        key: BatchKey,
+        projections: List[LayerProjections],
+        zs: List[np.ndarray],
+        xs: List[np.ndarray],
+    ) -> "asyncio.Future[Tuple[np.ndarray, np.ndarray]]":
+        """
+        Future of the (L, rows) lhs = R·z and rhs = S·x + rb terms of one
+        segment, resolved when its batch is evaluated. One plain future per
+        segment keeps the event-loop bookkeeping below the NumPy overhead it
+        saves.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch()
+            self._pending[key] = batch
+            batch.timer = loop.call_later(self.window_s, self._flush, key)
+
+        future = loop.create_future()
+        batch.projections.append(projections)
+        batch.zs.append(zs)
+        batch.xs.append(xs)
+        batch.futures.append(future)
+        if len(batch.futures) >= self.max_batch:
+            self._flush(key)
+        return future
+
+    @property
+    def pending(self) -> int:
+        """Segments waiting for their batch to flush."""
+        return sum(len(batch.futures) for batch in self._pending.values())
+
+    def _flush(self, key: BatchKey) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._evaluate(key, batch))
+        self._evaluating.add(task)
+        task.add_done_callback(self._evaluating.discard)
+
+    async def _evaluate(self, key: BatchKey, batch: _PendingBatch) -> None:
+        rows = len(batch.futures)
+        try:
+            lhs, rhs = await asyncio.to_thread(self._products, batch)
+        except Exception as exc:  # pragma: no cover - shapes are pre-validated
+            logger.exception("Projection batch failed for %s", key)
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.rows += rows
+        for row, future in enumerate(batch.futures):
+            # A caller cancelled mid-window (client disconnect) just drops out.
+            if not future.done():
+                future.set_result((lhs[row], rhs[row]))
+
+    @staticmethod
+    def _products(batch: _PendingBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """(N, L, rows) lhs and rhs of every segment in the batch."""
+        first = batch.projections[0]
+        lhs = np.empty((len(batch.futures), len(first), len(first[0].rb)))
+        rhs = np.empty_like(lhs)
+        for offset, proj in enumerate(first):
+            Z = np.stack([zs[offset] for zs in batch.zs])
+            X = np.stack([xs[offset] for xs in batch.xs])
+            if all(projections[offset] is proj for projections in batch.projections):
+                lhs[:, offset] = Z @ proj.R.T
+                rhs[:, offset] = X @ proj.S.T + proj.rb
+                continue
+            R = np.stack([projections[offset].R for projections in batch.projections])
+            S = np.stack([projections[offset].S for projections in batch.projections])
+            rb = np.stack([projections[offset].rb for projections in batch.projections])
+            lhs[:, offset] = np.einsum("nd,nkd->nk", Z, R)
+            rhs[:, offset] = np.einsum("nd,nkd->nk", X, S) + rb
+        return lhs, rhs
+
+
+_batcher: Optional[ProjectionBatcher] = None
+
+
+def get_projection_batcher() -> Optional[ProjectionBatcher]:
+    """
+    Get or create the global batcher, or None when batching is disabled
+    (verify_batch_window_ms = 0).
+    """
+    global _batcher
+    if settings.verify_batch_window_ms <= 0:
+        return None
+    if _batcher is None:
+        _batcher = ProjectionBatcher(
+            window_ms=settings.verify_batch_window_ms,
+            max_batch=settings.verify_batch_max_size,
+        )
+    return _batcher
@@ -0,0 +1,125 @@
+"""
+Encrypted on-disk cache of secret projections.
+
+Deriving a layer's projections means a ``layer.project_batch()`` over the
+projection vectors — cheap for dense layers, but a full transposed
+convolution for conv2d layers. Every worker otherwise repeats that after each
+deploy or model rotation, so the results are persisted under
+``<cache_dir>/projections/``.
+
+The projections are as secret as the key they are derived from (a client that
+learns s = Lᵀr can forge pre-activations), so entries are Fernet-encrypted
+with a key derived from ``secret_key``. Entries live in a directory named by
+a fingerprint of that key and are addressed by (model checksum, layer index,
+layer checksum), so rotating the secret or the weights simply misses the old
+entries instead of serving stale projections. Unreadable or tampered entries
+are ignored and recomputed.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:  # optional: installed with python-jose[cryptography]
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # pragma: no cover - depends on deployment extras
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+# (R, S, rb) as stacked by ProofVerifier
+ProjectionArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class ProjectionCache:
+    """Fernet-encrypted .npz files of (R, S, rb), one per layer."""
+
+    def __init__(self, cache_dir: Path, secret_key: str):
+        self.fingerprint = hashlib.sha256(
+            f"projection-cache-id:{secret_key}".encode("utf-8")
+        ).hexdigest()[:16]
+        self.directory = Path(cache_dir) / "projections" / self.fingerprint
+        key = hashlib.sha256(f"projection-cache-key:{secret_key}".encode("utf-8")).digest()
+        self._fernet = Fernet(base64.urlsafe_b64encode(key)) if Fernet is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._fernet is not None
+
+    def path(self, model_checksum: str, layer_index: int, layer_checksum: str) -> Path:
+        return self.directory / f"{model_checksum}-{layer_index}-{layer_checksum}.npz.enc"
+
+    def load(
+        self,
+        model_checksum: str,
+        layer_index: int,
+        layer_checksum: str,
+        shape: Tuple[int, int, int],
+    ) -> Optional[ProjectionArrays]:
+        """
+        Cached (R, S, rb) of a layer, or None on a miss. ``shape`` is the
+        expected (projections, out, in); entries of any other shape miss.
+        """
+        if not self.enabled:
+            return None
+        path = self.path(model_checksum, layer_index, layer_checksum)
+        try:
+            token = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            with np.load(io.BytesIO(self._fernet.decrypt(token)), allow_pickle=False) as data:
+                R, S, rb = data["R"], data["S"], data["rb"]
+        except (InvalidToken, OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable projection cache entry %s: %s", path.name, exc)
+            self.misses += 1
+            return None
+        count, out_size, in_size = shape
+        if R.shape != (count, out_size) or S.shape != (count, in_size) or rb.shape != (count,):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return R, S, rb
+
+    def store(
+        self,
+        model_checksum: str,
+        layer_index: int,
+        layer_checksum: str,
+        arrays: ProjectionArrays,
+    ) -> None:
+        """Persist a layer's projections; failures only cost a recompute later."""
+        if not self.enabled:
+            return
+        R, S, rb = arrays
+        buffer = io.BytesIO()
+        np.savez(buffer, R=R, S=S, rb=rb)
+        token = self._fernet.encrypt(buffer.getvalue())
+        path = self.path(model_checksum, layer_index, layer_checksum)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent workers never read a torn file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(token)
+                os.chmod(tmp, 0o600)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as exc:
+            logger.warning("Could not write projection cache entry %s: %s", path.name, exc)
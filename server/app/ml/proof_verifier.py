@@ -14,7 +14,8 @@ server re-running the computation. Three mechanisms, cheapest first:
    conv2d layers (L = convolution), and by extension any matmul-shaped op
    (attention Q/K/V projections, embeddings-as-matmul). The server holds K
    SECRET random projection vectors r and the precomputed s = Lᵀ·r (computed
-   once per model load via layer.project(), never per request). A submitted
+   once per model via layer.project() at startup, never per request, and
+   kept in an encrypted on-disk cache across restarts). A submitted
    pre-activation z is checked via
 
        r · z  ≈  s · x  +  r · b
@@ -27,6 +28,15 @@ server re-running the computation. Three mechanisms, cheapest first:
    0) or the activation handed over from the previously verified segment, so
    every layer in a distributed pipeline is verifiable.
 
+   For high-risk tiers the K checks of each layer can be fused into one
+   row. Each layer keeps a pool of FUSED_ROWS secret combinations of its K
+   rows (cᵀR and cᵀS, folded before any request), and every submission is
+   checked against one of them per layer, picked by a keyed hash of its
+   task id: a layer costs one pair of dot products instead of K, and no
+   single row covers every task. The tolerance stays per layer. The
+   per-layer checks only run to pinpoint the layer when a fused check
+   fails.
+
 3. Probabilistic spot audits — a small fraction of submissions get a full
    recompute of the segment. This bounds the damage of any adaptive attack
    against the projection checks and keeps an honest baseline measurement.
@@ -38,16 +48,25 @@ stays flat as models grow.
 
 from __future__ import annotations
 
+import dataclasses
 import hashlib
 import logging
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
 from app.config import get_settings
-from app.ml.model_store import ModelSpec
+from app.ml.model_store import ModelSpec, get_model_store
+from app.ml.projection_cache import ProjectionCache
+
+if TYPE_CHECKING:
+    from app.ml.projection_batcher import ProjectionBatcher
+    from app.ml.verification_pool import VerificationPool
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -62,6 +81,13 @@ NUM_PROJECTIONS = 4
 # float64 over the same float32 weights, so honest drift is ~1e-5 relative.
 PROJECTION_RTOL = 1e-3
 
+# Pool of fused rows per layer: secret random linear combinations of the
+# layer's K projections. Each row is itself a secret Gaussian projection, so
+# a fabricated z still fails with overwhelming probability; a submission is
+# checked against one row per layer (one pair of dot products), drawn from
+# the pool per task so learning one row does not cover later submissions.
+FUSED_ROWS = 8
+
 # Absolute per-element tolerance for full spot audits (float32 storage noise).
 AUDIT_ATOL = 1e-3
 
@@ -70,6 +96,19 @@ AUDIT_ATOL = 1e-3
 DEFAULT_AUDIT_RATE = 0.08
 
 
+# Commitment-hash protocol versions. v1 hashes a comma-joined decimal string
+# (one Python format call per element); v2 hashes the same values quantized
+# to 1e-4 as int32 little-endian bytes, computed in one NumPy pass. Init
+# advertises CURRENT_PROOF_VERSION; older widgets keep submitting v1.
+PROOF_VERSION_STRING = 1
+PROOF_VERSION_QUANTIZED = 2
+SUPPORTED_PROOF_VERSIONS = (PROOF_VERSION_STRING, PROOF_VERSION_QUANTIZED)
+CURRENT_PROOF_VERSION = PROOF_VERSION_QUANTIZED
+
+_INT32_MIN = float(np.iinfo(np.int32).min)
+_INT32_MAX = float(np.iinfo(np.int32).max)
+
+
 def canonical_vector_hash(values: Sequence[float]) -> str:
     """
     Hash of a vector in canonical form: values formatted to 4 decimal places,
@@ -79,6 +118,25 @@ def canonical_vector_hash(values: Sequence[float]) -> str:
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
+def quantized_vector_hash(values: Sequence[float]) -> str:
+    """
+    v2 commitment: floor(v * 1e4 + 0.5) in float64, NaN -> 0, saturated to
+    int32, hashed as little-endian bytes. Mirrored by the browser client
+    (Math.floor into an Int32Array).
+    """
+    q = np.floor(np.asarray(values, dtype=np.float64) * 1e4 + 0.5)
+    q = np.nan_to_num(q, nan=0.0, posinf=_INT32_MAX, neginf=_INT32_MIN)
+    q = np.clip(q, _INT32_MIN, _INT32_MAX).astype("<i4")
+    return hashlib.sha256(q.tobytes()).hexdigest()
+
+
+def commitment_hash(values: Sequence[float], proof_version: int) -> str:
+    """Commitment hash of one pre-activation vector under a proof version."""
+    if proof_version == PROOF_VERSION_QUANTIZED:
+        return quantized_vector_hash(values)
+    return canonical_vector_hash(values)
+
+
 def compute_proof_hash(
     task_id: str,
     sample_id: str,
@@ -101,6 +159,22 @@ def compute_proof_hash(
     return hashlib.sha256(proof_data.encode("utf-8")).hexdigest()
 
 
+def _fused_row_choice(task_id: str, layer_count: int) -> np.ndarray:
+    """Pool row each layer of a task's segment is checked against (keyed, per task)."""
+    seed_material = f"{settings.secret_key}:fused:{task_id}".encode("utf-8")
+    seed = int.from_bytes(hashlib.sha256(seed_material).digest()[:8], "big")
+    return np.random.default_rng(seed).integers(0, FUSED_ROWS, size=layer_count)
+
+
+def _secret_rng(model: ModelSpec, layer_index: int, stream: object) -> np.random.Generator:
+    """Generator seeded from the server secret, model checksum and layer."""
+    seed_material = (
+        f"{settings.secret_key}:{model.checksum}:{layer_index}:{stream}"
+    ).encode("utf-8")
+    seed = int.from_bytes(hashlib.sha256(seed_material).digest()[:8], "big")
+    return np.random.default_rng(seed)
+
+
 @dataclass
 class VerificationReport:
     """Outcome of verifying one submitted segment."""
@@ -108,6 +182,8 @@ class VerificationReport:
     valid: bool
     reason: str = "ok"
     audited: bool = False
+    # Picked for a spot audit that the caller must run out of band
+    audit_pending: bool = False
     checks_run: List[str] = field(default_factory=list)
     # Post-activation of the segment's last layer (float64). This is what the
     # pipeline stores and hands to the next contributor.
@@ -118,6 +194,62 @@ class VerificationReport:
     confidence: Optional[float] = None
 
 
+@dataclass(frozen=True)
+class LayerProjections:
+    """
+    Secret projections of one layer, stacked so a check is two matvecs.
+
+    R holds the K secret vectors r as rows (K, out), S the matching s = Lᵀr
+    rows (K, in), and rb the K offsets r·b. ``fused`` holds the FUSED_ROWS
+    pool of folded rows (cᵀR, cᵀS, cᵀrb), one per secret combination c.
+    """
+
+    R: np.ndarray
+    S: np.ndarray
+    rb: np.ndarray
+    fused: Optional["LayerProjections"] = None
+
+    def row(self, index: int) -> "LayerProjections":
+        """Just row ``index`` (views, no copy)."""
+        return LayerProjections(
+            R=self.R[index:index + 1], S=self.S[index:index + 1], rb=self.rb[index:index + 1]
+        )
+
+
+@dataclass
+class ProjectionTerms:
+    """
+    Both sides of every projection check of a segment: lhs[l, k] = r·z and
+    rhs[l, k] = s·x + r·b for layer offset l and projection k, plus the
+    post-op activation the segment hands to the next one.
+    """
+
+    lhs: np.ndarray
+    rhs: np.ndarray
+    activation: np.ndarray
+
+
+@dataclass
+class SegmentCheck:
+    """
+    A segment that passed the structural and commitment stages: the
+    submitted z (float64) and known input x of each layer, awaiting its
+    projection terms.
+    """
+
+    report: VerificationReport
+    model: ModelSpec
+    segment_start: int
+    input_vector: Sequence[float]
+    zs: List[np.ndarray]
+    xs: List[np.ndarray]
+    activation: np.ndarray
+    task_id: str
+    force_audit: bool
+    fused: bool
+    defer_audit: bool
+
+
 class ProofVerifier:
     """
     Verifies segment computations for all loaded models.
@@ -127,50 +259,354 @@ class ProofVerifier:
     while clients (who never see the secret key) cannot reconstruct them.
     """
 
-    def __init__(self, audit_rate: float = DEFAULT_AUDIT_RATE):
+    def __init__(
+        self,
+        audit_rate: float = DEFAULT_AUDIT_RATE,
+        cache: Optional[ProjectionCache] = None,
+    ):
         self.audit_rate = audit_rate
-        # (model_checksum, layer_index) -> list of (r, s=W·r, r·b) tuples
-        self._projections: Dict[Tuple[str, int], List[Tuple[np.ndarray, np.ndarray, float]]] = {}
-
-    def _layer_projections(
-        self, model: ModelSpec, layer_index: int
-    ) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+        self.cache = cache
+        # (model_checksum, layer_index) -> stacked (R, S, rb) projections
+        self._projections: Dict[Tuple[str, int], LayerProjections] = {}
+        # Warm-up progress: layers ready / layers to prepare
+        self.warm_done = 0
+        self.warm_total = 0
+        self.warmed = False
+        # Why warm-up gave up, if it did; projections then derive lazily
+        self.warm_error: Optional[str] = None
+
+    def _layer_projections(self, model: ModelSpec, layer_index: int) -> LayerProjections:
         key = (model.checksum, layer_index)
         if key not in self._projections:
-            layer = model.layers[layer_index]
-            projections = []
-            for k in range(NUM_PROJECTIONS):
-                seed_material = (
-                    f"{settings.secret_key}:{model.checksum}:{layer_index}:{k}"
-                ).encode("utf-8")
-                seed = int.from_bytes(hashlib.sha256(seed_material).digest()[:8], "big")
-                rng = np.random.default_rng(seed)
-                r = rng.standard_normal(layer.output_size)
-                # s = Lᵀr and r·b, layer-type-specific but verified identically
-                s, r_dot_b = layer.project(r)
-                projections.append((r, s, r_dot_b))
-            self._projections[key] = projections
+            self._projections[key] = self._load_or_derive(model, layer_index)
         return self._projections[key]
 
+    def discard(self, model_checksum: str) -> None:
+        """Drop the in-memory projections of an unloaded model version."""
+        for key in [k for k in self._projections if k[0] == model_checksum]:
+            del self._projections[key]
+
+    def _load_or_derive(self, model: ModelSpec, layer_index: int) -> LayerProjections:
+        layer = model.layers[layer_index]
+        if self.cache is not None:
+            cached = self.cache.load(
+                model.checksum,
+                layer_index,
+                layer.checksum,
+                (NUM_PROJECTIONS, layer.output_size, layer.input_size),
+            )
+            if cached is not None:
+                return self._fold(model, layer_index, LayerProjections(*cached))
+        projections = self._derive_projections(model, layer_index)
+        if self.cache is not None:
+            self.cache.store(
+                model.checksum,
+                layer_index,
+                layer.checksum,
+                (projections.R, projections.S, projections.rb),
+            )
+        return self._fold(model, layer_index, projections)
+
+    def _derive_projections(self, model: ModelSpec, layer_index: int) -> LayerProjections:
+        layer = model.layers[layer_index]
+        R = np.empty((NUM_PROJECTIONS, layer.output_size), dtype=np.float64)
+        for k in range(NUM_PROJECTIONS):
+            R[k] = _secret_rng(model, layer_index, k).standard_normal(layer.output_size)
+        # s = Lᵀr and r·b for all K at once, layer-type-specific but verified
+        # identically
+        S, rb = layer.project_batch(R)
+        return LayerProjections(R=R, S=S, rb=rb)
+
+    @staticmethod
+    def _fold(
+        model: ModelSpec, layer_index: int, projections: LayerProjections
+    ) -> LayerProjections:
+        """Attach the fused row pool: cᵀR, cᵀS and cᵀrb for secret Gaussian c."""
+        c = _secret_rng(model, layer_index, "fused").standard_normal(
+            (FUSED_ROWS, NUM_PROJECTIONS)
+        )
+        fused = LayerProjections(
+            R=c @ projections.R, S=c @ projections.S, rb=c @ projections.rb
+        )
+        return dataclasses.replace(projections, fused=fused)
+
+    def warm(self, models: Sequence[ModelSpec], max_workers: int = 4) -> int:
+        """
+        Prepare the projections of every layer of ``models`` up front, from
+        the disk cache where possible, on ``max_workers`` threads (the conv
+        transposes are NumPy-bound and release the GIL). Returns the number
+        of layers prepared; sets ``warmed`` when done.
+        """
+        pending = [
+            (model, index)
+            for model in models
+            for index in range(model.total_layers)
+            if (model.checksum, index) not in self._projections
+        ]
+        self.warm_done = 0
+        self.warm_total = len(pending)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="projections"
+        ) as executor:
+            futures = [
+                executor.submit(self._layer_projections, model, index)
+                for model, index in pending
+            ]
+            for future in as_completed(futures):
+                future.result()
+                self.warm_done += 1
+
+        self.warmed = True
+        logger.info(
+            "Projections ready for %d layers in %.2fs (%d from cache)",
+            len(pending),
+            time.perf_counter() - started,
+            self.cache.hits if self.cache is not None else 0,
+        )
+        return len(pending)
+
+    def _segment_inputs(
+        self,
+        model: ModelSpec,
+        segment_start: int,
+        input_vector: Sequence[float],
+        pre_activations: Sequence[Sequence[float]],
+    ) -> Tuple[List[np.ndarray], List[np.ndarray], np.ndarray]:
+        """
+        The submitted z and the known input x of every layer in the segment,
+        plus the activation it hands on. Layer inputs are chained through
+        server-side post-ops; raises ValueError when an input does not fit
+        its layer or a submitted z is not finite (NaN compares false against
+        any tolerance, and the v2 commitment hash maps it to 0).
+        """
+        zs: List[np.ndarray] = []
+        xs: List[np.ndarray] = []
+        x = np.asarray(input_vector, dtype=np.float64)
+        for offset, z_submitted in enumerate(pre_activations):
+            layer_index = segment_start + offset
+            if len(x) != model.layers[layer_index].input_size:
+                raise ValueError(f"input size mismatch at layer {layer_index}")
+            z = np.asarray(z_submitted, dtype=np.float64)
+            if not np.isfinite(z).all():
+                raise ValueError(f"non-finite pre-activation at layer {layer_index}")
+            zs.append(z)
+            xs.append(x)
+            # Server applies the (cheap) post-ops itself — activation,
+            # pooling, flatten; the result feeds the next layer's check and
+            # is what the pipeline stores.
+            x = model.apply_layer_post_ops(z, layer_index)
+        return zs, xs, x
+
+    def _segment_projections(
+        self,
+        model: ModelSpec,
+        segment_start: int,
+        layer_count: int,
+        fused: bool,
+        task_id: str = "",
+    ) -> List[LayerProjections]:
+        """
+        Per-layer projections of a segment; when ``fused``, the pool row
+        each layer of ``task_id``'s segment is checked against.
+        """
+        projections = [
+            self._layer_projections(model, index)
+            for index in range(segment_start, segment_start + layer_count)
+        ]
+        if not fused:
+            return projections
+        choice = _fused_row_choice(task_id, layer_count)
+        return [proj.fused.row(int(n)) for proj, n in zip(projections, choice)]
+
+    def _local_terms(
+        self, check: SegmentCheck, fused: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Both sides of every projection check, one pair of matvecs per layer."""
+        projections = self._segment_projections(
+            check.model, check.segment_start, len(check.zs), fused, check.task_id
+        )
+        rows = 1 if fused else NUM_PROJECTIONS
+        lhs = np.empty((len(check.zs), rows), dtype=np.float64)
+        rhs = np.empty((len(check.zs), rows), dtype=np.float64)
+        for offset, (proj, z, x) in enumerate(zip(projections, check.zs, check.xs)):
+            lhs[offset] = proj.R @ z
+            rhs[offset] = proj.S @ x + proj.rb
+        return lhs, rhs
+
+    @staticmethod
+    def _per_layer_failure(terms: ProjectionTerms, segment_start: int) -> Optional[str]:
+        """Reason naming the first failing (layer, projection), or None."""
+        lhs, rhs = terms.lhs, terms.rhs
+        tol = PROJECTION_RTOL * np.maximum(1.0, np.maximum(np.abs(lhs), np.abs(rhs)))
+        failed = np.argwhere(~(np.abs(lhs - rhs) <= tol))
+        if not failed.size:
+            return None
+        offset, k = (int(i) for i in failed[0])
+        return (
+            f"projection check failed at layer {segment_start + offset} "
+            f"(|{lhs[offset, k]:.6f} - {rhs[offset, k]:.6f}| > {tol[offset, k]:.6f})"
+        )
+
+    def audit_segment(
+        self,
+        model: ModelSpec,
+        segment_start: int,
+        input_vector: Sequence[float],
+        pre_activations: Sequence[Sequence[float]],
+    ) -> Optional[str]:
+        """
+        Full recompute of a segment against the submitted pre-activations.
+        Returns the failure reason, or None when every layer matches within
+        AUDIT_ATOL.
+        """
+        return self.audit_segments(model, segment_start, [input_vector], [pre_activations])[0]
+
+    def audit_segments(
+        self,
+        model: ModelSpec,
+        segment_start: int,
+        input_vectors: Sequence[Sequence[float]],
+        pre_activations: Sequence[Sequence[Sequence[float]]],
+    ) -> List[Optional[str]]:
+        """
+        audit_segment for N submissions of the same segment shape, recomputed
+        in one batched forward pass. Returns one failure reason (or None) per
+        submission.
+        """
+        layer_count = len(pre_activations[0])
+        expected_pre, _ = model.forward_segment_batch(
+            np.asarray(input_vectors, dtype=np.float64),
+            segment_start,
+            segment_start + layer_count,
+        )
+        failures: List[Optional[str]] = [None] * len(input_vectors)
+        for offset in range(layer_count):
+            submitted = np.asarray([pre[offset] for pre in pre_activations], dtype=np.float64)
+            diffs = np.max(np.abs(submitted - expected_pre[offset]), axis=1)
+            for row in np.flatnonzero(~(diffs <= AUDIT_ATOL)):
+                if failures[row] is None:
+                    failures[row] = (
+                        f"spot audit failed at layer {segment_start + offset} "
+                        f"(max diff {diffs[row]:.6f})"
+                    )
+        return failures
+
     def verify_segment(
         self,
         model: ModelSpec,
         segment_start: int,
         input_vector: Sequence[float],
-        pre_activations: List[List[float]],
+        pre_activations: Sequence[Sequence[float]],
+        output_hashes: List[str],
+        proof_hash: str,
+        task_id: str,
+        sample_id: str,
+        prediction_hash: str = "",
+        force_audit: bool = False,
+        proof_version: int = PROOF_VERSION_STRING,
+        fused: bool = False,
+        defer_audit: bool = False,
+    ) -> VerificationReport:
+        """
+        Verify one submitted segment of layers [start, start+len).
+        pre_activations may be float lists (JSON proofs) or float32 arrays
+        decoded from binary proofs. With fused=True each layer is checked
+        against one folded row of its pool, picked for this task (one dot
+        product per side); only a failing fused check pays for the full
+        per-layer verdict.
+        With defer_audit=True a segment picked for a random spot audit is
+        flagged audit_pending instead of being recomputed inline; the caller
+        queues it for audit_segment() (force_audit still audits inline).
+        """
+        check = self._prepare(
+            model, segment_start, input_vector, pre_activations, output_hashes,
+            proof_hash, task_id, sample_id, prediction_hash, force_audit,
+            proof_version, fused, defer_audit,
+        )
+        if isinstance(check, VerificationReport):
+            return check
+        lhs, rhs = self._local_terms(check, fused=check.fused)
+        return self._conclude(check, lhs, rhs)
+
+    async def verify_segment_batched(
+        self,
+        batcher: "ProjectionBatcher",
+        pool: "VerificationPool",
+        model: ModelSpec,
+        segment_start: int,
+        input_vector: Sequence[float],
+        pre_activations: Sequence[Sequence[float]],
         output_hashes: List[str],
         proof_hash: str,
         task_id: str,
         sample_id: str,
         prediction_hash: str = "",
         force_audit: bool = False,
+        proof_version: int = PROOF_VERSION_STRING,
+        fused: bool = False,
+        defer_audit: bool = False,
     ) -> VerificationReport:
-        """Verify one submitted segment of layers [start, start+len)."""
+        """
+        verify_segment with the projection matvecs handed to a
+        ProjectionBatcher, which stacks them with concurrent submissions of
+        the same segment shape. The per-submission stages around it, and
+        deriving projections not warmed yet, run on the verification pool.
+        Verdicts are identical to verify_segment.
+        """
+        check = await pool.run(
+            self._prepare,
+            model, segment_start, input_vector, pre_activations, output_hashes,
+            proof_hash, task_id, sample_id, prediction_hash, force_audit,
+            proof_version, fused, defer_audit,
+        )
+        if isinstance(check, VerificationReport):
+            return check
+        projections = await pool.run(
+            self._segment_projections,
+            model,
+            segment_start,
+            len(check.zs),
+            check.fused,
+            task_id,
+        )
+        lhs, rhs = await batcher.project(
+            (model.checksum, segment_start, len(check.zs), check.fused),
+            projections,
+            check.zs,
+            check.xs,
+        )
+        return await pool.run(self._conclude, check, lhs, rhs)
+
+    def _prepare(
+        self,
+        model: ModelSpec,
+        segment_start: int,
+        input_vector: Sequence[float],
+        pre_activations: Sequence[Sequence[float]],
+        output_hashes: List[str],
+        proof_hash: str,
+        task_id: str,
+        sample_id: str,
+        prediction_hash: str,
+        force_audit: bool,
+        proof_version: int,
+        fused: bool,
+        defer_audit: bool,
+    ) -> Union[VerificationReport, SegmentCheck]:
+        """
+        Structural and commitment stages. Returns the rejecting report, or
+        the segment ready for its projection checks.
+        """
         layer_count = len(pre_activations)
         segment_end = segment_start + layer_count
         report = VerificationReport(valid=False)
 
         # --- Structural checks -------------------------------------------
+        if proof_version not in SUPPORTED_PROOF_VERSIONS:
+            report.reason = f"unsupported proof version {proof_version}"
+            return report
         if segment_end > model.total_layers:
             report.reason = "segment exceeds model depth"
             return report
@@ -189,7 +625,7 @@ class ProofVerifier:
 
         # --- Commitment hashes --------------------------------------------
         for offset, z in enumerate(pre_activations):
-            if canonical_vector_hash(z) != output_hashes[offset]:
+            if commitment_hash(z, proof_version) != output_hashes[offset]:
                 report.reason = f"commitment hash mismatch at layer {segment_start + offset}"
                 return report
         expected_proof = compute_proof_hash(
@@ -200,55 +636,75 @@ class ProofVerifier:
             return report
         report.checks_run.append("commitments")
 
-        # --- Freivalds projection checks ----------------------------------
-        x = np.asarray(input_vector, dtype=np.float64)
-        for offset, z_submitted in enumerate(pre_activations):
-            layer_index = segment_start + offset
-            layer = model.layers[layer_index]
-            if len(x) != layer.input_size:
-                report.reason = f"input size mismatch at layer {layer_index}"
-                return report
+        try:
+            zs, xs, activation = self._segment_inputs(
+                model, segment_start, input_vector, pre_activations
+            )
+        except ValueError as exc:
+            report.reason = str(exc)
+            return report
 
-            z = np.asarray(z_submitted, dtype=np.float64)
-            for r, s, rb in self._layer_projections(model, layer_index):
-                lhs = float(r @ z)
-                rhs = float(s @ x) + rb
-                scale = max(1.0, abs(lhs), abs(rhs))
-                if abs(lhs - rhs) > PROJECTION_RTOL * scale:
-                    report.reason = (
-                        f"projection check failed at layer {layer_index} "
-                        f"(|{lhs:.6f} - {rhs:.6f}| > {PROJECTION_RTOL * scale:.6f})"
-                    )
-                    logger.warning(
-                        "Projection check failed: task=%s layer=%d", task_id, layer_index
-                    )
-                    return report
+        return SegmentCheck(
+            report=report,
+            model=model,
+            segment_start=segment_start,
+            input_vector=input_vector,
+            zs=zs,
+            xs=xs,
+            activation=activation,
+            task_id=task_id,
+            force_audit=force_audit,
+            fused=fused,
+            defer_audit=defer_audit,
+        )
 
-            # Server applies the (cheap) post-ops itself — activation,
-            # pooling, flatten; the result feeds the next layer's check and
-            # is what the pipeline stores.
-            x = model.apply_layer_post_ops(z, layer_index)
-        report.checks_run.append("projections")
+    def _conclude(
+        self, check: SegmentCheck, lhs: np.ndarray, rhs: np.ndarray
+    ) -> VerificationReport:
+        """
+        Projection verdict, spot audit and derived outputs. ``lhs``/``rhs``
+        are the fused terms when ``check.fused``, the full ones otherwise.
+        """
+        report = check.report
+        model = check.model
+        segment_start = check.segment_start
+        segment_end = segment_start + len(check.zs)
+
+        # --- Freivalds projection checks ----------------------------------
+        terms = ProjectionTerms(lhs=lhs, rhs=rhs, activation=check.activation)
+        if check.fused and self._per_layer_failure(terms, segment_start) is None:
+            # Same per-layer tolerance as the unfused check, on the folded row
+            report.checks_run.append("fused_projection")
+        else:
+            if check.fused:
+                # Pinpoint the layer (and projection) the fused check rejected
+                lhs, rhs = self._local_terms(check)
+                terms = ProjectionTerms(lhs=lhs, rhs=rhs, activation=check.activation)
+            failure = self._per_layer_failure(terms, segment_start)
+            if failure is not None:
+                report.reason = failure
+                logger.warning(
+                    "Projection check failed: task=%s %s", check.task_id, failure
+                )
+                return report
+            report.checks_run.append("projections")
+        x = terms.activation
 
         # --- Probabilistic spot audit --------------------------------------
-        if force_audit or random.random() < self.audit_rate:
-            expected_pre, _ = model.forward_segment(
-                np.asarray(input_vector, dtype=np.float64), segment_start, segment_end
-            )
-            for offset, z_submitted in enumerate(pre_activations):
-                diff = np.max(
-                    np.abs(np.asarray(z_submitted, dtype=np.float64) - expected_pre[offset])
+        if check.force_audit or random.random() < self.audit_rate:
+            if check.defer_audit and not check.force_audit:
+                report.audit_pending = True
+                report.checks_run.append("audit_deferred")
+            else:
+                failure = self.audit_segment(
+                    model, segment_start, check.input_vector, check.zs
                 )
-                if diff > AUDIT_ATOL:
-                    report.audited = True
-                    report.reason = (
-                        f"spot audit failed at layer {segment_start + offset} "
-                        f"(max diff {diff:.6f})"
-                    )
-                    logger.warning("Spot audit failed: task=%s", task_id)
+                report.audited = True
+                if failure is not None:
+                    report.reason = failure
+                    logger.warning("Spot audit failed: task=%s", check.task_id)
                     return report
-            report.audited = True
-            report.checks_run.append("audit")
+                report.checks_run.append("audit")
 
         # --- Success: derive outputs ---------------------------------------
         report.valid = True
@@ -269,8 +725,17 @@ def get_proof_verifier() -> ProofVerifier:
     """Get or create the global proof verifier."""
     global _verifier
     if _verifier is None:
-        audit_rate = getattr(settings, "proof_audit_rate", DEFAULT_AUDIT_RATE)
-        _verifier = ProofVerifier(audit_rate=audit_rate)
+        _verifier = ProofVerifier(
+            audit_rate=settings.proof_audit_rate,
+            cache=(
+                ProjectionCache(Path(settings.cache_dir), settings.secret_key)
+                if settings.cache_projections
+                else None
+            ),
+        )
+        verifier = _verifier
+        # Unloaded model versions take their projections with them
+        get_model_store().add_unload_listener(lambda spec: verifier.discard(spec.checksum))
     return _verifier
 
 
@@ -0,0 +1,164 @@
+"""
+Signed task tickets for the submit path.
+
+/captcha/init signs everything /captcha/submit needs to verify a segment
+into the challenge token it already issues (a JWT under ``secret_key``):
+the run and segment, the model version, the activation-store digest of the
+input the client was sent, and the timing budget. Submit can then verify a
+proof without reading the session, task or run, and only touches the
+database to persist the outcome — where a conditional update on the
+still-pending session makes each ticket single-use.
+
+The JWT payload is signed, not encrypted, so a ticket only carries what
+the client is sent anyway plus the client's own fingerprint (a hash of its
+IP and user agent, for risk scoring). A honeypot sample's known label
+rides as an HMAC under ``secret_key`` keyed to the task: submit can check
+a prediction against it, the client cannot read it back.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.ml.activation_store import load_shard_input
+from app.models import Session, Task
+
+settings = get_settings()
+
+TICKET_CLAIM = "tkt"
+
+
+def known_label_digest(task_id: str, label: str) -> str:
+    """Keyed digest of a label for one task (case-insensitive)."""
+    message = f"{task_id}:{label.strip().lower()}".encode("utf-8")
+    return hmac.new(settings.secret_key.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+@dataclass(frozen=True)
+class TaskTicket:
+    """What verifying and recording one segment submission needs."""
+
+    task_id: str
+    session_id: str
+    sample_id: str
+    run_id: Optional[str]
+    model_name: str
+    model_version: str
+    model_checksum: str
+    segment_start: int
+    layer_count: int
+    input_hash: Optional[str]
+    expected_time_ms: int
+    difficulty: str
+    domain: str
+    site_key_prefix: Optional[str] = None
+    client_id: Optional[str] = None
+    known_label_hash: Optional[str] = None
+    # Shard metadata of a task loaded from the database (legacy submits),
+    # for inputs stored inline before the activation store
+    shard_meta: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    def claims(self) -> Dict[str, Any]:
+        """
+        Compact claim embedded under TICKET_CLAIM; the identifying fields
+        ride in the challenge token's own top-level claims.
+        """
+        return {
+            "p": self.sample_id,
+            "r": self.run_id,
+            "m": self.model_name,
+            "v": self.model_version,
+            "c": self.model_checksum,
+            "a": self.segment_start,
+            "n": self.layer_count,
+            "i": self.input_hash,
+            "e": self.expected_time_ms,
+            "u": self.client_id,
+            "k": self.known_label_hash,
+        }
+
+    def challenge_claims(self) -> Dict[str, Any]:
+        """Full challenge-token payload for this ticket."""
+        return {
+            "session_id": self.session_id,
+            "task_id": self.task_id,
+            "difficulty": self.difficulty,
+            "domain": self.domain,
+            "site_key_prefix": self.site_key_prefix,
+            TICKET_CLAIM: self.claims(),
+        }
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional["TaskTicket"]:
+        """The ticket in a verified challenge-token payload, or None."""
+        claims = payload.get(TICKET_CLAIM)
+        if not isinstance(claims, dict):
+            return None
+        try:
+            return cls(
+                task_id=str(payload["task_id"]),
+                session_id=str(payload["session_id"]),
+                difficulty=str(payload["difficulty"]),
+                domain=str(payload["domain"]),
+                site_key_prefix=payload.get("site_key_prefix"),
+                sample_id=str(claims["p"]),
+                run_id=claims.get("r"),
+                model_name=str(claims["m"]),
+                model_version=str(claims["v"]),
+                model_checksum=str(claims["c"]),
+                segment_start=int(claims["a"]),
+                layer_count=int(claims["n"]),
+                input_hash=claims.get("i"),
+                expected_time_ms=int(claims["e"]),
+                client_id=claims.get("u"),
+                known_label_hash=claims.get("k"),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def from_task(cls, task: Task, session: Session) -> "TaskTicket":
+        """Ticket rebuilt from the stored rows (submits without a challenge token)."""
+        meta = task.metadata_ or {}
+        shard_meta = meta.get("shard_task", {})
+        return cls(
+            task_id=str(task.id),
+            session_id=str(session.id),
+            sample_id=str(task.sample_id),
+            run_id=shard_meta.get("run_id"),
+            model_name=shard_meta.get("model_name", ""),
+            model_version=shard_meta.get("model_version", ""),
+            model_checksum=shard_meta.get("model_checksum", ""),
+            segment_start=shard_meta.get("segment_start", 0),
+            layer_count=shard_meta.get("expected_layers", 0),
+            input_hash=shard_meta.get("input_hash"),
+            expected_time_ms=task.expected_time_ms,
+            difficulty=shard_meta.get("difficulty") or session.difficulty_tier or "normal",
+            domain=session.domain,
+            site_key_prefix=meta.get("site_key_prefix"),
+            client_id=session.client_fingerprint,
+            known_label_hash=(
+                known_label_digest(str(task.id), task.known_label) if task.known_label else None
+            ),
+            shard_meta=shard_meta,
+        )
+
+    def contradicts_known_label(self, label: str) -> bool:
+        """True when this is a known sample and ``label`` is not its label."""
+        if not self.known_label_hash:
+            return False
+        return not hmac.compare_digest(
+            self.known_label_hash, known_label_digest(self.task_id, label)
+        )
+
+    async def input_vector(self, db: AsyncSession, redis=None) -> Optional[np.ndarray]:
+        """The segment input the client was issued, or None if unavailable."""
+        meta = self.shard_meta if self.input_hash is None else {"input_hash": self.input_hash}
+        return await load_shard_input(meta, db, redis)
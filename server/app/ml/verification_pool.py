@@ -0,0 +1,126 @@
+"""
+Bounded thread pool for proof verification.
+
+Verification is synchronous NumPy work: commitment hashing, projection
+matvecs and the occasional full-recompute spot audit. Run on the event loop
+it stalls every other request on the worker, so submits dispatch it here
+instead. NumPy releases the GIL inside its kernels, so a few threads overlap
+well with each other and with the loop.
+
+At most ``verify_workers`` jobs run at once; further submits wait on a
+semaphore, which is the queue depth reported by ``/metrics/verification``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class VerificationPool:
+    """Thread pool with a concurrency limit and queue-depth accounting."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="verify"
+        )
+        self._lock = threading.Lock()
+        # asyncio primitives bind to the loop that first uses them
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.busy_seconds = 0.0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) on the pool once a slot is free."""
+        slots = self._semaphore()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(self._timed, fn, *args, **kwargs)
+            )
+        finally:
+            slots.release()
+
+    def _timed(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self.running += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.running -= 1
+                self.busy_seconds += elapsed
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_queued": self.max_queued,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_pool: Optional[VerificationPool] = None
+
+
+def get_verification_pool() -> VerificationPool:
+    """Get or create the global verification pool."""
+    global _pool
+    if _pool is None:
+        _pool = VerificationPool(max_workers=settings.verify_workers)
+        logger.info("Verification pool started (%d workers)", _pool.max_workers)
+    return _pool
+
+
+def shutdown_verification_pool() -> None:
+    """Stop the global pool, waiting for in-flight verifications."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
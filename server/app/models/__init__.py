@@ -14,6 +14,7 @@ from app.models.golden_dataset import GoldenDataset
 from app.models.reputation import ReputationScore
 from app.models.domain_config import DomainConfig
 from app.models.pipeline_run import PipelineRun
+from app.models.activation_blob import ActivationBlob
 
 __all__ = [
     "Base",
@@ -29,4 +30,5 @@ __all__ = [
     "ReputationScore",
     "DomainConfig",
     "PipelineRun",
+    "ActivationBlob",
 ]
@@ -0,0 +1,37 @@
+"""
+ActivationBlob model: cold tier of the content-addressed activation store.
+
+Segment inputs (preprocessed samples and verified handoff activations) are
+stored once, as raw little-endian float32, under the SHA-256 of those bytes;
+tasks and pipeline runs reference them by digest (see ml.activation_store).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ActivationBlob(Base):
+    """Float32 vector keyed by the SHA-256 of its bytes."""
+
+    __tablename__ = "activation_blobs"
+
+    digest: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+        comment="SHA-256 hex of data",
+    )
+    data: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+        comment="Raw little-endian float32 values",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<ActivationBlob {self.digest[:12]} {len(self.data) // 4} floats>"
@@ -13,6 +13,15 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Indexes added after the first release (create_all skips existing tables)
+_COMPAT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_pipeline_runs_claimable "
+    "ON pipeline_runs (status, model_name, model_version, updated_at)",
+    # Whether a handoff blob is still in use (ActivationStore.discard)
+    "CREATE INDEX IF NOT EXISTS ix_pipeline_runs_activation_hash "
+    "ON pipeline_runs (activation_hash)",
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
@@ -70,6 +79,16 @@ async def _ensure_compat_columns(conn) -> None:
         for name, statement in columns.items():
             if name not in existing:
                 await conn.exec_driver_sql(statement)
+        result = await conn.exec_driver_sql("PRAGMA table_info(pipeline_runs)")
+        existing = {row[1] for row in result.fetchall()}
+        columns = {
+            "activation_hash": "ALTER TABLE pipeline_runs ADD COLUMN activation_hash VARCHAR(64)",
+        }
+        for name, statement in columns.items():
+            if name not in existing:
+                await conn.exec_driver_sql(statement)
+        for statement in _COMPAT_INDEXES:
+            await conn.exec_driver_sql(statement)
         return
 
     if "postgresql" in settings.database_url:
@@ -82,6 +101,11 @@ async def _ensure_compat_columns(conn) -> None:
         await conn.exec_driver_sql(
             "ALTER TABLE domain_config ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP"
         )
+        await conn.exec_driver_sql(
+            "ALTER TABLE pipeline_runs ADD COLUMN IF NOT EXISTS activation_hash VARCHAR(64)"
+        )
+        for statement in _COMPAT_INDEXES:
+            await conn.exec_driver_sql(statement)
 
 
 async def close_db() -> None:
@@ -11,7 +11,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Integer, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import String, Integer, Float, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -22,6 +22,17 @@ class PipelineRun(Base):
     """Distributed inference run over a sample, advanced segment by segment."""
 
     __tablename__ = "pipeline_runs"
+    __table_args__ = (
+        # Database claim path (no Redis, or an empty ready queue): oldest
+        # claimable per version
+        Index(
+            "ix_pipeline_runs_claimable",
+            "status",
+            "model_name",
+            "model_version",
+            "updated_at",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -42,11 +53,19 @@ class PipelineRun(Base):
         default=0,
         comment="Index of the next layer to compute",
     )
+    activation_hash: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+        index=True,
+        comment="Activation-store digest of the verified post-activation output "
+        "of the last completed layer (input for the next contributor); null "
+        "means start from sample input",
+    )
     activation: Mapped[Optional[list]] = mapped_column(
         JSON,
         nullable=True,
-        comment="Verified post-activation output of the last completed layer "
-        "(input for the next contributor); null means start from sample input",
+        comment="Legacy JSON float list of runs handed over before "
+        "activation_hash; moved into the activation store on claim",
     )
     status: Mapped[str] = mapped_column(
         String(20),
@@ -57,8 +57,33 @@ class PostOpConfig(APIModel):
 class NeuralLayerConfig(APIModel):
     name: str
     type: str
-    weights: List[float]
-    biases: List[float]
+    weights: Optional[List[float]] = Field(
+        default=None,
+        description="Inline weights; omitted when the shard has a weights_url",
+    )
+    biases: Optional[List[float]] = None
+    weight_count: Optional[int] = Field(
+        default=None,
+        description="Number of weights in the downloaded shard bytes (see "
+        "weight_encoding for their layout)",
+    )
+    weight_encoding: Optional[str] = Field(
+        default=None,
+        description="'float16' or 'int8' (per-output-channel scales) wire "
+        "encoding; absent means float32 weights followed by biases",
+    )
+    wire_data: Optional[str] = Field(
+        default=None,
+        description="Base64 wire bytes of a quantized layer sent inline",
+    )
+    indices: Optional[List[int]] = Field(
+        default=None,
+        description="sparse_dense only: input index of each inline weight",
+    )
+    indptr: Optional[List[int]] = Field(
+        default=None,
+        description="sparse_dense only: row pointer per output unit into weights",
+    )
     input_shape: List[int]
     output_shape: List[int]
     activation: str
@@ -80,8 +105,13 @@ class ModelShardInfo(APIModel):
     activation: Optional[str] = None
     checksum: str = Field(
         default="",
-        description="SHA-256 over the layer's float32 wire bytes; clients "
-        "verify this before executing",
+        description="SHA-256 over the layer's wire bytes (float32, or its "
+        "quantized encoding); clients verify this before executing",
+    )
+    weights_url: Optional[str] = Field(
+        default=None,
+        description="Content-addressed raw wire bytes of the layer "
+        "(immutable, cacheable across sessions)",
     )
     layers: List[NeuralLayerConfig] = Field(default_factory=list)
 
@@ -120,6 +150,11 @@ class ShardTaskInfo(APIModel):
     expected_time_ms: int
     labels: List[str]
     model_checksum: str
+    proof_version: int = Field(
+        default=1,
+        description="Highest commitment-hash protocol version the server "
+        "accepts; clients submit this or any older version",
+    )
 
 
 class CaptchaInitResponse(APIModel):
@@ -154,13 +189,25 @@ class InferenceProofData(APIModel):
     sample_id: str
     segment_start: int = Field(default=0, ge=0)
     layer_count: int = Field(..., ge=1)
-    pre_activations: List[List[float]] = Field(
-        ...,
+    proof_version: int = Field(
+        default=1,
+        ge=1,
+        description="Commitment-hash protocol: 1 = decimal string form, "
+        "2 = int32-quantized binary form",
+    )
+    pre_activations: Optional[List[List[float]]] = Field(
+        default=None,
         min_length=1,
         description="Pre-activation output vector of each computed layer; "
         "verified server-side via secret projection checks without "
         "re-running the computation",
     )
+    pre_activations_b64: Optional[List[str]] = Field(
+        default=None,
+        min_length=1,
+        description="Binary alternative to pre_activations: each layer as "
+        "base64 little-endian float32, decoded without per-element parsing",
+    )
     output_hashes: List[str] = Field(..., min_length=1)
     prediction_hash: str = Field(
         default="",
@@ -169,6 +216,14 @@ class InferenceProofData(APIModel):
     proof_hash: str
     timestamp: int
 
+    @model_validator(mode="after")
+    def validate_pre_activation_encoding(self) -> "InferenceProofData":
+        if (self.pre_activations is None) == (self.pre_activations_b64 is None):
+            raise ValueError(
+                "Exactly one of pre_activations or pre_activations_b64 must be provided"
+            )
+        return self
+
 
 class TimingData(APIModel):
     model_load_ms: int = Field(..., ge=0)
@@ -181,6 +236,11 @@ class TimingData(APIModel):
 class CaptchaSubmitRequest(APIModel):
     session_id: str
     task_id: str
+    challenge_token: Optional[str] = Field(
+        default=None,
+        description="Challenge token from /captcha/init; its signed task ticket "
+        "lets the submission be verified without session/task lookups",
+    )
     prediction: Optional[PredictionData] = Field(
         default=None,
         description="Only present when the segment includes the final layer; "
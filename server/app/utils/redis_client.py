@@ -39,7 +39,11 @@ class InMemoryRedis:
             return value if isinstance(value, bytes) else str(value).encode()
         return None
 
-    async def set(self, key: str, value: Any, ex: int = None) -> bool:
+    async def set(self, key: str, value: Any, ex: int = None, nx: bool = False) -> Optional[bool]:
+        if nx:
+            self._cleanup_expired()
+            if key in self._data:
+                return None
         self._data[key] = value
         if ex:
             self._expiry[key] = datetime.now() + timedelta(seconds=ex)
@@ -83,6 +87,32 @@ class InMemoryRedis:
         self._data[key] = current + 1
         return self._data[key]
 
+    async def rpush(self, key: str, *values: Any) -> int:
+        self._cleanup_expired()
+        items = self._data.setdefault(key, [])
+        items.extend(v if isinstance(v, bytes) else str(v).encode() for v in values)
+        return len(items)
+
+    async def lpop(self, key: str, count: Optional[int] = None):
+        self._cleanup_expired()
+        items = self._data.get(key)
+        if not items:
+            return None
+        if count is None:
+            value = items.pop(0)
+            popped = [value]
+        else:
+            popped, items[:] = items[:count], items[count:]
+            value = popped
+        if not items:
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return value
+
+    async def llen(self, key: str) -> int:
+        self._cleanup_expired()
+        return len(self._data.get(key) or [])
+
     def pipeline(self) -> "InMemoryPipeline":
         return InMemoryPipeline(self)
 
@@ -121,6 +151,10 @@ class InMemoryPipeline:
         self._commands.append(("set", key, (value, ex)))
         return self
 
+    def setex(self, key: str, ttl: int, value: Any) -> "InMemoryPipeline":
+        self._commands.append(("set", key, (value, ttl)))
+        return self
+
     def delete(self, key: str) -> "InMemoryPipeline":
         self._commands.append(("delete", key, None))
         return self
@@ -82,6 +82,7 @@ def generate_captcha_token(
     site_key_prefix: Optional[str] = None,
     action: Optional[str] = None,
     work_units: Optional[int] = None,
+    jti: Optional[str] = None,
 ) -> str:
     """
     Generate a CAPTCHA completion token.
@@ -89,6 +90,7 @@ def generate_captcha_token(
     Args:
         session_id: Session UUID
         domain: Domain that requested the CAPTCHA
+        jti: Token id; pass one to revoke the token later (deferred audits)
 
     Returns:
         JWT token for CAPTCHA verification
@@ -96,7 +98,7 @@ def generate_captcha_token(
     return create_jwt_token(
         data={
             "type": "captcha_token",
-            "jti": str(uuid.uuid4()),
+            "jti": jti or str(uuid.uuid4()),
             "session_id": session_id,
             "domain": domain,
             "completed_at": datetime.utcnow().isoformat(),
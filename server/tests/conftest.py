@@ -8,7 +8,9 @@ from typing import AsyncGenerator, Generator
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 
 from app.main import app
 from app.models.base import Base
@@ -20,6 +22,12 @@ settings = get_settings()
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw) -> str:
+    """The models' Postgres UUID columns as SQLite text (values bind as hex)."""
+    return "CHAR(32)"
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """Create event loop for async tests."""
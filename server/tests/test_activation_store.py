@@ -0,0 +1,187 @@
+"""
+Tests for the content-addressed activation store.
+"""
+
+import hashlib
+import uuid
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.pipeline import PipelineCoordinator
+from app.ml.activation_store import (
+    ActivationStore,
+    activation_digest,
+    get_activation_store,
+    load_shard_input,
+    reset_activation_store,
+)
+from app.ml.model_store import encode_input_data, get_model_store
+from app.ml.proof_verifier import VerificationReport
+from app.models import ActivationBlob, PipelineRun
+from app.utils.redis_client import InMemoryRedis
+
+
+@pytest_asyncio.fixture()
+async def db():
+    """Session over a fresh in-memory database holding only activation_blobs."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(ActivationBlob.__table__.create)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        yield session
+    await engine.dispose()
+
+
+def vector(seed=0, size=1352):
+    return np.random.default_rng(seed).standard_normal(size).astype(np.float32)
+
+
+class TestActivationStore:
+    @pytest.mark.asyncio
+    async def test_digest_is_sha256_of_float32_bytes(self, db):
+        values = vector()
+        digest = await ActivationStore().put(values, db)
+        assert digest == hashlib.sha256(values.astype("<f4").tobytes()).hexdigest()
+        assert digest == activation_digest(values.tolist())
+
+    @pytest.mark.asyncio
+    async def test_identical_vectors_share_one_row(self, db):
+        store = ActivationStore()
+        first = await store.put(vector(), db)
+        assert await store.put(vector().tolist(), db) == first
+        await db.commit()
+        assert await db.scalar(select(func.count()).select_from(ActivationBlob)) == 1
+
+    @pytest.mark.asyncio
+    async def test_round_trip_through_redis_and_the_table(self, db):
+        redis = InMemoryRedis()
+        store = ActivationStore(redis_ttl_seconds=60)
+        values = vector()
+        digest = await store.put(values, db, redis)
+        await db.commit()
+
+        hot = await store.get(digest, db, redis)
+        assert store.hits == 1
+        assert not hot.flags.writeable
+        np.testing.assert_array_equal(hot, values)
+
+        await redis.delete(store.redis_key(digest))  # expired
+        cold = await store.get(digest, db, redis)
+        assert store.cold_hits == 1
+        np.testing.assert_array_equal(cold, values)
+        assert await redis.exists(store.redis_key(digest))  # warmed again
+
+    @pytest.mark.asyncio
+    async def test_unknown_digest_is_none(self, db):
+        store = ActivationStore()
+        assert await store.get("0" * 64, db) is None
+        assert store.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_shard_input_by_hash_or_inline(self, db):
+        reset_activation_store()
+        values = vector(size=16)
+        digest = await ActivationStore().put(values, db)
+        for meta in (
+            {"input_hash": digest},
+            {"input_data": encode_input_data(values)},
+            {"input_vector": values.tolist()},
+        ):
+            np.testing.assert_array_equal(await load_shard_input(meta, db), values)
+        assert await load_shard_input({}, db) is None
+
+
+class TestLegacyHandoffs:
+    @pytest.mark.asyncio
+    async def test_legacy_handoff_resumes_and_moves_into_the_store(self, db_session):
+        reset_activation_store()
+        model = get_model_store().get_default()
+        values = vector(size=model.layers[1].input_size)
+        coordinator = PipelineCoordinator(db_session)
+        sample = await coordinator._create_fallback_sample()
+        run = PipelineRun(
+            sample_id=sample.id,
+            model_name=model.name,
+            model_version=model.version,
+            next_layer=1,
+            status="in_progress",
+            contributors=[],
+            activation=values.tolist(),
+        )
+        db_session.add(run)
+        await db_session.commit()
+
+        assignment = await coordinator.claim_segment(uuid.uuid4(), "normal", model=model)
+        assert assignment.run.id == run.id
+        np.testing.assert_array_equal(assignment.input_vector, values)
+        assert run.activation_hash == assignment.input_hash == activation_digest(values)
+        assert run.activation is None
+
+
+class TestHandoffCleanup:
+    async def _run(self, db_session, model, next_layer, values, sample=None):
+        coordinator = PipelineCoordinator(db_session)
+        sample = sample or await coordinator._create_fallback_sample()
+        run = PipelineRun(
+            sample_id=sample.id,
+            model_name=model.name,
+            model_version=model.version,
+            next_layer=next_layer,
+            activation_hash=await get_activation_store().put(values, db_session),
+            status="in_progress",
+            contributors=[],
+        )
+        db_session.add(run)
+        await db_session.commit()
+        return coordinator, run
+
+    async def _stored(self, db_session, digest):
+        return await db_session.get(ActivationBlob, digest) is not None
+
+    @pytest.mark.asyncio
+    async def test_consumed_handoffs_are_deleted_up_to_completion(self, db_session):
+        reset_activation_store()
+        model = get_model_store().get("mnist-tiny")
+        handoff = vector(size=model.layers[1].input_size)
+        coordinator, run = await self._run(db_session, model, 1, handoff)
+        first = run.activation_hash
+
+        output = vector(1, size=model.layers[2].input_size)
+        report = VerificationReport(valid=True, final_activation=output)
+        assert not (await coordinator.advance(run, uuid.uuid4(), 1, 1, report))[0]
+        db_session.expunge_all()
+        assert not await self._stored(db_session, first)
+        second = activation_digest(output)
+        assert await self._stored(db_session, second)
+
+        run = await coordinator.get_run(run.id)
+        report = VerificationReport(valid=True, predicted_label="7", confidence=0.9)
+        assert (await coordinator.advance(run, uuid.uuid4(), 2, 1, report))[0]
+        db_session.expunge_all()
+        assert not await self._stored(db_session, second)
+
+    @pytest.mark.asyncio
+    async def test_handoff_stays_while_in_use(self, db_session):
+        reset_activation_store()
+        model = get_model_store().get("mnist-tiny")
+        handoff = vector(size=model.layers[1].input_size)
+        coordinator, run = await self._run(db_session, model, 1, handoff)
+        # Another run of the same sample reached the same activation
+        _, twin = await self._run(
+            db_session, model, 1, handoff, await coordinator._get_sample(run.sample_id)
+        )
+        output = vector(1, size=model.layers[2].input_size)
+
+        pending = VerificationReport(valid=True, final_activation=output, audit_pending=True)
+        await coordinator.advance(run, uuid.uuid4(), 1, 1, pending)
+        assert await self._stored(db_session, twin.activation_hash)
+        assert not await get_activation_store().discard(twin.activation_hash, db_session)
+
+        twin.status = "failed"
+        twin.activation_hash = None
+        await db_session.flush()
+        assert await get_activation_store().discard(activation_digest(handoff), db_session)
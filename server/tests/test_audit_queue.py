@@ -0,0 +1,167 @@
+"""
+Tests for deferred spot audits: the Redis queue, the verifier's deferral and
+the worker's retroactive failure handling.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.audit_queue import AuditQueue, AuditRecord, AuditWorker, is_token_revoked
+from app.ml.model_store import encode_float32_array, get_model_store
+from app.ml.proof_verifier import ProofVerifier
+from app.models import Session, Task
+from app.utils import redis_client
+from app.utils.redis_client import InMemoryRedis
+from tests.test_proof_verifier import build_proof, random_input
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model_store().get_default()
+
+
+@pytest.fixture()
+def memory_redis(monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(redis_client, "_redis_pool", redis)
+    return redis
+
+
+class TestQueue:
+    @pytest.mark.asyncio
+    async def test_records_round_trip_in_order(self):
+        queue = AuditQueue(InMemoryRedis())
+        for n in range(3):
+            await queue.enqueue(
+                AuditRecord(
+                    task_id=f"t{n}",
+                    session_id="s",
+                    model_name="m",
+                    model_checksum="c",
+                    segment_start=n,
+                    pre_activations=[],
+                )
+            )
+        assert await queue.depth() == 3
+        batch = await queue.pop_batch(2)
+        assert [r.segment_start for r in batch] == [0, 1]
+        assert await queue.depth() == 1
+        assert await queue.pop_batch(5) != []
+        assert await queue.pop_batch(5) == []
+
+
+class TestDeferral:
+    def test_selected_audit_is_deferred(self, model):
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 2)
+        report = ProofVerifier(audit_rate=1.0).verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1",
+            defer_audit=True,
+        )
+        assert report.valid
+        assert report.audit_pending
+        assert "audit_deferred" in report.checks_run
+
+    def test_deferred_audit_catches_drift(self, model):
+        x = random_input()
+        pre, _, _ = build_proof(model, x, 0, 2)
+        drifted = [np.asarray(z) + 0.05 for z in pre]
+        verifier = ProofVerifier(audit_rate=0.0)
+        assert verifier.audit_segment(model, 0, x, pre) is None
+        assert verifier.audit_segment(model, 0, x, drifted) is not None
+
+
+    def test_batched_audit_flags_only_drifted_submissions(self, model):
+        inputs = [random_input(seed) for seed in range(4)]
+        pres = [build_proof(model, x, 0, 2)[0] for x in inputs]
+        pres[2] = [pres[2][0], [v + 0.05 for v in pres[2][1]]]
+        failures = ProofVerifier(audit_rate=0.0).audit_segments(model, 0, inputs, pres)
+        assert failures[0] is None and failures[1] is None and failures[3] is None
+        assert "layer 1" in failures[2]
+
+
+class TestWorker:
+    async def _seed(self, db_session, model, x):
+        session = Session(
+            domain="example.com",
+            session_token=uuid.uuid4().hex,
+            status="completed",
+            client_fingerprint="client-1",
+            expires_at=datetime.utcnow() + timedelta(minutes=5),
+        )
+        db_session.add(session)
+        await db_session.flush()
+        task = Task(
+            session_id=session.id,
+            sample_id=uuid.uuid4(),
+            task_type="inference",
+            expected_time_ms=500,
+            status="completed",
+            metadata_={"shard_task": {"input_vector": x}},
+        )
+        db_session.add(task)
+        await db_session.commit()
+        return session, task
+
+    @pytest.mark.asyncio
+    async def test_failed_audit_revokes_token_and_fails_session(
+        self, db_session, memory_redis, model
+    ):
+        x = random_input()
+        session, task = await self._seed(db_session, model, x)
+        pre, _, _ = build_proof(model, x, 0, 2)
+        drifted = [np.asarray(z, dtype=np.float32) + 0.05 for z in pre]
+        await AuditQueue(memory_redis).enqueue(
+            AuditRecord(
+                task_id=str(task.id),
+                session_id=str(session.id),
+                model_name=model.name,
+                model_checksum=model.checksum,
+                segment_start=0,
+                pre_activations=[encode_float32_array(z) for z in drifted],
+                token_jti="jti-1",
+                client_id="client-1",
+            )
+        )
+
+        factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+        worker = AuditWorker(session_factory=factory)
+        assert await worker.run_once() == 1
+        assert worker.stats.failed == 1
+
+        assert await is_token_revoked(memory_redis, "jti-1")
+        async with factory() as db:
+            status = await db.scalar(select(Session.status).where(Session.id == session.id))
+            assert status == "failed"
+            status = await db.scalar(select(Task.status).where(Task.id == task.id))
+            assert status == "failed"
+
+    @pytest.mark.asyncio
+    async def test_honest_audit_changes_nothing(self, db_session, memory_redis, model):
+        x = random_input()
+        session, task = await self._seed(db_session, model, x)
+        pre, _, _ = build_proof(model, x, 0, 2)
+        await AuditQueue(memory_redis).enqueue(
+            AuditRecord(
+                task_id=str(task.id),
+                session_id=str(session.id),
+                model_name=model.name,
+                model_checksum=model.checksum,
+                segment_start=0,
+                pre_activations=[encode_float32_array(z) for z in pre],
+                token_jti="jti-2",
+            )
+        )
+
+        worker = AuditWorker(
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False)
+        )
+        await worker.run_once()
+        assert worker.stats.audited == 1
+        assert worker.stats.failed == 0
+        assert not await is_token_revoked(memory_redis, "jti-2")
@@ -5,6 +5,10 @@ Tests for CAPTCHA API endpoints.
 import pytest
 from httpx import AsyncClient
 
+from app import main
+from app.ml.model_store import get_model_store
+from app.ml.proof_verifier import get_proof_verifier
+
 
 @pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
@@ -17,11 +21,45 @@ async def test_health_check(client: AsyncClient):
 @pytest.mark.asyncio
 async def test_ready_check(client: AsyncClient):
     """Test readiness endpoint."""
+    # The test client skips the lifespan that starts the warm-up
+    get_proof_verifier().warm(get_model_store().list_models())
     response = await client.get("/ready")
     assert response.status_code == 200
     assert response.json()["status"] == "ready"
 
 
+@pytest.mark.asyncio
+async def test_ready_check_while_warming(client: AsyncClient, monkeypatch):
+    """Instances stay out of rotation until projections are precomputed."""
+    monkeypatch.setattr(get_proof_verifier(), "warmed", False)
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "warming"
+    assert data["checks"]["projections"].startswith("warming")
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_reports_lazy_projections(client: AsyncClient, monkeypatch):
+    """A failed warm-up must not hold the instance out of rotation for good."""
+    verifier = get_proof_verifier()
+    monkeypatch.setattr(verifier, "warmed", False)
+    monkeypatch.setattr(verifier, "warm_error", None)
+
+    def fail(models, max_workers=4):
+        raise RuntimeError("projection cache unreadable")
+
+    monkeypatch.setattr(verifier, "warm", fail)
+    await main._warm_projections()
+    assert verifier.warm_error == "projection cache unreadable"
+
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["projections"].startswith("ok (lazy; warm-up failed")
+
+
 @pytest.mark.asyncio
 async def test_root_endpoint(client: AsyncClient):
     """Test root endpoint."""
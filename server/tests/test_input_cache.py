@@ -0,0 +1,74 @@
+"""
+Tests for the preprocessed sample input cache.
+"""
+
+import hashlib
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.ml.input_cache import PreprocessedInputCache
+from app.ml.model_store import get_model_store
+from app.utils.redis_client import InMemoryRedis
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model_store().get_default()
+
+
+def make_sample(seed=0):
+    pixels = np.random.default_rng(seed).integers(0, 256, (28, 28), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, mode="L").save(buffer, format="PNG")
+    blob = buffer.getvalue()
+    return SimpleNamespace(
+        data_hash=hashlib.sha256(blob).hexdigest(), data_blob=blob, data_url=None
+    )
+
+
+class TestInputCache:
+    @pytest.mark.asyncio
+    async def test_matches_preprocess_sample(self, model):
+        sample = make_sample()
+        values = await PreprocessedInputCache().input_vector(model, sample)
+        assert values.dtype == np.float32
+        assert not values.flags.writeable
+        assert values.tolist() == model.preprocess_sample(sample.data_blob)
+
+    @pytest.mark.asyncio
+    async def test_repeat_skips_decoding(self, model, monkeypatch):
+        cache = PreprocessedInputCache()
+        sample = make_sample()
+        first = await cache.input_vector(model, sample)
+        monkeypatch.setattr(
+            type(model), "preprocess_sample_array", lambda *a: pytest.fail("decoded again")
+        )
+        assert await cache.input_vector(model, sample) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_bounded_lru(self, model):
+        cache = PreprocessedInputCache(max_entries=2)
+        samples = [make_sample(seed) for seed in range(3)]
+        await cache.input_vector(model, samples[0])
+        await cache.input_vector(model, samples[1])
+        await cache.input_vector(model, samples[0])  # most recent now
+        await cache.input_vector(model, samples[2])
+        assert cache.get(cache.key(samples[0].data_hash, model)) is not None
+        assert cache.get(cache.key(samples[1].data_hash, model)) is None
+
+    @pytest.mark.asyncio
+    async def test_shared_through_redis(self, model):
+        redis = InMemoryRedis()
+        sample = make_sample()
+        first = await PreprocessedInputCache(redis_ttl_seconds=60).input_vector(
+            model, sample, redis
+        )
+        other = PreprocessedInputCache(redis_ttl_seconds=60)
+        values = await other.input_vector(model, sample, redis)
+        assert other.redis_hits == 1 and other.misses == 0
+        np.testing.assert_array_equal(values, first)
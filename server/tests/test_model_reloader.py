@@ -0,0 +1,143 @@
+"""
+Tests for hot model reload: scanning, the atomic swap, and draining the
+previous version while its pipeline runs finish.
+"""
+
+import hashlib
+import json
+import shutil
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.model_reloader import ModelReloader
+from app.core.pipeline import PipelineCoordinator
+from app.ml import model_store, proof_verifier
+from app.ml.model_store import ModelStore, get_model_store
+from app.ml.proof_verifier import ProofVerifier
+from app.models import PipelineRun
+
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch):
+    """Store over a private copy of mnist-tiny, installed as the global one."""
+    source = get_model_store().get("mnist-tiny")
+    shutil.copytree(
+        get_model_store().models_dir / source.name, tmp_path / "models" / source.name
+    )
+    store = ModelStore(models_dir=tmp_path / "models")
+    store.load()
+    monkeypatch.setattr(model_store, "_store", store)
+    verifier = ProofVerifier(audit_rate=0.0)
+    store.add_unload_listener(lambda spec: verifier.discard(spec.checksum))
+    monkeypatch.setattr(proof_verifier, "_verifier", verifier)
+    return store
+
+
+def retrain(model_dir, version, checksum=None):
+    """Re-export the model with a nudged output bias, as a retrain would."""
+    manifest = json.loads((model_dir / "manifest.json").read_text())
+    last = manifest["layers"][-1]
+    with np.load(model_dir / "weights.npz") as data:
+        weights = dict(data)
+    weights[f"b{last['index']}"] = weights[f"b{last['index']}"] + np.float32(0.01)
+    np.savez(model_dir / "weights.npz", **weights)
+
+    layer = model_store._load_layer(last, weights)
+    last["checksum"] = layer.compute_checksum()
+    manifest["checksum"] = checksum or hashlib.sha256(
+        "".join(entry["checksum"] for entry in manifest["layers"]).encode("ascii")
+    ).hexdigest()
+    manifest["version"] = version
+    manifest.pop("weights_file_sha256", None)
+    (model_dir / "manifest.json").write_text(json.dumps(manifest))
+    return manifest
+
+
+def factory(db_session):
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+class TestScan:
+    def test_unchanged_models_are_not_reloaded(self, store):
+        assert store.scan() == []
+
+    def test_scan_does_not_activate(self, store):
+        old = store.get("mnist-tiny")
+        manifest = retrain(store.models_dir / old.name, "9.0.0")
+        (fresh,) = store.scan()
+        assert fresh.checksum == manifest["checksum"]
+        assert store.get(old.name) is old
+
+    def test_broken_export_is_retried_only_after_it_changes(self, store, caplog):
+        model_dir = store.models_dir / "mnist-tiny"
+        retrain(model_dir, "9.0.0", checksum="0" * 64)
+        assert store.scan() == []
+        caplog.clear()
+        assert store.scan() == []
+        assert "Failed to reload" not in caplog.text
+
+        manifest = retrain(model_dir, "9.0.1")
+        (fresh,) = store.scan()
+        assert fresh.version == "9.0.1"
+        assert fresh.checksum == manifest["checksum"]
+
+
+class TestReload:
+    async def _run(self, db_session, model, status="in_progress"):
+        coordinator = PipelineCoordinator(db_session)
+        sample = await coordinator._create_fallback_sample()
+        run = PipelineRun(
+            sample_id=sample.id,
+            model_name=model.name,
+            model_version=model.version,
+            next_layer=1,
+            activation=None,
+            status=status,
+            contributors=[],
+        )
+        db_session.add(run)
+        await db_session.commit()
+        return run
+
+    @pytest.mark.asyncio
+    async def test_swap_keeps_previous_version_until_runs_drain(self, store, db_session):
+        old = store.get("mnist-tiny")
+        run = await self._run(db_session, old)
+        retrain(store.models_dir / old.name, "9.0.0")
+
+        reloader = ModelReloader(session_factory=factory(db_session))
+        (fresh,) = await reloader.run_once()
+        verifier = proof_verifier.get_proof_verifier()
+        assert store.get(old.name) is fresh
+        assert (fresh.checksum, 0) in verifier._projections  # warmed before the swap
+        assert store.get_version(old.name, old.version) is old
+        assert store.get_by_checksum(old.checksum) is old
+        assert store.retiring == [(old.name, old.version)]
+
+        run.status = "completed"
+        await db_session.commit()
+        assert await reloader.run_once() == []
+        assert reloader.unloaded == 1
+        assert store.get_version(old.name, old.version) is None
+        assert store.get_by_checksum(old.checksum) is None
+        assert store.retiring == []
+        # Layers shared with the new version keep their payloads
+        assert store.wire_cache.get(old.layers[0].checksum, "bin") is not None
+        assert store.wire_cache.get(old.layers[-1].checksum, "bin") is None
+        assert not any(key[0] == old.checksum for key in verifier._projections)
+
+    @pytest.mark.asyncio
+    async def test_in_flight_run_resumes_on_its_pinned_version(self, store, db_session):
+        old = store.get("mnist-tiny")
+        await self._run(db_session, old)
+        retrain(store.models_dir / old.name, "9.0.0")
+        await ModelReloader(session_factory=factory(db_session)).run_once()
+
+        assignment = await PipelineCoordinator(db_session).claim_segment(
+            uuid.uuid4(), "normal"
+        )
+        assert assignment.model is old
+        assert assignment.run.model_version == old.version
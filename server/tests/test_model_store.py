@@ -0,0 +1,614 @@
+"""
+Tests for the model store: loading, wire payloads and their caches.
+"""
+
+import base64
+import dataclasses
+import gzip
+import hashlib
+import json
+import shutil
+import threading
+
+import numpy as np
+import pytest
+
+from app.ml import model_store
+from app.ml.model_store import (
+    WIRE_FORMAT_BIN,
+    WIRE_FORMAT_JSON,
+    WIRE_FORMAT_JSON_REF,
+    WEIGHTS_FLOAT16,
+    WEIGHTS_INT8,
+    CatalogEntry,
+    Conv2DLayer,
+    DenseLayer,
+    ModelStore,
+    VerifiedManifestCache,
+    _container_arrays,
+    WirePayloadCache,
+    _load_layer,
+    apply_post_ops,
+    apply_post_ops_batch,
+    decode_input_data,
+    dequantize_int8,
+    encode_input_data,
+    envelope_key,
+    get_model_by_checksum,
+    get_model_store,
+    quantize_int8,
+    read_container,
+    shard_input_vector,
+    sparse_index_dtype,
+    write_container,
+)
+from app.schemas import ModelShardInfo
+
+
+@pytest.fixture(scope="module")
+def store():
+    return get_model_store()
+
+
+@pytest.fixture(scope="module")
+def model(store):
+    return store.get_default()
+
+
+class TestWirePayloadCache:
+    def test_cached_json_matches_live_payloads(self, store, model):
+        for layer, shard in zip(
+            model.layers, model.shard_payloads(0, model.total_layers)
+        ):
+            cached = store.wire_cache.get(
+                layer.checksum, WIRE_FORMAT_JSON, envelope=envelope_key(layer)
+            )
+            assert cached is not None
+            assert json.loads(cached) == shard
+
+    def test_cached_json_is_a_valid_shard_info(self, store, model):
+        layer = model.layers[0]
+        cached = json.loads(
+            store.wire_cache.get(layer.checksum, WIRE_FORMAT_JSON, envelope=envelope_key(layer))
+        )
+        info = ModelShardInfo.model_validate(cached)
+        assert info.checksum == layer.checksum
+        assert len(info.layers[0].weights) == layer.weights.size
+
+    def test_gzip_variant_round_trips(self, store, model):
+        layer = model.layers[-1]
+        envelope = envelope_key(layer)
+        plain = store.wire_cache.get(layer.checksum, WIRE_FORMAT_JSON, envelope=envelope)
+        packed = store.wire_cache.get(layer.checksum, WIRE_FORMAT_JSON, "gzip", envelope)
+        assert gzip.decompress(packed) == plain
+        assert len(packed) < len(plain)
+
+    def test_segment_json_is_an_ordered_array(self, store, model):
+        body = store.wire_cache.segment_json(model, 1, model.total_layers)
+        shards = json.loads(body)
+        assert [s["index"] for s in shards] == list(range(1, model.total_layers))
+
+    def test_unknown_checksum_misses(self, store):
+        assert store.wire_cache.get("0" * 64, WIRE_FORMAT_JSON) is None
+
+    def test_bin_format_is_the_checksummed_bytes(self, store, model):
+        for layer in model.layers:
+            body = store.wire_cache.get(layer.checksum, WIRE_FORMAT_BIN)
+            assert hashlib.sha256(body).hexdigest() == layer.checksum
+
+    def test_reference_format_omits_weights(self, store, model):
+        layer = model.layers[0]
+        shard = json.loads(
+            store.wire_cache.get(layer.checksum, WIRE_FORMAT_JSON_REF, envelope=envelope_key(layer))
+        )
+        assert shard["weightsUrl"].endswith(f"/{layer.checksum}.bin")
+        wire = shard["layers"][0]
+        assert "weights" not in wire
+        assert wire["weightCount"] == layer.weights.size
+
+    def test_shared_weights_keep_each_models_envelope(self, model):
+        # Same weights (same checksum), another position and post-ops
+        layer = model.layers[0]
+        moved = dataclasses.replace(
+            layer, index=3, name="moved", post_ops=[{"op": "relu"}]
+        )
+        other = dataclasses.replace(
+            model, name="other", layers=[moved] * 4, checksum="other"
+        )
+        assert moved.checksum == layer.checksum
+
+        cache = WirePayloadCache()
+        cache.build(model)
+        cache.build(other)
+        original = json.loads(cache.segment_json(model, 0, 1))[0]
+        shifted = json.loads(cache.segment_json(other, 3, 4))[0]
+        assert original["index"] == 0 and shifted["index"] == 3
+        assert shifted["name"] == "moved"
+        assert shifted["layers"][0]["postOps"] == [{"op": "relu"}]
+        assert original["layers"][0]["postOps"] == layer.post_ops
+
+
+@pytest.fixture(scope="module")
+def conv_layer():
+    """Multi-channel layer with a non-square kernel, to catch layout slips."""
+    rng = np.random.default_rng(11)
+    return Conv2DLayer(
+        index=0,
+        name="conv_test",
+        activation="relu",
+        in_channels=3,
+        out_channels=5,
+        kernel=(2, 3),
+        input_shape=(3, 7, 6),
+        weights=rng.standard_normal((5, 3, 2, 3)).astype(np.float32),
+        biases=rng.standard_normal(5).astype(np.float32),
+        checksum="",
+    )
+
+
+class TestConvolution:
+    def test_forward_matches_direct_convolution(self, conv_layer):
+        x = np.random.default_rng(1).standard_normal(conv_layer.input_size)
+        x3 = x.reshape(conv_layer.input_shape)
+        w = conv_layer.weights.astype(np.float64)
+        oc, oh, ow = conv_layer.output_shape
+        kh, kw = conv_layer.kernel
+        expected = np.empty((oc, oh, ow))
+        for o in range(oc):
+            for i in range(oh):
+                for j in range(ow):
+                    expected[o, i, j] = (
+                        np.sum(w[o] * x3[:, i : i + kh, j : j + kw])
+                        + conv_layer.biases[o]
+                    )
+        np.testing.assert_allclose(conv_layer.forward(x), expected.reshape(-1))
+
+    def test_project_is_the_adjoint(self, conv_layer):
+        rng = np.random.default_rng(2)
+        x = rng.standard_normal(conv_layer.input_size)
+        r = rng.standard_normal(conv_layer.output_size)
+        s, r_dot_b = conv_layer.project(r)
+        assert r @ conv_layer.forward(x) == pytest.approx(s @ x + r_dot_b)
+
+    def test_batches_match_single_vectors(self, conv_layer):
+        rng = np.random.default_rng(3)
+        X = rng.standard_normal((4, conv_layer.input_size))
+        R = rng.standard_normal((3, conv_layer.output_size))
+        Z = conv_layer.forward_batch(X.reshape(4, *conv_layer.input_shape))
+        S, rb = conv_layer.project_batch(R)
+        for n in range(4):
+            np.testing.assert_allclose(Z[n], conv_layer.forward(X[n]))
+        for k in range(3):
+            s, r_dot_b = conv_layer.project(R[k])
+            np.testing.assert_allclose(S[k], s)
+            assert rb[k] == pytest.approx(r_dot_b)
+
+    def test_dense_batches_match_single_vectors(self, model):
+        layer = model.layers[0]
+        rng = np.random.default_rng(4)
+        X = rng.standard_normal((3, layer.input_size))
+        R = rng.standard_normal((2, layer.output_size))
+        np.testing.assert_allclose(layer.forward_batch(X)[1], layer.forward(X[1]))
+        S, rb = layer.project_batch(R)
+        s, r_dot_b = layer.project(R[1])
+        np.testing.assert_allclose(S[1], s)
+        assert rb[1] == pytest.approx(r_dot_b)
+
+
+class TestBatchedForward:
+    def test_segment_batch_matches_per_sample(self, store):
+        rng = np.random.default_rng(5)
+        for model in store.list_models():
+            X = rng.uniform(0, 1, (6, model.input_size))
+            pre_batch, out_batch = model.forward_segment_batch(X, 0, model.total_layers)
+            assert out_batch.shape == (6, len(model.labels))
+            for n in range(6):
+                # Equal up to BLAS blocking order
+                pre, out = model.forward_segment(X[n], 0, model.total_layers)
+                np.testing.assert_allclose(out_batch[n], out, rtol=1e-12)
+                for z_batch, z in zip(pre_batch, pre):
+                    np.testing.assert_allclose(z_batch[n], z, rtol=1e-12, atol=1e-12)
+
+    def test_post_ops_act_per_row(self):
+        z = np.random.default_rng(6).standard_normal((3, 2 * 4 * 4))
+        ops = [
+            {"op": "relu"},
+            {"op": "maxpool2d", "shape": [2, 4, 4], "pool": 2},
+            {"op": "flatten"},
+            {"op": "softmax"},
+        ]
+        batch = apply_post_ops_batch(z, ops)
+        assert batch.shape == (3, 8)
+        np.testing.assert_allclose(batch.sum(axis=1), 1.0)
+        for n in range(3):
+            np.testing.assert_array_equal(batch[n], apply_post_ops(z[n], ops))
+
+
+@pytest.fixture()
+def packed_models(tmp_path, store):
+    """Copy of the models directory with every model packed into a container."""
+    for model in store.list_models():
+        source = store.models_dir / model.name
+        target = tmp_path / model.name
+        shutil.copytree(source, target)
+        write_container(target / "weights.pouw", model.layers)
+        manifest = json.loads((target / "manifest.json").read_text())
+        manifest["container_file"] = "weights.pouw"
+        (target / "manifest.json").write_text(json.dumps(manifest))
+    return tmp_path
+
+
+class TestWeightsContainer:
+    def test_blocks_are_aligned_wire_bytes(self, packed_models, model):
+        header, data = read_container(packed_models / model.name / "weights.pouw")
+        for entry, layer in zip(header["layers"], model.layers):
+            assert entry["offset"] % header["alignment"] == 0
+            block = data[entry["offset"] : entry["offset"] + entry["nbytes"]]
+            assert hashlib.sha256(block).hexdigest() == layer.checksum
+
+    def test_loads_memory_mapped_and_matches_npz(self, packed_models, store):
+        packed = ModelStore(models_dir=packed_models)
+        packed.load()
+        x = np.random.default_rng(7).uniform(0, 1, (2, 784))
+        for model in store.list_models():
+            mapped = packed.get(model.name)
+            assert mapped.checksum == model.checksum
+            for layer in mapped.layers:
+                assert layer.wire_buffer is not None
+                assert not layer.weights.flags["OWNDATA"]
+                assert layer.wire_payload() == model.layers[layer.index].wire_payload()
+            np.testing.assert_allclose(mapped.predict_batch(x), model.predict_batch(x))
+
+    def test_corrupt_block_is_rejected(self, packed_models, model):
+        path = packed_models / model.name / "weights.pouw"
+        raw = bytearray(path.read_bytes())
+        raw[-1] ^= 0xFF
+        path.write_bytes(bytes(raw))
+        with pytest.raises(ValueError, match="checksum mismatch"):
+            ModelStore(models_dir=packed_models)._load_model(
+                packed_models / model.name / "manifest.json"
+            )
+
+
+class TestVerifiedManifestCache:
+    def _copy(self, tmp_path, store, model):
+        shutil.copytree(store.models_dir / model.name, tmp_path / "models" / model.name)
+        return tmp_path / "models"
+
+    def _store(self, models_dir, cache_path, secret="secret"):
+        store = ModelStore(
+            models_dir=models_dir,
+            verified_cache=VerifiedManifestCache(cache_path, secret),
+        )
+        store.load()
+        return store
+
+    def test_unchanged_files_skip_verification(self, tmp_path, store, model):
+        models_dir = self._copy(tmp_path, store, model)
+        cache_path = tmp_path / "verified.json"
+        first = self._store(models_dir, cache_path)
+        assert first.verified_from_cache == set()
+        assert cache_path.exists()
+        second = self._store(models_dir, cache_path)
+        assert second.verified_from_cache == {model.name}
+        assert set(second.load_timings[model.name]) == {"read", "verify", "wire"}
+
+    def test_modified_weights_are_reverified(self, tmp_path, store, model):
+        models_dir = self._copy(tmp_path, store, model)
+        cache_path = tmp_path / "verified.json"
+        self._store(models_dir, cache_path)
+        weights = models_dir / model.name / "weights.npz"
+        weights.write_bytes(weights.read_bytes())  # same content, new identity
+        again = self._store(models_dir, cache_path)
+        assert again.verified_from_cache == set()
+        assert again.get(model.name).checksum == model.checksum
+
+    def test_cache_under_another_secret_is_ignored(self, tmp_path, store, model):
+        models_dir = self._copy(tmp_path, store, model)
+        cache_path = tmp_path / "verified.json"
+        self._store(models_dir, cache_path, secret="one")
+        assert self._store(models_dir, cache_path, secret="two").verified_from_cache == set()
+
+
+class TestResidency:
+    def _budgeted(self, store, budget):
+        """Budgeted store over the checked-in models; fits ``budget`` bytes."""
+        return ModelStore(models_dir=store.models_dir, memory_budget_bytes=budget)
+
+    def _one_model_budget(self, store):
+        footprints = [store._footprints[(m.name, m.version)] for m in store.list_models()]
+        return max(footprints) + 1
+
+    def test_budget_loads_on_demand_and_evicts_lru(self, store):
+        budgeted = self._budgeted(store, self._one_model_budget(store))
+        budgeted.load()
+        assert budgeted.list_models() == []
+        assert set(budgeted.model_names()) == {"mnist-tiny", "mnist-cnn"}
+
+        unloaded = []
+        budgeted.add_unload_listener(unloaded.append)
+        tiny = budgeted.get("mnist-tiny")
+        assert budgeted.get("mnist-tiny") is tiny
+        cnn = budgeted.get("mnist-cnn")
+        assert [m.name for m in budgeted.list_models()] == ["mnist-cnn"]
+        assert unloaded == [tiny]
+        assert budgeted.resident_bytes <= budgeted.memory_budget_bytes
+        assert budgeted.wire_cache.get(tiny.layers[0].checksum, WIRE_FORMAT_BIN) is None
+        assert budgeted.wire_cache.get(cnn.layers[0].checksum, WIRE_FORMAT_BIN) is not None
+
+        stats = budgeted.residency()
+        assert (stats["loads"], stats["evictions"], stats["hits"]) == (2, 1, 1)
+        assert stats["resident"] == [f"mnist-cnn@{cnn.version}"]
+
+    def test_evicted_model_reloads_by_checksum(self, store):
+        budgeted = self._budgeted(store, self._one_model_budget(store))
+        tiny = budgeted.get("mnist-tiny")
+        budgeted.get("mnist-cnn")
+        again = budgeted.get_by_checksum(tiny.checksum)
+        assert again is not tiny and again.checksum == tiny.checksum
+        assert budgeted.is_available(tiny.name, tiny.version)
+        assert not budgeted.is_resident("mnist-cnn")
+
+    def test_pinned_versions_are_not_evicted(self, store):
+        budgeted = self._budgeted(store, self._one_model_budget(store))
+        tiny = budgeted.get("mnist-tiny")
+        budgeted.set_pinned({(tiny.name, tiny.version)})
+        budgeted.get("mnist-cnn")
+        assert budgeted.is_resident("mnist-tiny") and budgeted.is_resident("mnist-cnn")
+
+        budgeted.set_pinned(set())  # run drained: back under budget
+        assert not budgeted.is_resident("mnist-tiny")
+        assert budgeted.stats.evictions == 1
+
+    def test_claim_lease_protects_until_expiry(self, store):
+        budgeted = self._budgeted(store, self._one_model_budget(store))
+        tiny = budgeted.get("mnist-tiny")
+        budgeted.pin(tiny.name, tiny.version, seconds=60)
+        budgeted.get("mnist-cnn")
+        assert budgeted.is_resident("mnist-tiny")
+        budgeted.pin(tiny.name, tiny.version, seconds=-1)  # no-op: leases only extend
+        assert budgeted.residency()["pinned"] == [f"mnist-tiny@{tiny.version}"]
+
+    @pytest.mark.asyncio
+    async def test_lookup_by_checksum_loads_off_the_event_loop(self, store, monkeypatch):
+        budgeted = self._budgeted(store, self._one_model_budget(store))
+        checksum = store.get("mnist-tiny").checksum
+        monkeypatch.setattr(model_store, "_store", budgeted)
+        threads = []
+        load = budgeted._load_resident
+
+        def record(name):
+            threads.append(threading.current_thread())
+            return load(name)
+
+        monkeypatch.setattr(budgeted, "_load_resident", record)
+        model = await get_model_by_checksum(checksum)
+        assert model.checksum == checksum and budgeted.is_resident_checksum(checksum)
+        assert threads and threading.main_thread() not in threads
+
+        assert await get_model_by_checksum(checksum) is model
+        assert len(threads) == 1
+
+    def test_no_budget_keeps_everything_resident(self, store):
+        assert store.memory_budget_bytes == 0
+        assert {m.name for m in store.list_models()} == set(store.model_names())
+
+
+@pytest.fixture()
+def quantized_model(tmp_path, store):
+    """mnist-cnn re-exported with int8 weights, float16 on the last layer."""
+    source = store.get("mnist-cnn")
+    target = tmp_path / source.name
+    shutil.copytree(store.models_dir / source.name, target)
+    manifest = json.loads((target / "manifest.json").read_text())
+    arrays = {}
+    for layer, entry in zip(source.layers, manifest["layers"]):
+        i = layer.index
+        arrays[f"b{i}"] = layer.biases
+        if i == source.total_layers - 1:
+            entry["weight_encoding"] = WEIGHTS_FLOAT16
+            arrays[f"W{i}"] = layer.weights.astype(np.float16)
+        else:
+            entry["weight_encoding"] = WEIGHTS_INT8
+            channel_axis = 1 if layer.layer_type == "dense" else 0
+            arrays[f"W{i}"], arrays[f"S{i}"] = quantize_int8(layer.weights, channel_axis)
+        entry["checksum"] = _load_layer(entry, arrays).compute_checksum()
+    np.savez(target / "weights.npz", **arrays)
+    manifest["checksum"] = hashlib.sha256(
+        "".join(entry["checksum"] for entry in manifest["layers"]).encode("ascii")
+    ).hexdigest()
+    manifest.pop("weights_file_sha256", None)
+    manifest.pop("container_file", None)
+    (target / "manifest.json").write_text(json.dumps(manifest))
+    return ModelStore(models_dir=tmp_path)._load_model(target / "manifest.json")
+
+
+class TestQuantizedWeights:
+    def test_int8_round_trip_is_within_half_a_step(self):
+        w = np.random.default_rng(4).standard_normal((30, 10)).astype(np.float32)
+        q, scales = quantize_int8(w, channel_axis=1)
+        assert q.dtype == np.int8 and scales.shape == (10,)
+        error = np.abs(dequantize_int8(q, scales, channel_axis=1) - w)
+        assert (error <= scales / 2 + 1e-6).all()
+
+    def test_checksum_covers_the_smaller_encoded_bytes(self, quantized_model, store):
+        source = store.get("mnist-cnn")
+        for layer, original in zip(quantized_model.layers, source.layers):
+            wire = layer.wire_bytes()
+            assert hashlib.sha256(wire).hexdigest() == layer.checksum
+            assert len(wire) < len(original.wire_bytes())
+
+    def test_projections_are_exact_for_dequantized_weights(self, quantized_model):
+        rng = np.random.default_rng(5)
+        for layer in quantized_model.layers:
+            x = rng.standard_normal(layer.input_size)
+            r = rng.standard_normal(layer.output_size)
+            s, r_dot_b = layer.project(r)
+            assert r @ layer.forward(x) == pytest.approx(s @ x + r_dot_b)
+
+    def test_predictions_stay_close_to_float32(self, quantized_model, store):
+        x = np.random.default_rng(6).uniform(0, 1, (16, 784))
+        expected = store.get("mnist-cnn").predict_batch(x)
+        np.testing.assert_allclose(quantized_model.predict_batch(x), expected, atol=0.05)
+
+    def test_inline_payload_carries_wire_bytes(self, quantized_model):
+        for layer in quantized_model.layers:
+            payload = layer.wire_payload()
+            assert "weights" not in payload
+            assert payload["weightEncoding"] == layer.weight_encoding
+            assert base64.b64decode(payload["wireData"]) == layer.wire_bytes()
+            reference = layer.wire_payload(inline=False)
+            assert "wireData" not in reference
+            assert reference["weightCount"] == layer.weights.size
+
+    def test_shard_info_accepts_quantized_layers(self, quantized_model):
+        shard = quantized_model.shard_payloads(0, 1)[0]
+        info = ModelShardInfo.model_validate(shard)
+        assert info.layers[0].weight_encoding == WEIGHTS_INT8
+        assert info.layers[0].wire_data is not None
+
+    def test_container_round_trips_quantized_layers(self, tmp_path, quantized_model):
+        path = tmp_path / "weights.pouw"
+        write_container(path, quantized_model.layers)
+        header, data = read_container(path)
+        for entry, layer in zip(header["layers"], quantized_model.layers):
+            block = data[entry["offset"] : entry["offset"] + entry["nbytes"]]
+            assert entry["encoding"] == layer.weight_encoding
+            assert hashlib.sha256(block).hexdigest() == layer.checksum
+
+    def test_mislabelled_weights_are_rejected(self, store):
+        layer = store.get("mnist-cnn").layers[0]
+        entry = {"index": 0, "type": layer.layer_type, "weight_encoding": WEIGHTS_INT8}
+        with pytest.raises(ValueError, match="int8"):
+            _load_layer(entry, {"W0": layer.weights, "b0": layer.biases})
+
+
+def csr_layer(dense: DenseLayer, keep: float = 0.2) -> tuple:
+    """A sparse_dense copy of ``dense`` keeping its largest weights."""
+    rows = dense.weights.T
+    mask = np.abs(rows) >= np.quantile(np.abs(rows), 1 - keep)
+    out_idx, in_idx = np.nonzero(mask)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(out_idx, minlength=len(rows)))])
+    i = dense.index
+    arrays = {
+        f"W{i}": rows[mask].astype(np.float32),
+        f"I{i}": in_idx.astype(np.int32),
+        f"P{i}": indptr.astype(np.int32),
+        f"b{i}": dense.biases,
+    }
+    entry = {
+        "index": i,
+        "name": dense.name,
+        "type": "sparse_dense",
+        "activation": dense.activation,
+        "input_size": dense.input_size,
+        "output_size": dense.output_size,
+        "nnz": int(mask.sum()),
+        "checksum": "",
+    }
+    layer = _load_layer(entry, arrays)
+    layer.checksum = entry["checksum"] = layer.compute_checksum()
+    pruned = DenseLayer(
+        index=i,
+        name=dense.name,
+        activation=dense.activation,
+        input_size=dense.input_size,
+        output_size=dense.output_size,
+        weights=np.where(mask.T, dense.weights, 0).astype(np.float32),
+        biases=dense.biases,
+        checksum="",
+    )
+    return layer, pruned, entry, arrays
+
+
+@pytest.fixture()
+def sparse(store):
+    return csr_layer(store.get("mnist-tiny").layers[0])
+
+
+class TestSparseDense:
+    def test_matches_the_pruned_dense_layer(self, sparse):
+        layer, pruned, _, _ = sparse
+        np.testing.assert_array_equal(layer.to_dense(), pruned.weights)
+        rng = np.random.default_rng(8)
+        x = rng.standard_normal((3, layer.input_size))
+        r = rng.standard_normal((4, layer.output_size))
+        np.testing.assert_allclose(layer.forward_batch(x), pruned.forward_batch(x))
+        S, rb = layer.project_batch(r)
+        S_dense, rb_dense = pruned.project_batch(r)
+        np.testing.assert_allclose(S, S_dense)
+        np.testing.assert_allclose(rb, rb_dense)
+        assert layer.compute_ops == layer.nnz
+
+    def test_wire_bytes_scale_with_nonzeros(self, sparse):
+        layer, pruned, _, _ = sparse
+        wire = layer.wire_bytes()
+        assert sparse_index_dtype(layer.input_size) == "<u2"
+        assert len(wire) == layer.nnz * 6 + layer.output_size * 8 + 4
+        assert len(wire) < len(pruned.wire_bytes()) / 2
+        assert hashlib.sha256(wire).hexdigest() == layer.checksum
+
+    def test_payloads(self, sparse):
+        layer = sparse[0]
+        shard = ModelShardInfo.model_validate(
+            {
+                "index": layer.index,
+                "name": layer.name,
+                "layerType": layer.layer_type,
+                "inputShape": [1, layer.input_size],
+                "outputShape": [1, layer.output_size],
+                "checksum": layer.checksum,
+                "layers": [layer.wire_payload()],
+            }
+        )
+        wire = shard.layers[0]
+        assert wire.indptr == layer.indptr.tolist()
+        assert len(wire.indices) == len(wire.weights) == layer.nnz
+        assert layer.wire_payload(inline=False)["weightCount"] == layer.nnz
+
+    def test_container_round_trip(self, tmp_path, sparse):
+        layer = sparse[0]
+        write_container(tmp_path / "weights.pouw", [layer])
+        header, data = read_container(tmp_path / "weights.pouw")
+        arrays, blocks = _container_arrays(header, data)
+        loaded = _load_layer(sparse[2], arrays)
+        assert hashlib.sha256(blocks[layer.index]).hexdigest() == layer.checksum
+        np.testing.assert_array_equal(loaded.to_dense(), layer.to_dense())
+
+    def test_catalog_budgets_a_layer_without_nnz_as_dense(self, tmp_path, sparse):
+        entry = {k: v for k, v in sparse[2].items() if k != "nnz"}
+        manifest = {
+            "name": "sparse",
+            "version": "1",
+            "checksum": "",
+            "task_type": "classification",
+            "labels": [],
+            "input": {"shape": [entry["input_size"]]},
+            "layers": [entry],
+        }
+        catalogued = CatalogEntry.from_manifest(tmp_path / "manifest.json", manifest)
+        dense = entry["output_size"] * entry["input_size"]
+        assert catalogued.weight_bytes == 4 * (2 * (dense + entry["output_size"]) + 1)
+
+    def test_malformed_csr_is_rejected(self, sparse):
+        _, _, entry, arrays = sparse
+        broken = dict(arrays, **{"I0": arrays["I0"] + entry["input_size"]})
+        with pytest.raises(ValueError, match="malformed CSR"):
+            _load_layer(entry, broken)
+
+
+class TestInputData:
+    def test_round_trip_is_a_float32_view(self):
+        values = np.random.default_rng(0).standard_normal(64).astype(np.float32)
+        decoded = decode_input_data(encode_input_data(values))
+        assert decoded.dtype == np.float32
+        assert not decoded.flags.writeable
+        np.testing.assert_array_equal(decoded, values)
+
+    def test_shard_input_vector_reads_encoded_and_legacy_metadata(self):
+        values = np.arange(8, dtype=np.float32) / 3
+        encoded = {"input_data": encode_input_data(values)}
+        legacy = {"input_vector": values.tolist()}
+        np.testing.assert_array_equal(shard_input_vector(encoded), values)
+        np.testing.assert_array_equal(shard_input_vector(legacy), values)
+        assert shard_input_vector({}) is None
@@ -0,0 +1,126 @@
+"""
+Tests for cross-submission micro-batching of projection checks.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from app.ml.model_store import apply_post_ops, get_model_store
+from app.ml.projection_batcher import ProjectionBatcher
+from app.ml.proof_verifier import ProofVerifier, canonical_vector_hash, compute_proof_hash
+from app.ml.verification_pool import VerificationPool
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model_store().get_default()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = VerificationPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def build_submission(model, seed, tamper=False):
+    x = np.random.default_rng(seed).uniform(0, 1, 784).astype(np.float32)
+    h = x
+    pre = []
+    for layer in model.layers:
+        z = layer.forward(h.astype(np.float64)).astype(np.float32)
+        pre.append([float(v) for v in z])
+        h = apply_post_ops(z.astype(np.float64), layer.post_ops).astype(np.float32)
+    if tamper:
+        pre[1][3] += 0.5
+    task_id = f"task-{seed}"
+    hashes = [canonical_vector_hash(z) for z in pre]
+    proof_hash = compute_proof_hash(task_id, "sample-1", 0, len(pre), hashes, "")
+    return dict(
+        model=model,
+        segment_start=0,
+        input_vector=x.tolist(),
+        pre_activations=pre,
+        output_hashes=hashes,
+        proof_hash=proof_hash,
+        task_id=task_id,
+        sample_id="sample-1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_batches(model, pool):
+    verifier = ProofVerifier(audit_rate=0.0)
+    batcher = ProjectionBatcher(window_ms=5.0)
+    submissions = [build_submission(model, seed, tamper=seed % 4 == 0) for seed in range(12)]
+
+    reports = await asyncio.gather(
+        *(verifier.verify_segment_batched(batcher, pool, **sub) for sub in submissions)
+    )
+
+    # All twelve full-model segments share one batch
+    assert batcher.batches == 1
+    assert batcher.rows == 12
+    assert batcher.pending == 0
+    for seed, report in enumerate(reports):
+        expected = verifier.verify_segment(**submissions[seed])
+        assert report.valid == expected.valid
+        assert report.reason == expected.reason
+        if seed % 4 == 0:
+            assert "layer 1" in report.reason
+        else:
+            np.testing.assert_allclose(report.final_activation, expected.final_activation)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_window(model, pool):
+    verifier = ProofVerifier(audit_rate=0.0)
+    batcher = ProjectionBatcher(window_ms=60_000.0, max_batch=3)
+    submissions = [build_submission(model, seed) for seed in range(3)]
+    reports = await asyncio.wait_for(
+        asyncio.gather(
+            *(verifier.verify_segment_batched(batcher, pool, **sub) for sub in submissions)
+        ),
+        timeout=5,
+    )
+    assert all(report.valid for report in reports)
+
+
+@pytest.mark.asyncio
+async def test_fused_submissions_batch_on_the_folded_rows(model, pool):
+    verifier = ProofVerifier(audit_rate=0.0)
+    batcher = ProjectionBatcher(window_ms=5.0)
+    submissions = [
+        dict(build_submission(model, seed, tamper=seed == 0), fused=True) for seed in range(4)
+    ]
+    reports = await asyncio.gather(
+        *(verifier.verify_segment_batched(batcher, pool, **sub) for sub in submissions)
+    )
+    # Each submission is checked against its own pool rows, in one batch
+    assert batcher.batches == 1
+    assert "layer 1" in reports[0].reason
+    for sub, report in zip(submissions, reports):
+        assert report.reason == verifier.verify_segment(**sub).reason
+    for report in reports[1:]:
+        assert report.valid, report.reason
+        assert "fused_projection" in report.checks_run
+
+
+@pytest.mark.asyncio
+async def test_batches_are_evaluated_off_the_event_loop(model, pool, monkeypatch):
+    threads = []
+    products = ProjectionBatcher._products
+
+    def record(batch):
+        threads.append(threading.current_thread())
+        return products(batch)
+
+    monkeypatch.setattr(ProjectionBatcher, "_products", staticmethod(record))
+    verifier = ProofVerifier(audit_rate=0.0)
+    batcher = ProjectionBatcher(window_ms=1.0)
+    report = await verifier.verify_segment_batched(batcher, pool, **build_submission(model, 1))
+    assert report.valid, report.reason
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,71 @@
+"""
+Tests for projection warm-up and the encrypted projection cache.
+"""
+
+import numpy as np
+import pytest
+
+from app.ml.model_store import get_model_store
+from app.ml.projection_cache import ProjectionCache
+from app.ml.proof_verifier import NUM_PROJECTIONS, ProofVerifier
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model_store().get_default()
+
+
+def layer_shape(layer):
+    return (NUM_PROJECTIONS, layer.output_size, layer.input_size)
+
+
+class TestProjectionCache:
+    def test_warm_persists_and_reloads_identical_projections(self, tmp_path, model):
+        first = ProofVerifier(audit_rate=0.0, cache=ProjectionCache(tmp_path, "secret"))
+        assert first.warm([model], max_workers=2) == model.total_layers
+        assert first.warmed
+        assert first.warm_done == first.warm_total == model.total_layers
+
+        cache = ProjectionCache(tmp_path, "secret")
+        second = ProofVerifier(audit_rate=0.0, cache=cache)
+        second.warm([model])
+        assert cache.hits == model.total_layers
+        for index in range(model.total_layers):
+            a = first._layer_projections(model, index)
+            b = second._layer_projections(model, index)
+            np.testing.assert_array_equal(a.R, b.R)
+            np.testing.assert_array_equal(a.S, b.S)
+            np.testing.assert_array_equal(a.rb, b.rb)
+
+    def test_entries_are_encrypted(self, tmp_path, model):
+        verifier = ProofVerifier(audit_rate=0.0, cache=ProjectionCache(tmp_path, "secret"))
+        verifier.warm([model])
+        layer = model.layers[0]
+        raw = ProjectionCache(tmp_path, "secret").path(
+            model.checksum, 0, layer.checksum
+        ).read_bytes()
+        assert b"PK" not in raw[:4]  # not a plain .npz archive
+        assert verifier._layer_projections(model, 0).R.tobytes()[:32] not in raw
+
+    def test_other_secret_misses(self, tmp_path, model):
+        ProofVerifier(audit_rate=0.0, cache=ProjectionCache(tmp_path, "secret")).warm([model])
+        other = ProjectionCache(tmp_path, "rotated")
+        layer = model.layers[0]
+        assert other.load(model.checksum, 0, layer.checksum, layer_shape(layer)) is None
+
+    def test_tampered_entry_is_ignored(self, tmp_path, model):
+        cache = ProjectionCache(tmp_path, "secret")
+        ProofVerifier(audit_rate=0.0, cache=cache).warm([model])
+        layer = model.layers[0]
+        path = cache.path(model.checksum, 0, layer.checksum)
+        token = bytearray(path.read_bytes())
+        token[-5] ^= 0x01
+        path.write_bytes(bytes(token))
+        assert cache.load(model.checksum, 0, layer.checksum, layer_shape(layer)) is None
+
+    def test_shape_mismatch_misses(self, tmp_path, model):
+        cache = ProjectionCache(tmp_path, "secret")
+        ProofVerifier(audit_rate=0.0, cache=cache).warm([model])
+        layer = model.layers[0]
+        wrong = (NUM_PROJECTIONS + 1, layer.output_size, layer.input_size)
+        assert cache.load(model.checksum, 0, layer.checksum, wrong) is None
@@ -5,14 +5,23 @@ Simulates an honest browser client (float32 layer math, like the JS shard
 engine) and several classes of cheaters, and checks the verifier's verdicts.
 """
 
+import base64
+import hashlib
+
 import numpy as np
 import pytest
 
-from app.ml.model_store import apply_post_ops, get_model_store
+from app.ml.model_store import apply_post_ops, decode_float32_array, get_model_store
 from app.ml.proof_verifier import (
+    FUSED_ROWS,
+    NUM_PROJECTIONS,
+    PROOF_VERSION_QUANTIZED,
     ProofVerifier,
+    _fused_row_choice,
     canonical_vector_hash,
+    commitment_hash,
     compute_proof_hash,
+    quantized_vector_hash,
 )
 
 
@@ -125,6 +134,174 @@ class TestHonestClient:
 
         assert report.predicted_label == direct_label
 
+    def test_binary_encoded_pre_activations_pass(self, model, verifier):
+        """float32 blobs decoded with np.frombuffer verify like JSON floats."""
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 3)
+        blobs = [
+            base64.b64encode(np.asarray(z, dtype="<f4").tobytes()).decode("ascii")
+            for z in pre
+        ]
+        decoded = [decode_float32_array(blob) for blob in blobs]
+        assert [z.tolist() for z in decoded] == pre
+        report = verifier.verify_segment(
+            model, 0, x, decoded, hashes, proof_hash, "task-1", "sample-1"
+        )
+        assert report.valid, report.reason
+
+    def test_malformed_binary_encoding_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_float32_array(base64.b64encode(b"\x00" * 6).decode("ascii"))
+        with pytest.raises(ValueError):
+            decode_float32_array("not base64!")
+
+
+class TestQuantizedCommitments:
+    def test_v2_proof_passes(self, model, verifier):
+        x = random_input()
+        pre = client_compute(model, x, 0, 3)
+        hashes = [quantized_vector_hash(z) for z in pre]
+        proof_hash = compute_proof_hash("task-1", "sample-1", 0, 3, hashes, "")
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1",
+            proof_version=PROOF_VERSION_QUANTIZED,
+        )
+        assert report.valid, report.reason
+
+    def test_v1_hashes_rejected_under_v2(self, model, verifier):
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 1)
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1",
+            proof_version=PROOF_VERSION_QUANTIZED,
+        )
+        assert not report.valid
+        assert "commitment" in report.reason
+
+    def test_unknown_version_rejected(self, model, verifier):
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 1)
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1",
+            proof_version=99,
+        )
+        assert not report.valid
+        assert "proof version" in report.reason
+
+    def test_quantization_rounds_half_up_and_saturates(self):
+        expected = np.array(
+            [1, -1, 0, 12346, 2**31 - 1, -(2**31), 0], dtype="<i4"
+        ).tobytes()
+        values = [0.00005, -0.00015, -0.00004, 1.23456, 1e9, -np.inf, np.nan]
+        assert quantized_vector_hash(values) == hashlib.sha256(expected).hexdigest()
+
+
+class TestFusedCheck:
+    def test_honest_segment_passes_fused(self, model, verifier):
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 3)
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1", fused=True
+        )
+        assert report.valid, report.reason
+        assert "fused_projection" in report.checks_run
+        assert "projections" not in report.checks_run
+
+    def test_failed_fused_check_pinpoints_layer(self, model, verifier):
+        x = random_input()
+        pre, _, _ = build_proof(model, x, 0, 3)
+        pre[1][5] += 0.5
+        hashes = [canonical_vector_hash(z) for z in pre]
+        proof_hash = compute_proof_hash("task-1", "sample-1", 0, 3, hashes, "")
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1", fused=True
+        )
+        assert not report.valid
+        assert "projection check failed at layer 1" in report.reason
+
+    def test_fused_check_is_one_row_per_layer(self, model, verifier, monkeypatch):
+        for index, layer in enumerate(model.layers):
+            fused = verifier._layer_projections(model, index).fused
+            assert fused.R.shape == (FUSED_ROWS, layer.output_size)
+            assert fused.S.shape == (FUSED_ROWS, layer.input_size)
+
+        full_terms = []
+        local_terms = verifier._local_terms
+        monkeypatch.setattr(
+            verifier,
+            "_local_terms",
+            lambda check, fused=False: full_terms.append(not fused)
+            or local_terms(check, fused),
+        )
+        x = random_input()
+        pre, hashes, proof_hash = build_proof(model, x, 0, 3)
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1", fused=True
+        )
+        assert report.valid, report.reason
+        assert full_terms == [False]  # honest segments never pay for all K rows
+
+    @pytest.mark.parametrize("corrupted", [0, 1, 2])
+    def test_single_corrupted_layer_is_rejected(self, model, verifier, corrupted):
+        # One layer replaced by the honest output for another input: every
+        # other layer checks out, which must not dilute the bad one
+        x = random_input()
+        pre, _, _ = build_proof(model, x, 0, 3)
+        pre[corrupted] = client_compute(model, random_input(seed=11), 0, 3)[corrupted]
+        hashes = [canonical_vector_hash(z) for z in pre]
+        proof_hash = compute_proof_hash("task-1", "sample-1", 0, 3, hashes, "")
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1", fused=True
+        )
+        assert not report.valid
+        assert f"projection check failed at layer {corrupted}" in report.reason
+
+    def test_fused_row_is_drawn_per_task(self, model, verifier):
+        choices = {tuple(_fused_row_choice(f"task-{n}", 3)) for n in range(64)}
+        assert len(choices) > 32
+        assert (_fused_row_choice("task-1", 3) == _fused_row_choice("task-1", 3)).all()
+
+    def test_learned_fused_row_does_not_cover_other_tasks(self, model, verifier):
+        # A client that somehow learned the row its task is checked against
+        # can hide an error orthogonal to it, but only from that row
+        known, other = "task-1", next(
+            f"task-{n}"
+            for n in range(2, 100)
+            if _fused_row_choice(f"task-{n}", 3)[2] != _fused_row_choice("task-1", 3)[2]
+        )
+        row = verifier._segment_projections(model, 0, 3, True, known)[2].R[0]
+        error = np.random.default_rng(5).standard_normal(row.shape)
+        error -= (error @ row) / (row @ row) * row
+        error *= 5.0 / np.abs(error).max()
+
+        x = random_input()
+        for task_id, passes in ((known, True), (other, False)):
+            pre, _, _ = build_proof(model, x, 0, 3)
+            pre[2] = [float(v) for v in np.asarray(pre[2], dtype=np.float64) + error]
+            hashes = [canonical_vector_hash(z) for z in pre]
+            proof_hash = compute_proof_hash(task_id, "sample-1", 0, 3, hashes, "")
+            report = verifier.verify_segment(
+                model, 0, x, pre, hashes, proof_hash, task_id, "sample-1", fused=True
+            )
+            assert report.valid is passes, report.reason
+
+    def test_fabricated_cnn_segment_fails_fused(self, cnn_model, verifier):
+        x = random_input()
+        rng = np.random.default_rng(4)
+        pre = [
+            [float(v) for v in rng.normal(0, 1, layer.output_size)]
+            for layer in cnn_model.layers
+        ]
+        hashes = [canonical_vector_hash(z) for z in pre]
+        proof_hash = compute_proof_hash(
+            "task-1", "sample-1", 0, len(pre), hashes, ""
+        )
+        report = verifier.verify_segment(
+            cnn_model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1", fused=True
+        )
+        assert not report.valid
+        assert "layer 0" in report.reason
+
 
 class TestCheaters:
     def test_fabricated_outputs_fail(self, model, verifier):
@@ -153,6 +330,29 @@ class TestCheaters:
         assert not report.valid
         assert "projection" in report.reason
 
+    @pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+    @pytest.mark.parametrize("fused", [False, True])
+    def test_non_finite_pre_activations_fail(self, model, verifier, bad, fused):
+        """NaN slips past a `> tol` compare and hashes as 0 under v2."""
+        x = random_input()
+        pre, _, _ = build_proof(model, x, 0, 3)
+        pre[1] = [bad] * len(pre[1])
+        hashes = [commitment_hash(z, PROOF_VERSION_QUANTIZED) for z in pre]
+        proof_hash = compute_proof_hash("task-1", "sample-1", 0, 3, hashes, "")
+        report = verifier.verify_segment(
+            model, 0, x, pre, hashes, proof_hash, "task-1", "sample-1",
+            proof_version=PROOF_VERSION_QUANTIZED, fused=fused,
+        )
+        assert not report.valid
+        assert report.reason == "non-finite pre-activation at layer 1"
+
+    def test_non_finite_pre_activations_fail_the_audit(self, model, verifier):
+        x = random_input()
+        pre, _, _ = build_proof(model, x, 0, 3)
+        pre[2][0] = np.nan
+        (failure,) = verifier.audit_segments(model, 0, [x], [pre])
+        assert "spot audit failed at layer 2" in failure
+
     def test_wrong_input_fails(self, model, verifier):
         """Client computed on a different input than assigned (precompute attack)."""
         x_assigned = random_input(seed=1)
@@ -326,6 +526,18 @@ class TestConvolutionalModel:
 
 
 class TestVerificationCost:
+    def test_projections_are_stacked_per_layer(self, model, verifier):
+        """Each layer check is two matvecs over contiguous (K, n) matrices."""
+        for index, layer in enumerate(model.layers):
+            proj = verifier._layer_projections(model, index)
+            assert proj.R.shape == (NUM_PROJECTIONS, layer.output_size)
+            assert proj.S.shape == (NUM_PROJECTIONS, layer.input_size)
+            assert proj.rb.shape == (NUM_PROJECTIONS,)
+            assert proj.R.flags.c_contiguous and proj.S.flags.c_contiguous
+            s0, rb0 = layer.project(proj.R[0])
+            np.testing.assert_allclose(proj.S[0], s0)
+            assert proj.rb[0] == pytest.approx(rb0)
+
     def test_projection_check_is_cheaper_than_recompute(self, model):
         """
         The point of the design: verification work should be much smaller
@@ -0,0 +1,162 @@
+"""
+Tests for the Redis ready queue of pipeline segment claims.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import pipeline
+from app.core.pipeline import PipelineCoordinator
+from app.core.run_queue import RunReadyQueue, ready_queue_for
+from app.ml.model_store import get_model_store
+from app.models import PipelineRun
+from app.utils.redis_client import InMemoryRedis
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # Lua scripting for fakeredis
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+LEASE = NOW + timedelta(seconds=90)
+
+
+@pytest.fixture()
+def queue():
+    return RunReadyQueue(fakeredis.aioredis.FakeRedis())
+
+
+def run(version="1.0.0", name="mnist-tiny"):
+    return SimpleNamespace(id=uuid.uuid4(), model_name=name, model_version=version)
+
+
+class TestReadyQueue:
+    @pytest.mark.asyncio
+    async def test_claim_leases_the_earliest_ready_run(self, queue):
+        old, new = run(), run()
+        await queue.schedule(new, NOW - timedelta(seconds=1))
+        await queue.schedule(old, NOW - timedelta(seconds=5))
+
+        entry = await queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE)
+        assert entry.run_id == old.id
+        # Leased, not removed: only the other run is ready now
+        entry = await queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE)
+        assert entry.run_id == new.id
+        assert await queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE) is None
+
+    @pytest.mark.asyncio
+    async def test_expired_claim_makes_the_run_ready_again(self, queue):
+        pending = run()
+        await queue.schedule(pending, NOW)
+        await queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE)
+
+        later = LEASE + timedelta(seconds=1)
+        entry = await queue.claim([("mnist-tiny", "1.0.0")], later, later)
+        assert entry.run_id == pending.id
+
+    @pytest.mark.asyncio
+    async def test_claim_searches_only_the_requested_versions(self, queue):
+        retiring, current = run("1.0.0"), run("2.0.0")
+        await queue.schedule(retiring, NOW - timedelta(seconds=5))
+        await queue.schedule(current, NOW)
+
+        entry = await queue.claim([("mnist-tiny", "2.0.0")], NOW, LEASE)
+        assert entry.run_id == current.id
+        entry = await queue.claim(
+            [("mnist-tiny", "2.0.0"), ("mnist-tiny", "1.0.0")], NOW, LEASE
+        )
+        assert entry.run_id == retiring.id
+        assert entry.key == RunReadyQueue.key("mnist-tiny", "1.0.0")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_never_share_a_run(self, queue):
+        runs = [run() for _ in range(5)]
+        for n, pending in enumerate(runs):
+            await queue.schedule(pending, NOW - timedelta(seconds=n))
+
+        entries = await asyncio.gather(
+            *(queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE) for _ in range(8))
+        )
+        claimed = [entry.run_id for entry in entries if entry is not None]
+        assert sorted(claimed) == sorted(pending.id for pending in runs)
+
+    @pytest.mark.asyncio
+    async def test_discarded_and_dropped_runs_are_gone(self, queue):
+        done, stale = run(), run()
+        await queue.schedule(done, NOW)
+        await queue.schedule(stale, NOW - timedelta(seconds=1))
+
+        await queue.discard(done)
+        entry = await queue.claim([("mnist-tiny", "1.0.0")], NOW, LEASE)
+        assert entry.run_id == stale.id
+        await queue.drop(entry)
+        later = LEASE + timedelta(seconds=1)
+        assert await queue.claim([("mnist-tiny", "1.0.0")], later, later) is None
+
+    def test_every_ready_set_shares_one_cluster_slot(self):
+        keys = {RunReadyQueue.key("mnist-tiny", "1.0.0"), RunReadyQueue.key("mnist-cnn", "2.0.0")}
+        assert {key[key.index("{") + 1 : key.index("}")] for key in keys} == {"ready"}
+
+    def test_in_memory_fallback_claims_from_the_database(self):
+        assert ready_queue_for(InMemoryRedis()) is None
+        assert ready_queue_for(None) is None
+
+
+class TestCoordinatorFallback:
+    async def _stranded(self, db_session, model):
+        coordinator = PipelineCoordinator(db_session)
+        sample = await coordinator._create_fallback_sample()
+        stranded = PipelineRun(
+            sample_id=sample.id,
+            model_name=model.name,
+            model_version=model.version,
+            next_layer=0,
+            activation=None,
+            status="in_progress",
+            contributors=[],
+        )
+        db_session.add(stranded)
+        await db_session.commit()  # never scheduled: a lost write or flushed Redis
+        return stranded
+
+    @pytest.mark.asyncio
+    async def test_run_missing_from_the_queue_is_claimed_from_its_row(
+        self, queue, db_session, monkeypatch
+    ):
+        monkeypatch.setattr(pipeline, "_queue_reconciled_at", None)
+        model = get_model_store().get_default()
+        stranded = await self._stranded(db_session, model)
+
+        coordinator = PipelineCoordinator(db_session)
+        coordinator._queue, coordinator._queue_resolved = queue, True
+        assignment = await coordinator.claim_segment(uuid.uuid4(), "normal", model=model)
+        assert assignment.run.id == stranded.id
+        # Back in its ready set, leased to this claim
+        score = await queue.redis.zscore(
+            RunReadyQueue.key(model.name, model.version), str(stranded.id)
+        )
+        assert score is not None
+
+    @pytest.mark.asyncio
+    async def test_empty_queue_is_trusted_between_reconciles(
+        self, queue, db_session, monkeypatch
+    ):
+        monkeypatch.setattr(pipeline, "_queue_reconciled_at", time.monotonic())
+        model = get_model_store().get_default()
+        stranded = await self._stranded(db_session, model)
+
+        coordinator = PipelineCoordinator(db_session)
+        coordinator._queue, coordinator._queue_resolved = queue, True
+        fresh = await coordinator.claim_segment(uuid.uuid4(), "normal", model=model)
+        assert fresh.run.id != stranded.id  # no table scan: a new run instead
+
+        monkeypatch.setattr(
+            pipeline,
+            "_queue_reconciled_at",
+            time.monotonic() - pipeline.QUEUE_RECONCILE_SECONDS,
+        )
+        assignment = await coordinator.claim_segment(uuid.uuid4(), "normal", model=model)
+        assert assignment.run.id == stranded.id
@@ -0,0 +1,88 @@
+"""
+Tests for the create_all compatibility step that upgrades older databases.
+"""
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import PipelineRun, base
+from app.models.base import _COMPAT_INDEXES, Base, _ensure_compat_columns
+
+
+@pytest_asyncio.fixture()
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def _indexes(conn, table):
+    result = await conn.exec_driver_sql(f"PRAGMA index_list({table})")
+    return {row[1] for row in result.fetchall()}
+
+
+@pytest.mark.asyncio
+async def test_missing_claim_index_is_created(engine):
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX ix_pipeline_runs_claimable")
+        await conn.exec_driver_sql("DROP INDEX ix_pipeline_runs_activation_hash")
+        await _ensure_compat_columns(conn)
+        indexes = await _indexes(conn, "pipeline_runs")
+        assert {"ix_pipeline_runs_claimable", "ix_pipeline_runs_activation_hash"} <= indexes
+        # Idempotent on an up-to-date schema
+        await _ensure_compat_columns(conn)
+
+
+@pytest.mark.asyncio
+async def test_missing_pipeline_column_is_added_to_existing_runs(engine):
+    run_id = uuid.uuid4()
+    async with AsyncSession(engine) as db:
+        db.add(
+            PipelineRun(
+                id=run_id,
+                sample_id=uuid.uuid4(),
+                model_name="mnist-tiny",
+                model_version="1",
+                next_layer=1,
+                activation=[0.5, 1.5],
+                contributors=[],
+            )
+        )
+        await db.commit()
+    async with engine.begin() as conn:
+        # As created before the activation store existed
+        await conn.exec_driver_sql("DROP INDEX ix_pipeline_runs_activation_hash")
+        await conn.exec_driver_sql("ALTER TABLE pipeline_runs DROP COLUMN activation_hash")
+        await _ensure_compat_columns(conn)
+        result = await conn.exec_driver_sql("PRAGMA table_info(pipeline_runs)")
+        assert "activation_hash" in {row[1] for row in result.fetchall()}
+    async with AsyncSession(engine) as db:
+        run = await db.get(PipelineRun, run_id)
+        # Still resumable from its legacy handoff on the next claim
+        assert run.activation_hash is None and run.activation == [0.5, 1.5]
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    async def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_postgres_statements_are_idempotent(monkeypatch):
+    monkeypatch.setattr(base.settings, "database_url", "postgresql+asyncpg://db/pouw")
+    conn = RecordingConnection()
+    await _ensure_compat_columns(conn)
+    assert (
+        "ALTER TABLE pipeline_runs ADD COLUMN IF NOT EXISTS activation_hash VARCHAR(64)"
+        in conn.statements
+    )
+    assert all("IF NOT EXISTS" in statement for statement in conn.statements)
+    assert set(_COMPAT_INDEXES) <= set(conn.statements)
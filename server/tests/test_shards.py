@@ -0,0 +1,83 @@
+"""
+Tests for the content-addressed shard download endpoint.
+"""
+
+import hashlib
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from app.ml.model_store import get_model_store
+
+
+@pytest.fixture(scope="module")
+def layer():
+    return get_model_store().get_default().layers[-1]
+
+
+def shard_url(checksum: str) -> str:
+    return f"/api/v1/shards/{checksum}.bin"
+
+
+class TestShardDownload:
+    @pytest.mark.asyncio
+    async def test_serves_checksummed_float32_bytes(self, client: AsyncClient, layer):
+        response = await client.get(
+            shard_url(layer.checksum), headers={"Accept-Encoding": "identity"}
+        )
+        assert response.status_code == 200
+        assert hashlib.sha256(response.content).hexdigest() == layer.checksum
+        values = np.frombuffer(response.content, dtype="<f4")
+        assert values.size == layer.weights.size + layer.biases.size
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["etag"] == f'"{layer.checksum}"'
+
+    @pytest.mark.asyncio
+    async def test_gzip_variant(self, client: AsyncClient, layer):
+        response = await client.get(
+            shard_url(layer.checksum), headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx transparently decodes the precompressed body
+        assert hashlib.sha256(response.content).hexdigest() == layer.checksum
+
+    @pytest.mark.asyncio
+    async def test_conditional_request_not_modified(self, client: AsyncClient, layer):
+        response = await client.get(
+            shard_url(layer.checksum),
+            headers={"If-None-Match": f'"{layer.checksum}-gzip"'},
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_byte_range(self, client: AsyncClient, layer):
+        full = layer.wire_bytes()
+        response = await client.get(
+            shard_url(layer.checksum), headers={"Range": "bytes=4-11"}
+        )
+        assert response.status_code == 206
+        assert response.content == full[4:12]
+        assert response.headers["content-range"] == f"bytes 4-11/{len(full)}"
+
+        suffix = await client.get(
+            shard_url(layer.checksum), headers={"Range": "bytes=-8"}
+        )
+        assert suffix.status_code == 206
+        assert suffix.content == full[-8:]
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range(self, client: AsyncClient, layer):
+        response = await client.get(
+            shard_url(layer.checksum), headers={"Range": "bytes=999999999-"}
+        )
+        assert response.status_code == 416
+
+    @pytest.mark.asyncio
+    async def test_unknown_checksum_is_404(self, client: AsyncClient):
+        response = await client.get(shard_url("0" * 64))
+        assert response.status_code == 404
+        response = await client.get(shard_url("not-a-checksum"))
+        assert response.status_code == 404
@@ -0,0 +1,194 @@
+"""
+Tests for the prefetched segment buffer behind /captcha/init, its producer
+and the claims it holds.
+"""
+
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import task_prefetch
+from app.core.pipeline import CLAIM_TTL_SECONDS, PipelineCoordinator
+from app.core.task_coordinator import TaskCoordinator
+from app.core.task_prefetch import PrefetchBuffer, PrefetchedSegment, TaskPrefetcher
+from app.ml.model_store import get_model_store
+from app.models import PipelineRun
+from app.utils.redis_client import InMemoryRedis
+
+
+def segment(model_name="mnist-tiny", lease=30.0, **overrides):
+    fields = dict(
+        task_id=str(uuid.uuid4()),
+        run_id=str(uuid.uuid4()),
+        sample_id=str(uuid.uuid4()),
+        model_name=model_name,
+        model_version="1.0.0",
+        segment_start=2,
+        segment_end=4,
+        input_hash="ab" * 32,
+        input_data="AAAAAA==",
+        input_size=1,
+        lease_until=time.time() + lease,
+    )
+    fields.update(overrides)
+    return PrefetchedSegment(**fields)
+
+
+@pytest.fixture()
+def buffer():
+    return PrefetchBuffer(InMemoryRedis())
+
+
+class TestPrefetchBuffer:
+    def test_json_round_trip(self):
+        entry = segment(known_label="7")
+        restored = PrefetchedSegment.from_json(entry.to_json().encode("utf-8"))
+        assert restored == entry
+        assert restored.layer_count == 2
+
+    @pytest.mark.asyncio
+    async def test_pop_is_fifo_per_tier_and_model(self, buffer):
+        first, second = segment(), segment()
+        await buffer.push("normal", first)
+        await buffer.push("normal", second)
+        await buffer.push("bot_like", segment())
+
+        assert await buffer.depth("normal", "mnist-tiny") == 2
+        assert (await buffer.pop("normal", ["mnist-tiny"])).task_id == first.task_id
+        assert (await buffer.pop("normal", ["mnist-tiny"])).task_id == second.task_id
+        assert await buffer.pop("normal", ["mnist-tiny"]) is None
+        assert await buffer.depth("bot_like", "mnist-tiny") == 1
+
+    @pytest.mark.asyncio
+    async def test_pop_falls_through_to_the_next_model(self, buffer):
+        cnn = segment("mnist-cnn")
+        await buffer.push("normal", cnn)
+        popped = await buffer.pop("normal", ["mnist-tiny", "mnist-cnn"])
+        assert popped.task_id == cnn.task_id
+
+    @pytest.mark.asyncio
+    async def test_expiring_entries_are_never_handed_out(self, buffer):
+        live = segment()
+        await buffer.push("normal", segment(lease=-1.0))
+        await buffer.push("normal", segment(lease=1.0))  # inside the margin
+        await buffer.push("normal", live)
+        assert (await buffer.pop("normal", ["mnist-tiny"])).task_id == live.task_id
+
+    @pytest.mark.asyncio
+    async def test_trim_drops_expired_heads_and_keeps_live_entries(self, buffer):
+        live = segment()
+        await buffer.push("normal", segment(lease=-1.0))
+        await buffer.redis.rpush(buffer.key("normal", "mnist-tiny"), "not json")
+        await buffer.push("normal", live)
+
+        assert await buffer.trim("normal", "mnist-tiny") == 2
+        assert await buffer.depth("normal", "mnist-tiny") == 1
+        assert (await buffer.pop("normal", ["mnist-tiny"])).task_id == live.task_id
+
+
+class TestClaims:
+    @pytest.mark.asyncio
+    async def test_extend_claim_turns_a_lease_into_a_full_claim(self, db_session):
+        coordinator = PipelineCoordinator(db_session)
+        task_id = uuid.uuid4()
+        assignment = await coordinator.claim_segment(
+            task_id, "normal", model_name="mnist-tiny", claim_seconds=5
+        )
+        await db_session.commit()
+
+        model = await coordinator.extend_claim(
+            assignment.run.id,
+            task_id,
+            assignment.segment_start,
+            assignment.model.name,
+            assignment.model.version,
+        )
+        assert model is assignment.model
+        await db_session.refresh(assignment.run)
+        floor = datetime.utcnow() + timedelta(seconds=CLAIM_TTL_SECONDS - 5)
+        assert assignment.run.claimed_until > floor
+        assert assignment.run.claimed_by_task == task_id
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_taken_over_and_cannot_be_extended(self, db_session):
+        coordinator = PipelineCoordinator(db_session)
+        first = uuid.uuid4()
+        lapsed = await coordinator.claim_segment(
+            first, "normal", model_name="mnist-tiny", claim_seconds=-1
+        )
+        await db_session.commit()
+
+        second = await coordinator.claim_segment(uuid.uuid4(), "normal", model_name="mnist-tiny")
+        await db_session.commit()
+        assert second.run.id == lapsed.run.id
+        assert (
+            await coordinator.extend_claim(
+                lapsed.run.id,
+                first,
+                lapsed.segment_start,
+                lapsed.model.name,
+                lapsed.model.version,
+            )
+            is None
+        )
+
+
+class TestPrefetcher:
+    @pytest.fixture()
+    def redis(self, monkeypatch):
+        redis = InMemoryRedis()
+
+        async def get_redis():
+            return redis
+
+        monkeypatch.setattr(task_prefetch, "get_redis", get_redis)
+        monkeypatch.setattr(get_model_store(), "model_names", lambda: ["mnist-tiny"])
+        monkeypatch.setattr(task_prefetch.settings, "task_prefetch_depth", 2)
+        return redis
+
+    def prefetcher(self, db_session):
+        return TaskPrefetcher(
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+            depth=2,
+            lease_seconds=30,
+        )
+
+    @pytest.mark.asyncio
+    async def test_run_once_tops_up_every_buffer(self, db_session, redis):
+        prefetcher = self.prefetcher(db_session)
+        assert await prefetcher.run_once() == 6  # three tiers, one model, depth 2
+        buffer = PrefetchBuffer(redis)
+        assert await buffer.depth("normal", "mnist-tiny") == 2
+        assert await prefetcher.run_once() == 0
+
+        first = await buffer.pop("normal", ["mnist-tiny"])
+        second = await buffer.pop("normal", ["mnist-tiny"])
+        # Each entry holds its own run under the lease
+        assert first.run_id != second.run_id
+        run = await db_session.get(PipelineRun, uuid.UUID(first.run_id))
+        assert run.claimed_by_task == uuid.UUID(first.task_id)
+
+    @pytest.mark.asyncio
+    async def test_lost_prefetched_claim_is_dropped_not_served(self, db_session, redis):
+        await self.prefetcher(db_session).run_once()
+        buffer = PrefetchBuffer(redis)
+        lost = await buffer.pop("normal", ["mnist-tiny"])
+        live = await buffer.pop("normal", ["mnist-tiny"])
+        await buffer.push("normal", lost)
+        await buffer.push("normal", live)
+        # The lost entry's lease ran out and another task took its run
+        await db_session.execute(
+            update(PipelineRun)
+            .where(PipelineRun.id == uuid.UUID(lost.run_id))
+            .values(claimed_by_task=uuid.uuid4())
+        )
+        await db_session.commit()
+
+        segment, model = await TaskCoordinator(db_session, redis)._bind_prefetched("normal")
+        assert segment.task_id == live.task_id
+        assert model.name == "mnist-tiny"
+        assert await buffer.depth("normal", "mnist-tiny") == 0
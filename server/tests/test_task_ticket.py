@@ -0,0 +1,258 @@
+"""
+Tests for signed task tickets carried by the challenge token.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.captcha import _claim_ticket
+from app.main import app
+from app.ml.inference_validator import hash_prediction
+from app.ml.model_store import apply_post_ops, decode_float32_array, get_model_store
+from app.ml.proof_verifier import canonical_vector_hash, compute_proof_hash
+from app.ml.task_ticket import TICKET_CLAIM, TaskTicket, known_label_digest
+from app.models import get_db
+from app.schemas import PredictionData
+from app.services.site_registry import SiteRegistry
+from app.utils.redis_client import InMemoryRedis, get_redis
+from app.utils.security import create_jwt_token, verify_jwt_token
+
+
+def make_ticket(**overrides) -> TaskTicket:
+    fields = dict(
+        task_id="6f1c1d2e-0000-4000-8000-000000000001",
+        session_id="6f1c1d2e-0000-4000-8000-000000000002",
+        sample_id="6f1c1d2e-0000-4000-8000-000000000003",
+        run_id="6f1c1d2e-0000-4000-8000-000000000004",
+        model_name="mnist-cnn",
+        model_version="1.0.0",
+        model_checksum="c" * 64,
+        segment_start=1,
+        layer_count=2,
+        input_hash="a" * 64,
+        expected_time_ms=3000,
+        difficulty="suspicious",
+        domain="example.com",
+        site_key_prefix="pk_test_12345678",
+        client_id="client-1",
+    )
+    fields.update(overrides)
+    return TaskTicket(**fields)
+
+
+class TestTaskTicket:
+    def test_round_trips_through_the_challenge_token(self):
+        ticket = make_ticket()
+        token = create_jwt_token(ticket.challenge_claims(), timedelta(minutes=5))
+        assert TaskTicket.from_claims(verify_jwt_token(token)) == ticket
+
+    def test_tampered_token_is_rejected(self):
+        token = create_jwt_token(make_ticket().challenge_claims(), timedelta(minutes=5))
+        header, payload, signature = token.split(".")
+        forged = make_ticket(segment_start=0).challenge_claims()
+        other = create_jwt_token(forged, timedelta(minutes=5)).split(".")[1]
+        assert verify_jwt_token(".".join([header, other, signature])) is None
+
+    def test_token_without_ticket_or_fields_yields_none(self):
+        claims = make_ticket().challenge_claims()
+        assert TaskTicket.from_claims({k: v for k, v in claims.items() if k != TICKET_CLAIM}) is None
+        broken = dict(claims, **{TICKET_CLAIM: {"p": "x"}})
+        assert TaskTicket.from_claims(broken) is None
+
+    def test_claims_are_compact(self):
+        claims = make_ticket().claims()
+        assert set(claims) == {"p", "r", "m", "v", "c", "a", "n", "i", "e", "u", "k"}
+
+    def test_known_label_is_checkable_but_not_readable(self):
+        ticket = make_ticket()
+        honeypot = make_ticket(known_label_hash=known_label_digest(ticket.task_id, "Seven"))
+        token = create_jwt_token(honeypot.challenge_claims(), timedelta(minutes=5))
+        restored = TaskTicket.from_claims(verify_jwt_token(token))
+        assert "Seven" not in str(restored.claims())
+        assert not restored.contradicts_known_label("seven")
+        assert restored.contradicts_known_label("one")
+        # Digests are per task, so equal labels do not show across tickets
+        assert known_label_digest("another-task", "seven") != restored.known_label_hash
+        assert not ticket.contradicts_known_label("one")
+
+
+def submission(ticket: TaskTicket, challenge_token: str, timing: dict) -> dict:
+    return {
+        "session_id": ticket.session_id,
+        "task_id": ticket.task_id,
+        "challenge_token": challenge_token,
+        "proof": {
+            "task_id": ticket.task_id,
+            "sample_id": ticket.sample_id,
+            "segment_start": 1,
+            "layer_count": 2,
+            "pre_activations": [[0.0], [0.0]],
+            "output_hashes": ["0" * 64, "0" * 64],
+            "proof_hash": "0" * 64,
+            "timestamp": 0,
+        },
+        "timing": timing,
+    }
+
+
+@pytest.mark.asyncio
+async def test_ticket_is_claimed_once():
+    redis = InMemoryRedis()
+    ticket = make_ticket()
+    assert await _claim_ticket(redis, ticket)
+    assert not await _claim_ticket(redis, ticket)
+    assert await _claim_ticket(redis, make_ticket(task_id="another-task"))
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_invalid_challenge_token(client: AsyncClient, sample_timing):
+    response = await client.post(
+        "/api/v1/captcha/submit", json=submission(make_ticket(), "not-a-token", sample_timing)
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_replayed_ticket_is_refused_before_verification(
+    client: AsyncClient, sample_timing, monkeypatch
+):
+    ticket = make_ticket()
+    token = create_jwt_token(ticket.challenge_claims(), timedelta(minutes=5))
+    assert await _claim_ticket(await get_redis(), ticket)
+
+    async def verify(*args, **kwargs):
+        raise AssertionError("a claimed ticket must not be verified again")
+
+    monkeypatch.setattr("app.api.captcha.InferenceValidator.validate_submission", verify)
+    response = await client.post(
+        "/api/v1/captcha/submit", json=submission(ticket, token, sample_timing)
+    )
+    assert response.status_code == 409
+
+
+@pytest_asyncio.fixture()
+async def site(db_session, monkeypatch):
+    """A registered site, with the API on the test database and one model."""
+    factory = async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+    async def test_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    monkeypatch.setattr(get_model_store(), "model_names", lambda: ["mnist-tiny"])
+    _, site_key, _ = await SiteRegistry(db_session).create_site(domain="example.com")
+    await db_session.commit()
+    yield site_key
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def init_and_compute(client: AsyncClient, site_key: str, init_request: dict) -> dict:
+    """Init a session and honestly compute its segment, as the widget does."""
+    response = await client.post(
+        "/api/v1/captcha/init",
+        json=dict(init_request, site_key=site_key),
+        headers={"Origin": "https://example.com"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    task = data["task"]
+    model = get_model_store().get_by_checksum(task["modelChecksum"])
+    start, count = task["segmentStart"], task["expectedLayers"]
+
+    h = decode_float32_array(task["inputData"])
+    pre = []
+    for layer in model.layers[start:start + count]:
+        z = layer.forward(h.astype(np.float64)).astype(np.float32)
+        pre.append([float(v) for v in z])
+        h = apply_post_ops(z.astype(np.float64), layer.post_ops).astype(np.float32)
+
+    prediction = None
+    prediction_hash = ""
+    if start + count == model.total_layers:
+        top = np.argsort(h)[::-1][:3]
+        prediction = {
+            "label": model.labels[top[0]],
+            "confidence": float(h[top[0]]),
+            "top_k": [{"label": model.labels[i], "confidence": float(h[i])} for i in top],
+        }
+        prediction_hash = hash_prediction(PredictionData(**prediction))
+    hashes = [canonical_vector_hash(z) for z in pre]
+    return {
+        "session_id": data["sessionId"],
+        "task_id": task["taskId"],
+        "challenge_token": data["challengeToken"],
+        "prediction": prediction,
+        "proof": {
+            "task_id": task["taskId"],
+            "sample_id": task["sampleId"],
+            "segment_start": start,
+            "layer_count": count,
+            "pre_activations": pre,
+            "output_hashes": hashes,
+            "prediction_hash": prediction_hash,
+            "proof_hash": compute_proof_hash(
+                task["taskId"], task["sampleId"], start, count, hashes, prediction_hash
+            ),
+            "timestamp": 0,
+        },
+        "timing": {
+            "model_load_ms": 10,
+            "inference_ms": task["expectedTimeMs"],
+            "total_ms": task["expectedTimeMs"] + 10,
+            "started_at": 0,
+            "completed_at": task["expectedTimeMs"] + 10,
+        },
+    }
+
+
+class TestSubmitWithTicket:
+    @pytest.mark.asyncio
+    async def test_init_then_submit_verifies_the_ticket(
+        self, client: AsyncClient, site, sample_init_request
+    ):
+        submission = await init_and_compute(client, site, sample_init_request)
+        assert TICKET_CLAIM in verify_jwt_token(submission["challenge_token"])
+
+        response = await client.post("/api/v1/captcha/submit", json=submission)
+        assert response.status_code == 200, response.text
+        assert response.json()["success"] is True
+
+        replay = await client.post("/api/v1/captcha/submit", json=submission)
+        assert replay.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_token_without_ticket_falls_back_to_the_rows(
+        self, client: AsyncClient, site, sample_init_request
+    ):
+        submission = await init_and_compute(client, site, sample_init_request)
+        payload = verify_jwt_token(submission["challenge_token"])
+        legacy = {k: v for k, v in payload.items() if k not in (TICKET_CLAIM, "exp", "iat")}
+        submission["challenge_token"] = create_jwt_token(legacy, timedelta(minutes=5))
+
+        response = await client.post("/api/v1/captcha/submit", json=submission)
+        assert response.status_code == 200, response.text
+        assert response.json()["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_server_error_releases_the_ticket(
+        self, client: AsyncClient, site, sample_init_request, monkeypatch
+    ):
+        submission = await init_and_compute(client, site, sample_init_request)
+
+        async def crash(*args, **kwargs):
+            raise RuntimeError("verification pool gone")
+
+        with monkeypatch.context() as patched:
+            patched.setattr("app.api.captcha.InferenceValidator.validate_submission", crash)
+            response = await client.post("/api/v1/captcha/submit", json=submission)
+        assert response.status_code == 500
+
+        retry = await client.post("/api/v1/captcha/submit", json=submission)
+        assert retry.status_code == 200, retry.text
+        assert retry.json()["success"] is True
@@ -0,0 +1,65 @@
+"""
+Tests for the off-loop proof verification pool.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.ml.verification_pool import VerificationPool
+
+
+@pytest.mark.asyncio
+async def test_runs_off_the_event_loop():
+    pool = VerificationPool(max_workers=2)
+    try:
+        loop_thread = threading.get_ident()
+        worker_thread = await pool.run(threading.get_ident)
+        assert worker_thread != loop_thread
+        assert pool.stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_slow_verification():
+    pool = VerificationPool(max_workers=1)
+    try:
+        slow = asyncio.ensure_future(pool.run(time.sleep, 0.2))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - started < 0.1
+        await slow
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_excess_jobs():
+    pool = VerificationPool(max_workers=2)
+    try:
+        jobs = [asyncio.ensure_future(pool.run(time.sleep, 0.05)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        stats = pool.stats()
+        assert stats["running"] <= 2
+        assert stats["queued"] == 3
+        await asyncio.gather(*jobs)
+        stats = pool.stats()
+        assert stats["queued"] == 0
+        assert stats["completed"] == 5
+        assert stats["max_queued"] >= 3
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failures_propagate_and_are_counted():
+    pool = VerificationPool(max_workers=1)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(lambda: 1 / 0)
+        assert pool.stats()["failed"] == 1
+    finally:
+        pool.shutdown()